@@ -1,7 +1,107 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from sqlalchemy import create_engine, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from .config import settings
 
+
+# ============ POOL INSTRUMENTATION ============
+
+class CheckoutWaits:
+    """Histogram of how long checkouts waited for a pooled connection."""
+
+    BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.timeouts = 0
+
+    def record(self, waited_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.BUCKETS_MS, waited_ms)] += 1
+            self.total_ms += waited_ms
+            self.timeouts += timed_out
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            checkouts = sum(self.counts)
+            labels = [f"le_{b}ms" for b in self.BUCKETS_MS] + ["gt_5000ms"]
+            return {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_ms / checkouts, 3) if checkouts else 0.0,
+                "wait_histogram": dict(zip(labels, self.counts)),
+            }
+
+
+class _TimedCheckout:
+    """Pool mixin that records every checkout's wait in ``self.waits``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = CheckoutWaits()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.waits.record((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.waits.record((time.perf_counter() - start) * 1000)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(engine) -> dict:
+    """Live state of an engine's pool, for the admin metrics endpoint."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, _TimedCheckout):
+        stats.update(pool.waits.snapshot())
+    return stats
+
+
+def _pool_options(asyncio: bool = False) -> dict:
+    """Engine pool options for a server database, from the DB_POOL_* settings."""
+    if settings.DB_PGBOUNCER:
+        # PgBouncer (transaction pooling) owns the pool; prepared statements
+        # cannot outlive a transaction there, so asyncpg must not cache them
+        options = {"poolclass": NullPool}
+        if asyncio:
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
 # Create database engine
 db_url = settings.DATABASE_URL
 if not db_url:
@@ -11,11 +111,29 @@ if not db_url:
 elif db_url.startswith("sqlite"):
     engine = create_engine(db_url, connect_args={"check_same_thread": False})
 else:
-    engine = create_engine(db_url)
+    engine = create_engine(db_url, **_pool_options())
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the same database, used by the hot read routes
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver equivalent of a sync DATABASE_URL."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+if db_url.startswith("sqlite"):
+    async_engine = create_async_engine(async_database_url(db_url))
+else:
+    async_engine = create_async_engine(async_database_url(db_url), **_pool_options(asyncio=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -26,3 +144,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def run_migrations(revision: str = "head"):
+    """Apply pending schema migrations (same as `alembic upgrade head`)."""
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(str(ALEMBIC_INI)), revision)
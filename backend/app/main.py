@@ -1,14 +1,21 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
-from collections import defaultdict
-import time
 
 from .config import settings
-from .database import engine, Base
+from .services.analytics import reconcile_rollup_forever
+from .services.user_counters import reconcile_user_counters_forever
+from .services.listing_cache import listen_for_invalidations as listen_for_listing_invalidations
+from .services.passwords import password_hasher
+from .services.rate_limit import rate_limiter, retry_after_header
+from .services.upload import UploadFiles, shutdown_image_pool
+from .services.user_cache import listen_for_invalidations
+from .services.view_counter import flush_views, flush_views_forever
 from .routers import (
     auth_router,
     listings_router,
@@ -26,8 +33,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = [
+        asyncio.create_task(listen_for_invalidations()),
+        asyncio.create_task(listen_for_listing_invalidations()),
+    ]
+    if settings.METRICS_RECONCILE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(reconcile_rollup_forever(settings.METRICS_RECONCILE_INTERVAL_SECONDS)))
+    if settings.USER_COUNTERS_RECONCILE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(
+            reconcile_user_counters_forever(settings.USER_COUNTERS_RECONCILE_INTERVAL_SECONDS)
+        ))
+    tasks.append(asyncio.create_task(flush_views_forever(max(settings.VIEW_FLUSH_INTERVAL_SECONDS, 1))))
+    yield
+    for task in tasks:
+        task.cancel()
+    await run_in_threadpool(flush_views, True)
+    password_hasher.shutdown()
+    shutdown_image_pool()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -35,31 +61,24 @@ app = FastAPI(
     description="Backend API for APSIT TradeHub - A marketplace for APSIT students",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 
-# ---------- Simple in-memory rate limiter ----------
-_rate_store: dict[str, list[float]] = defaultdict(list)
-RATE_LIMIT_PATHS = {"/api/auth/login", "/api/auth/register", "/api/auth/google", "/api/auth/google-token"}
-RATE_LIMIT_MAX = 10  # requests
-RATE_LIMIT_WINDOW = 60  # seconds
-
-
+# ---------- Rate limiting (see services/rate_limit.py for the per-route limits) ----------
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
-    if request.url.path in RATE_LIMIT_PATHS and request.method == "POST":
+    limit = rate_limiter.match(request.method, request.url.path)
+    if limit is not None:
         client_ip = request.client.host if request.client else "unknown"
-        key = f"{client_ip}:{request.url.path}"
-        now = time.time()
-        # Prune old entries
-        _rate_store[key] = [t for t in _rate_store[key] if now - t < RATE_LIMIT_WINDOW]
-        if len(_rate_store[key]) >= RATE_LIMIT_MAX:
+        allowed, retry_after = await rate_limiter.check(limit, client_ip, request.headers.get("authorization"))
+        if not allowed:
             return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={"detail": "Too many requests. Please try again later."},
+                headers={"Retry-After": retry_after_header(retry_after)},
             )
-        _rate_store[key].append(now)
     return await call_next(request)
 
 
@@ -70,12 +89,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
+    # Paged list endpoints send the next page's cursor here
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Mount uploads directory for local file storage
 uploads_dir = Path("uploads")
 uploads_dir.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", UploadFiles(directory="uploads"), name="uploads")
 
 # Include routers with /api prefix
 app.include_router(auth_router, prefix="/api")
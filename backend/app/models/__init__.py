@@ -1,6 +1,6 @@
 from .models import (
-    User, Listing, Message, Review, Favorite,
-    Report, AdminActivityLog, Category, PlatformSettings,
+    User, Listing, Message, Conversation, Review, Favorite,
+    Report, AdminActivityLog, Category, PlatformSettings, DailyMetric, ImageRef,
     ConditionEnum, ListingStatusEnum, RoleEnum, 
     ReportTypeEnum, ReportStatusEnum, ReportReasonEnum
 )
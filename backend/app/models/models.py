@@ -1,4 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Enum, Index
+from sqlalchemy import (
+    Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Text, Enum, Index, DDL, event,
+    select, update, insert, case, or_
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -73,7 +78,17 @@ class User(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    last_login = Column(DateTime(timezone=True), nullable=True)
+    last_login = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    # Denormalized counters
+    unread_messages_count = Column(Integer, default=0, server_default="0", nullable=False)
+    # Profile stats, kept current by services/user_counters.py's write hooks
+    # on listings and reviews
+    listing_count = Column(Integer, default=0, server_default="0", nullable=False)
+    available_count = Column(Integer, default=0, server_default="0", nullable=False)
+    sold_count = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_sum = Column(Integer, default=0, server_default="0", nullable=False)
+    rating_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Relationships
     listings = relationship("Listing", back_populates="seller", foreign_keys="Listing.seller_id")
@@ -121,14 +136,74 @@ class Listing(Base):
     reports = relationship("Report", back_populates="listing", foreign_keys="Report.listing_id")
 
     __table_args__ = (
-        Index("ix_listings_seller_id", "seller_id"),
+        Index("ix_listings_seller_created", "seller_id", "created_at"),
         Index("ix_listings_category", "category"),
         Index("ix_listings_status", "status"),
         Index("ix_listings_created_at", "created_at"),
         Index("ix_listings_status_created", "status", "created_at"),
+        Index("ix_listings_status_price", "status", "price"),
     )
 
 
+# ============ FULL-TEXT SEARCH ============
+
+# Postgres keeps a generated, weighted tsvector column behind a GIN index.
+# SQLite (dev and tests) keeps an external-content FTS5 table that triggers
+# sync on insert/update/delete. Every statement is idempotent so the same
+# list can be replayed against an existing database.
+LISTING_SEARCH_DDL = {
+    "postgresql": [
+        """
+        ALTER TABLE listings ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_listings_search_vector ON listings USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+            title, description,
+            content='listings', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS listings_fts_ai AFTER INSERT ON listings BEGIN
+            INSERT INTO listings_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS listings_fts_ad AFTER DELETE ON listings BEGIN
+            INSERT INTO listings_fts(listings_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS listings_fts_au AFTER UPDATE OF title, description ON listings BEGIN
+            INSERT INTO listings_fts(listings_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO listings_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+    ],
+}
+
+for _dialect, _statements in LISTING_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Listing.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+# The FTS5 table is not owned by SQLAlchemy, so drop it alongside listings
+event.listen(
+    Listing.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS listings_fts").execute_if(dialect="sqlite")
+)
+
+
 class Message(Base):
     __tablename__ = "messages"
 
@@ -144,6 +219,7 @@ class Message(Base):
     flagged_reason = Column(String(200), nullable=True)
     is_deleted = Column(Boolean, default=False)
     deleted_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -151,6 +227,115 @@ class Message(Base):
     sender = relationship("User", back_populates="sent_messages", foreign_keys=[sender_id])
     receiver = relationship("User", back_populates="received_messages", foreign_keys=[receiver_id])
     listing = relationship("Listing", back_populates="messages")
+    conversation = relationship("Conversation", foreign_keys=[conversation_id])
+
+    __table_args__ = (
+        # Conversation view and mark-read: one participant direction per seek
+        Index("ix_messages_listing_sender_receiver", "listing_id", "sender_id", "receiver_id", "created_at"),
+        Index("ix_messages_receiver_read", "receiver_id", "is_read"),
+        Index("ix_messages_sender_id", "sender_id"),
+        # Conversation pages: newest first, seeking by id
+        Index("ix_messages_conversation_message", "conversation_id", "id"),
+    )
+
+
+class Conversation(Base):
+    """
+    One thread per (pair of users, listing), maintained on every message insert.
+    Participants are stored ordered (user_a_id < user_b_id) so each pair maps
+    to exactly one row.
+    """
+    __tablename__ = "conversations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_a_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_b_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=True)
+    
+    # Plain pointer (no FK) to avoid a messages <-> conversations FK cycle
+    last_message_id = Column(Integer, nullable=True)
+    last_message_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Unread messages waiting for each participant
+    unread_count_a = Column(Integer, default=0, server_default="0", nullable=False)
+    unread_count_b = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    user_a = relationship("User", foreign_keys=[user_a_id])
+    user_b = relationship("User", foreign_keys=[user_b_id])
+    listing = relationship("Listing")
+    last_message = relationship(
+        "Message",
+        primaryjoin="foreign(Conversation.last_message_id) == Message.id",
+        viewonly=True
+    )
+
+    __table_args__ = (
+        Index("ix_conversations_participants_listing", "user_a_id", "user_b_id", "listing_id", unique=True),
+        Index("ix_conversations_user_a_last", "user_a_id", "last_message_at"),
+        Index("ix_conversations_user_b_last", "user_b_id", "last_message_at"),
+    )
+
+
+@event.listens_for(Message, "before_insert")
+def _attach_conversation(mapper, connection, message):
+    """Find or create the conversation a new message belongs to."""
+    conversations = Conversation.__table__
+    user_a_id, user_b_id = sorted((message.sender_id, message.receiver_id))
+    key = (
+        (conversations.c.user_a_id == user_a_id)
+        & (conversations.c.user_b_id == user_b_id)
+        & (conversations.c.listing_id == message.listing_id)
+    )
+    values = dict(user_a_id=user_a_id, user_b_id=user_b_id, listing_id=message.listing_id)
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        # Concurrent first messages must not open two threads
+        upsert = pg_insert if dialect == "postgresql" else sqlite_insert
+        connection.execute(
+            upsert(conversations).values(**values).on_conflict_do_nothing(
+                index_elements=["user_a_id", "user_b_id", "listing_id"]
+            )
+        )
+        message.conversation_id = connection.execute(select(conversations.c.id).where(key)).scalar_one()
+    else:
+        conversation_id = connection.execute(select(conversations.c.id).where(key)).scalar()
+        if conversation_id is None:
+            conversation_id = connection.execute(insert(conversations).values(**values)).inserted_primary_key[0]
+        message.conversation_id = conversation_id
+
+
+@event.listens_for(Message, "after_insert")
+def _advance_conversation(mapper, connection, message):
+    """
+    Point the conversation at the new message and bump the receiver's unread
+    counters, inside the same transaction as the INSERT.
+    """
+    conversations = Conversation.__table__
+    users = User.__table__
+    # Concurrent sends can commit out of id order: only ever move forward
+    newer = or_(conversations.c.last_message_id.is_(None), conversations.c.last_message_id < message.id)
+    changes = dict(
+        last_message_id=case((newer, message.id), else_=conversations.c.last_message_id),
+        last_message_at=case(
+            (newer, select(Message.created_at).where(Message.id == message.id).scalar_subquery()),
+            else_=conversations.c.last_message_at,
+        ),
+    )
+    if not message.is_read:
+        counter = "unread_count_a" if message.receiver_id < message.sender_id else "unread_count_b"
+        changes[counter] = conversations.c[counter] + 1
+        connection.execute(
+            update(users)
+            .where(users.c.id == message.receiver_id)
+            .values(unread_messages_count=users.c.unread_messages_count + 1)
+        )
+    connection.execute(
+        update(conversations).where(conversations.c.id == message.conversation_id).values(**changes)
+    )
 
 
 class Review(Base):
@@ -169,6 +354,14 @@ class Review(Base):
     reviewed_user = relationship("User", back_populates="reviews_received", foreign_keys=[reviewed_user_id])
     listing = relationship("Listing", back_populates="reviews")
 
+    __table_args__ = (
+        Index("ix_reviews_reviewed_user_rating", "reviewed_user_id", "rating"),
+        Index("ix_reviews_reviewer_reviewed_listing", "reviewer_id", "reviewed_user_id", "listing_id"),
+        Index("ix_reviews_listing_created", "listing_id", "created_at"),
+        Index("ix_reviews_reviewed_user_created", "reviewed_user_id", "created_at"),
+        Index("ix_reviews_reviewer_created", "reviewer_id", "created_at"),
+    )
+
 
 class Favorite(Base):
     __tablename__ = "favorites"
@@ -184,6 +377,7 @@ class Favorite(Base):
 
     __table_args__ = (
         Index("ix_favorites_user_listing", "user_id", "listing_id", unique=True),
+        Index("ix_favorites_user_created", "user_id", "created_at"),
     )
 
 
@@ -216,6 +410,15 @@ class Report(Base):
     reporter = relationship("User", back_populates="reports_filed", foreign_keys=[reporter_id])
     reported_user = relationship("User", foreign_keys=[reported_user_id])
     listing = relationship("Listing", back_populates="reports", foreign_keys=[listing_id])
+    reviewer = relationship("User", foreign_keys=[reviewed_by])
+
+    __table_args__ = (
+        # Moderation queue: filter by status or reason, newest first / date range
+        Index("ix_reports_status_created", "status", "created_at"),
+        Index("ix_reports_reason_created", "reason", "created_at"),
+        Index("ix_reports_reporter_id", "reporter_id"),
+        Index("ix_reports_reported_user_id", "reported_user_id"),
+    )
 
 
 class AdminActivityLog(Base):
@@ -258,3 +461,36 @@ class PlatformSettings(Base):
     description = Column(String(500), nullable=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+
+class DailyMetric(Base):
+    """
+    Per-day rollup for the admin dashboard and analytics. Each column counts
+    the rows created on ``day`` that still exist (and are in the given state),
+    so all-time totals are SUMs over the table and any window is a range scan.
+    Kept current by the write hooks services/analytics.py registers, which
+    also rebuilds and checks it against the live tables.
+    """
+    __tablename__ = "daily_metrics"
+
+    day = Column(Date, primary_key=True)
+    new_users = Column(Integer, default=0, server_default="0", nullable=False)
+    banned_users = Column(Integer, default=0, server_default="0", nullable=False)
+    new_listings = Column(Integer, default=0, server_default="0", nullable=False)
+    available_listings = Column(Integer, default=0, server_default="0", nullable=False)
+    sold_listings = Column(Integer, default=0, server_default="0", nullable=False)
+    hidden_listings = Column(Integer, default=0, server_default="0", nullable=False)
+    new_messages = Column(Integer, default=0, server_default="0", nullable=False)
+
+
+class ImageRef(Base):
+    """
+    How many rows point at each locally stored image. Uploads are stored
+    under the SHA-256 of their bytes, so listings and profiles can share a
+    file; services/upload.py only deletes it once its count is zero. Kept
+    current by the write hooks in services/image_refs.py, like daily_metrics.
+    """
+    __tablename__ = "image_refs"
+
+    url = Column(String(500), primary_key=True)
+    ref_count = Column(Integer, default=0, server_default="0", nullable=False)
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, desc, and_, or_, case, false, select
+from datetime import date, datetime, timedelta
 from typing import Optional, List
 
-from ..database import get_db
+from ..database import async_engine, engine, get_async_db, get_db, pool_stats
 from ..models import (
     User, Listing, Message, Review, Report, AdminActivityLog, 
-    Category, PlatformSettings, Favorite, RoleEnum, ReportStatusEnum
+    Category, PlatformSettings, Favorite, RoleEnum, ReportStatusEnum, ReportReasonEnum
 )
 from ..schemas.admin_schemas import (
     AdminLogin, AdminTokenResponse, AdminUserResponse, AdminUserDetail,
@@ -19,7 +20,18 @@ from ..schemas.admin_schemas import (
     CategoryCreate, CategoryUpdate, CategoryResponse,
     SettingUpdate, SettingResponse, ActivityLogResponse, ActivityLogListResponse
 )
-from ..services.auth import verify_password, create_access_token, get_password_hash
+from ..services.auth import create_access_token, get_password_hash
+from ..services.search import apply_search
+from ..services.pagination import keyset_page
+from ..services.conversations import forget_conversations
+from ..services.derived_counters import count_rows, recounted
+from ..services.passwords import password_hasher
+from ..services.upload import delete_images
+from ..services.listing_cache import listing_cache
+from ..services.view_counter import view_counter
+from ..services.user_cache import user_cache
+from ..services.user_counters import average_rating
+from ..services.analytics import ANALYTICS_WINDOWS, rollup_series, rollup_totals, today_start
 from ..services.admin import (
     get_admin_user, get_super_admin_user, log_admin_activity, get_client_ip
 )
@@ -30,11 +42,11 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 # ============ AUTHENTICATION ============
 
 @router.post("/login", response_model=AdminTokenResponse)
-def admin_login(login_data: AdminLogin, db: Session = Depends(get_db)):
+async def admin_login(login_data: AdminLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Admin login - only users with admin or super_admin role can login.
     """
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = await db.scalar(select(User).where(User.email == login_data.email))
     
     if not user:
         raise HTTPException(
@@ -48,7 +60,7 @@ def admin_login(login_data: AdminLogin, db: Session = Depends(get_db)):
             detail="Admin access required"
         )
     
-    if not user.hashed_password or not verify_password(login_data.password, user.hashed_password):
+    if not user.hashed_password or not await password_hasher.verify(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -60,9 +72,11 @@ def admin_login(login_data: AdminLogin, db: Session = Depends(get_db)):
             detail="Your account has been banned"
         )
     
-    # Update last login
+    # Update last login, upgrading the hash if the bcrypt cost factor changed
     user.last_login = datetime.utcnow()
-    db.commit()
+    if password_hasher.needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(login_data.password)
+    await db.commit()
     
     access_token = create_access_token(data={"sub": str(user.id)})
     
@@ -99,33 +113,37 @@ def get_dashboard_stats(
     db: Session = Depends(get_db),
     admin: User = Depends(get_admin_user)
 ):
-    """Get dashboard statistics."""
-    today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    
-    total_users = db.query(User).count()
-    total_listings = db.query(Listing).count()
-    active_listings = db.query(Listing).filter(Listing.status == "available").count()
-    total_messages = db.query(Message).count()
-    pending_reports = db.query(Report).filter(Report.status == ReportStatusEnum.pending).count()
-    banned_users = db.query(User).filter(User.is_banned == True).count()
-    new_users_today = db.query(User).filter(User.created_at >= today_start).count()
-    new_listings_today = db.query(Listing).filter(Listing.created_at >= today_start).count()
-    total_trades = db.query(Listing).filter(Listing.status == "sold").count()
+    """Get dashboard statistics from the daily_metrics rollup."""
+    totals = rollup_totals(db, today=datetime.utcnow().date())
+    pending_reports = db.query(func.count(Report.id)).filter(
+        Report.status == ReportStatusEnum.pending
+    ).scalar()
     
     return DashboardStats(
-        total_users=total_users,
-        total_listings=total_listings,
-        active_listings=active_listings,
-        total_messages=total_messages,
-        pending_reports=pending_reports,
-        banned_users=banned_users,
-        new_users_today=new_users_today,
-        new_listings_today=new_listings_today,
-        total_trades=total_trades
+        total_users=totals["new_users"],
+        banned_users=totals["banned_users"],
+        new_users_today=totals["new_users_today"],
+        total_listings=totals["new_listings"],
+        active_listings=totals["available_listings"],
+        total_trades=totals["sold_listings"],
+        new_listings_today=totals["new_listings_today"],
+        total_messages=totals["new_messages"],
+        pending_reports=pending_reports
     )
 
 
+@router.get("/system/stats")
+def get_system_stats(admin: User = Depends(get_admin_user)):
+    """Per-worker cache, connection-pool and password-hashing statistics (this process only)."""
+    return {
+        "user_cache": user_cache.stats(),
+        "db_pool": {"sync": pool_stats(engine), "async": pool_stats(async_engine.sync_engine)},
+        "password_hashing": password_hasher.stats(),
+        "listing_cache": listing_cache.stats(),
+        "listing_views": view_counter.stats(),
+    }
+
+
 @router.get("/dashboard/activity", response_model=List[ActivityItem])
 def get_recent_activity(
     db: Session = Depends(get_db),
@@ -185,22 +203,41 @@ def get_all_users(
     
     total = query.count()
     
+    # Per-user counts come from grouped subqueries joined into the page query
+    listing_counts = db.query(
+        Listing.seller_id.label("user_id"),
+        func.count(Listing.id).label("listing_count"),
+        func.sum(case((Listing.status == "sold", 1), else_=0)).label("trades_count")
+    ).group_by(Listing.seller_id).subquery()
+    report_counts = db.query(
+        Report.reported_user_id.label("user_id"),
+        func.count(Report.id).label("reports_count")
+    ).group_by(Report.reported_user_id).subquery()
+    
+    listing_count = func.coalesce(listing_counts.c.listing_count, 0)
+    trades_count = func.coalesce(listing_counts.c.trades_count, 0)
+    reports_count = func.coalesce(report_counts.c.reports_count, 0)
+    
+    query = query.outerjoin(
+        listing_counts, listing_counts.c.user_id == User.id
+    ).outerjoin(
+        report_counts, report_counts.c.user_id == User.id
+    ).add_columns(listing_count, trades_count, reports_count)
+    
     if sort_by == "newest":
-        query = query.order_by(desc(User.created_at))
+        query = query.order_by(desc(User.created_at), desc(User.id))
     elif sort_by == "oldest":
-        query = query.order_by(User.created_at)
+        query = query.order_by(User.created_at, User.id)
     elif sort_by == "name":
-        query = query.order_by(User.name)
+        query = query.order_by(User.name, User.id)
+    elif sort_by == "trades":
+        query = query.order_by(desc(trades_count), desc(User.id))
     
     offset = (page - 1) * limit
-    users = query.offset(offset).limit(limit).all()
+    rows = query.offset(offset).limit(limit).all()
     
-    user_responses = []
-    for user in users:
-        listing_count = db.query(Listing).filter(Listing.seller_id == user.id).count()
-        reports_count = db.query(Report).filter(Report.reported_user_id == user.id).count()
-        
-        user_responses.append(AdminUserResponse(
+    user_responses = [
+        AdminUserResponse(
             id=user.id,
             email=user.email,
             name=user.name,
@@ -213,9 +250,12 @@ def get_all_users(
             ban_expires_at=user.ban_expires_at,
             created_at=user.created_at,
             last_login=user.last_login,
-            listing_count=listing_count,
-            reports_count=reports_count
-        ))
+            listing_count=user_listing_count,
+            trades_count=user_trades_count,
+            reports_count=user_reports_count
+        )
+        for user, user_listing_count, user_trades_count, user_reports_count in rows
+    ]
     
     return UserListResponse(
         users=user_responses,
@@ -236,21 +276,9 @@ def get_user_detail(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    total_listings = db.query(Listing).filter(Listing.seller_id == user_id).count()
-    active_listings = db.query(Listing).filter(
-        Listing.seller_id == user_id, Listing.status == "available"
-    ).count()
-    sold_listings = db.query(Listing).filter(
-        Listing.seller_id == user_id, Listing.status == "sold"
-    ).count()
     messages_sent = db.query(Message).filter(Message.sender_id == user_id).count()
     messages_received = db.query(Message).filter(Message.receiver_id == user_id).count()
     reviews_given = db.query(Review).filter(Review.reviewer_id == user_id).count()
-    reviews_received = db.query(Review).filter(Review.reviewed_user_id == user_id).count()
-    
-    avg_rating = db.query(func.avg(Review.rating)).filter(
-        Review.reviewed_user_id == user_id
-    ).scalar()
     
     reports_filed = db.query(Report).filter(Report.reporter_id == user_id).count()
     reports_against = db.query(Report).filter(Report.reported_user_id == user_id).count()
@@ -268,16 +296,16 @@ def get_user_detail(
         ban_expires_at=user.ban_expires_at,
         created_at=user.created_at,
         last_login=user.last_login,
-        listing_count=total_listings,
+        listing_count=user.listing_count,
         reports_count=reports_against,
-        total_listings=total_listings,
-        active_listings=active_listings,
-        sold_listings=sold_listings,
+        total_listings=user.listing_count,
+        active_listings=user.available_count,
+        sold_listings=user.sold_count,
         messages_sent=messages_sent,
         messages_received=messages_received,
         reviews_given=reviews_given,
-        reviews_received=reviews_received,
-        avg_rating=round(avg_rating, 1) if avg_rating else None,
+        reviews_received=user.rating_count,
+        avg_rating=average_rating(user),
         reports_filed=reports_filed,
         reports_against=reports_against
     )
@@ -310,9 +338,13 @@ def ban_user(
         user.ban_expires_at = None  # Permanent
     
     if ban_data.delete_listings:
-        db.query(Listing).filter(Listing.seller_id == user_id).update({"status": "hidden"})
+        # Bulk UPDATE skips the write hooks: move the derived counts around it
+        with recounted(db.connection(), Listing, Listing.seller_id == user_id, changing=("status",)):
+            db.query(Listing).filter(Listing.seller_id == user_id).update({"status": "hidden"})
     
     db.commit()
+    if ban_data.delete_listings:
+        listing_cache.invalidate()
     
     log_admin_activity(
         db, admin.id, "ban_user", "user", user_id,
@@ -368,14 +400,20 @@ def delete_user(
         raise HTTPException(status_code=403, detail="Cannot delete super admin")
     
     email = user.email
-    
-    # Delete related data
-    db.query(Message).filter(
-        (Message.sender_id == user_id) | (Message.receiver_id == user_id)
-    ).delete(synchronize_session=False)
-    db.query(Review).filter(
-        (Review.reviewer_id == user_id) | (Review.reviewed_user_id == user_id)
-    ).delete(synchronize_session=False)
+    images = [user.profile_picture] + [
+        url for row in db.query(Listing.image_url, Listing.image_url_2, Listing.image_url_3)
+        .filter(Listing.seller_id == user_id) for url in row
+    ]
+    
+    # Delete related data (bulk deletes skip the write hooks: uncount first)
+    own_messages = (Message.sender_id == user_id) | (Message.receiver_id == user_id)
+    own_reviews = (Review.reviewer_id == user_id) | (Review.reviewed_user_id == user_id)
+    count_rows(db.connection(), Message, own_messages, sign=-1)
+    count_rows(db.connection(), Review, own_reviews, sign=-1)
+    count_rows(db.connection(), Listing, Listing.seller_id == user_id, sign=-1)
+    db.query(Message).filter(own_messages).delete(synchronize_session=False)
+    forget_conversations(db, user_id=user_id)
+    db.query(Review).filter(own_reviews).delete(synchronize_session=False)
     db.query(Favorite).filter(Favorite.user_id == user_id).delete()
     db.query(Report).filter(
         (Report.reporter_id == user_id) | (Report.reported_user_id == user_id)
@@ -383,6 +421,8 @@ def delete_user(
     db.query(Listing).filter(Listing.seller_id == user_id).delete()
     db.delete(user)
     db.commit()
+    listing_cache.invalidate()
+    delete_images(db, images)
     
     log_admin_activity(
         db, admin.id, "delete_user", "user", user_id,
@@ -420,6 +460,15 @@ def change_user_role(
 
 # ============ LISTING MANAGEMENT ============
 
+# sort_by -> (sort column, descending); Listing.id breaks ties
+ADMIN_LISTING_SORT_KEYS = {
+    "newest": (Listing.created_at, True),
+    "oldest": (Listing.created_at, False),
+    "price_high": (Listing.price, True),
+    "price_low": (Listing.price, False),
+}
+
+
 @router.get("/listings", response_model=ListingListResponse)
 def get_all_listings(
     db: Session = Depends(get_db),
@@ -430,16 +479,15 @@ def get_all_listings(
     has_reports: Optional[bool] = None,
     sort_by: Optional[str] = Query("newest", pattern="^(newest|oldest|price_high|price_low|reports)$"),
     page: int = Query(1, ge=1),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ):
-    """Get all listings with filters."""
+    """Get all listings with filters. Supports ``cursor`` (keyset) paging."""
     query = db.query(Listing)
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Listing.title.ilike(search_term)) | (Listing.description.ilike(search_term))
-        )
+        query, _ = apply_search(query, db, search)
     
     if status:
         query = query.filter(Listing.status == status)
@@ -447,24 +495,28 @@ def get_all_listings(
     if category:
         query = query.filter(Listing.category == category)
     
-    total = query.count()
+    total = query.count() if include_total else None
     
-    if sort_by == "newest":
-        query = query.order_by(desc(Listing.created_at))
-    elif sort_by == "oldest":
-        query = query.order_by(Listing.created_at)
-    elif sort_by == "price_high":
-        query = query.order_by(desc(Listing.price))
-    elif sort_by == "price_low":
-        query = query.order_by(Listing.price)
+    # Sellers and report counts come with the page, like get_all_users
+    report_counts = db.query(
+        Report.listing_id.label("listing_id"),
+        func.count(Report.id).label("reports_count")
+    ).group_by(Report.listing_id).subquery()
+    query = query.options(joinedload(Listing.seller)).outerjoin(
+        report_counts, report_counts.c.listing_id == Listing.id
+    ).add_columns(func.coalesce(report_counts.c.reports_count, 0))
     
+    # "reports" has no stored sort key and keeps the default ordering
+    sort_column, descending = ADMIN_LISTING_SORT_KEYS.get(sort_by, (Listing.created_at, True))
     offset = (page - 1) * limit
-    listings = query.offset(offset).limit(limit).all()
+    rows, next_cursor = keyset_page(
+        query, db, [sort_column, Listing.id], descending, limit,
+        cursor=cursor, offset=offset
+    )
     
     listing_responses = []
-    for listing in listings:
-        seller = db.query(User).filter(User.id == listing.seller_id).first()
-        reports_count = db.query(Report).filter(Report.listing_id == listing.id).count()
+    for listing, reports_count in rows:
+        seller = listing.seller
         
         listing_responses.append(AdminListingResponse(
             id=listing.id,
@@ -491,7 +543,8 @@ def get_all_listings(
         listings=listing_responses,
         total=total,
         page=page,
-        pages=(total + limit - 1) // limit
+        pages=(total + limit - 1) // limit if total is not None else None,
+        next_cursor=next_cursor
     )
 
 
@@ -563,12 +616,17 @@ def delete_listing(
         raise HTTPException(status_code=404, detail="Listing not found")
     
     title = listing.title
+    images = [listing.image_url, listing.image_url_2, listing.image_url_3]
     
+    # Bulk delete skips the write hooks; the listing itself goes through them
+    count_rows(db.connection(), Message, Message.listing_id == listing_id, sign=-1)
     db.query(Message).filter(Message.listing_id == listing_id).delete()
+    forget_conversations(db, listing_id=listing_id)
     db.query(Favorite).filter(Favorite.listing_id == listing_id).delete()
     db.query(Report).filter(Report.listing_id == listing_id).delete()
     db.delete(listing)
     db.commit()
+    delete_images(db, images)
     
     log_admin_activity(
         db, admin.id, "delete_listing", "listing", listing_id,
@@ -605,17 +663,48 @@ def toggle_feature_listing(
 
 # ============ REPORTS MANAGEMENT ============
 
+def _report_fields(report: Report) -> dict:
+    """Response fields shared by the report list and detail views."""
+    return dict(
+        id=report.id,
+        reporter_id=report.reporter_id,
+        reporter_name=report.reporter.name if report.reporter else None,
+        reporter_email=report.reporter.email if report.reporter else "Unknown",
+        report_type=report.report_type.value if report.report_type else "unknown",
+        reported_user_id=report.reported_user_id,
+        reported_user_name=report.reported_user.name if report.reported_user else None,
+        listing_id=report.listing_id,
+        listing_title=report.listing.title if report.listing else None,
+        message_id=report.message_id,
+        reason=report.reason.value if report.reason else "other",
+        description=report.description,
+        status=report.status.value if report.status else "pending",
+        reviewed_by=report.reviewed_by,
+        reviewer_name=report.reviewer.name if report.reviewer else None,
+        admin_notes=report.admin_notes,
+        action_taken=report.action_taken,
+        created_at=report.created_at,
+        resolved_at=report.resolved_at
+    )
+
+
 @router.get("/reports", response_model=ReportListResponse)
 def get_all_reports(
     db: Session = Depends(get_db),
     admin: User = Depends(get_admin_user),
     status: Optional[str] = None,
     report_type: Optional[str] = None,
+    reason: Optional[ReportReasonEnum] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
     sort_by: Optional[str] = Query("newest", pattern="^(newest|oldest)$"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100)
 ):
-    """Get all reports with filters."""
+    """
+    Get all reports with filters. date_from/date_to are inclusive days
+    on the report's creation date.
+    """
     query = db.query(Report)
     
     if status:
@@ -624,47 +713,35 @@ def get_all_reports(
     if report_type:
         query = query.filter(Report.report_type == report_type)
     
+    if reason:
+        query = query.filter(Report.reason == reason)
+    
+    if date_from:
+        query = query.filter(Report.created_at >= datetime.combine(date_from, datetime.min.time()))
+    
+    if date_to:
+        query = query.filter(Report.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    
     total = query.count()
     
     if sort_by == "newest":
-        query = query.order_by(desc(Report.created_at))
+        query = query.order_by(desc(Report.created_at), desc(Report.id))
     else:
-        query = query.order_by(Report.created_at)
+        query = query.order_by(Report.created_at, Report.id)
+    
+    # People and listing come from the same query via aliased LEFT JOINs
+    query = query.options(
+        joinedload(Report.reporter),
+        joinedload(Report.reported_user),
+        joinedload(Report.listing),
+        joinedload(Report.reviewer)
+    )
     
     offset = (page - 1) * limit
     reports = query.offset(offset).limit(limit).all()
     
-    report_responses = []
-    for report in reports:
-        reporter = db.query(User).filter(User.id == report.reporter_id).first()
-        reported_user = db.query(User).filter(User.id == report.reported_user_id).first() if report.reported_user_id else None
-        listing = db.query(Listing).filter(Listing.id == report.listing_id).first() if report.listing_id else None
-        reviewer = db.query(User).filter(User.id == report.reviewed_by).first() if report.reviewed_by else None
-        
-        report_responses.append(ReportResponse(
-            id=report.id,
-            reporter_id=report.reporter_id,
-            reporter_name=reporter.name if reporter else None,
-            reporter_email=reporter.email if reporter else "Unknown",
-            report_type=report.report_type.value if report.report_type else "unknown",
-            reported_user_id=report.reported_user_id,
-            reported_user_name=reported_user.name if reported_user else None,
-            listing_id=report.listing_id,
-            listing_title=listing.title if listing else None,
-            message_id=report.message_id,
-            reason=report.reason.value if report.reason else "other",
-            description=report.description,
-            status=report.status.value if report.status else "pending",
-            reviewed_by=report.reviewed_by,
-            reviewer_name=reviewer.name if reviewer else None,
-            admin_notes=report.admin_notes,
-            action_taken=report.action_taken,
-            created_at=report.created_at,
-            resolved_at=report.resolved_at
-        ))
-    
     return ReportListResponse(
-        reports=report_responses,
+        reports=[ReportResponse(**_report_fields(report)) for report in reports],
         total=total,
         page=page,
         pages=(total + limit - 1) // limit
@@ -678,27 +755,31 @@ def get_report_detail(
     admin: User = Depends(get_admin_user)
 ):
     """Get detailed report information."""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = db.query(Report).options(
+        joinedload(Report.reporter),
+        joinedload(Report.reported_user),
+        joinedload(Report.listing).joinedload(Listing.seller),
+        joinedload(Report.reviewer)
+    ).filter(Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    reporter = db.query(User).filter(User.id == report.reporter_id).first()
-    reported_user = db.query(User).filter(User.id == report.reported_user_id).first() if report.reported_user_id else None
-    listing = db.query(Listing).filter(Listing.id == report.listing_id).first() if report.listing_id else None
-    reviewer = db.query(User).filter(User.id == report.reviewed_by).first() if report.reviewed_by else None
-    
-    reporter_total_reports = db.query(Report).filter(Report.reporter_id == report.reporter_id).count()
-    reporter_valid_reports = db.query(Report).filter(
-        Report.reporter_id == report.reporter_id,
-        Report.status == ReportStatusEnum.resolved
-    ).count()
-    reported_user_total_reports = db.query(Report).filter(
-        Report.reported_user_id == report.reported_user_id
-    ).count() if report.reported_user_id else 0
-    
+    # Reporter and reported-user history in one pass over their reports
+    by_reporter = Report.reporter_id == report.reporter_id
+    against_reported = (
+        Report.reported_user_id == report.reported_user_id if report.reported_user_id else false()
+    )
+    history = db.query(
+        func.count(case((by_reporter, 1))),
+        func.count(case((and_(by_reporter, Report.status == ReportStatusEnum.resolved), 1))),
+        func.count(case((against_reported, 1)))
+    ).filter(or_(by_reporter, against_reported)).one()
+    reporter_total_reports, reporter_valid_reports, reported_user_total_reports = history
+    
+    listing = report.listing
     listing_response = None
     if listing:
-        seller = db.query(User).filter(User.id == listing.seller_id).first()
+        seller = listing.seller
         listing_response = AdminListingResponse(
             id=listing.id,
             title=listing.title,
@@ -721,25 +802,7 @@ def get_report_detail(
         )
     
     return ReportDetailResponse(
-        id=report.id,
-        reporter_id=report.reporter_id,
-        reporter_name=reporter.name if reporter else None,
-        reporter_email=reporter.email if reporter else "Unknown",
-        report_type=report.report_type.value if report.report_type else "unknown",
-        reported_user_id=report.reported_user_id,
-        reported_user_name=reported_user.name if reported_user else None,
-        listing_id=report.listing_id,
-        listing_title=listing.title if listing else None,
-        message_id=report.message_id,
-        reason=report.reason.value if report.reason else "other",
-        description=report.description,
-        status=report.status.value if report.status else "pending",
-        reviewed_by=report.reviewed_by,
-        reviewer_name=reviewer.name if reviewer else None,
-        admin_notes=report.admin_notes,
-        action_taken=report.action_taken,
-        created_at=report.created_at,
-        resolved_at=report.resolved_at,
+        **_report_fields(report),
         reporter_total_reports=reporter_total_reports,
         reporter_valid_reports=reporter_valid_reports,
         reported_user_total_reports=reported_user_total_reports,
@@ -781,101 +844,66 @@ def review_report(
 
 # ============ ANALYTICS ============
 
+def _check_window(days: int):
+    if days not in ANALYTICS_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"days must be one of {', '.join(map(str, ANALYTICS_WINDOWS))}"
+        )
+
+
 @router.get("/analytics/users", response_model=UserAnalytics)
 def get_user_analytics(
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: User = Depends(get_admin_user),
+    days: int = Query(30, description="Length of users_by_day: 7, 30, 90 or 365")
 ):
     """Get user analytics."""
+    _check_window(days)
     today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    week_ago = today_start - timedelta(days=7)
-    month_ago = today_start - timedelta(days=30)
-    
-    total_users = db.query(User).count()
-    new_users_today = db.query(User).filter(User.created_at >= today_start).count()
-    new_users_week = db.query(User).filter(User.created_at >= week_ago).count()
-    new_users_month = db.query(User).filter(User.created_at >= month_ago).count()
-    active_users_today = db.query(User).filter(User.last_login >= today_start).count()
-    banned_users = db.query(User).filter(User.is_banned == True).count()
-    
-    # Users by day for last 30 days
-    users_by_day = []
-    for i in range(30):
-        day = today - timedelta(days=i)
-        day_start = datetime.combine(day, datetime.min.time())
-        day_end = day_start + timedelta(days=1)
-        count = db.query(User).filter(
-            User.created_at >= day_start,
-            User.created_at < day_end
-        ).count()
-        users_by_day.append({"date": day.isoformat(), "count": count})
-    
-    users_by_day.reverse()
+    totals = rollup_totals(db, today=today, week=today - timedelta(days=7), month=today - timedelta(days=30))
+    active_users_today = db.query(func.count(User.id)).filter(User.last_login >= today_start()).scalar()
     
     return UserAnalytics(
-        total_users=total_users,
-        new_users_today=new_users_today,
-        new_users_week=new_users_week,
-        new_users_month=new_users_month,
+        total_users=totals["new_users"],
+        new_users_today=totals["new_users_today"],
+        new_users_week=totals["new_users_week"],
+        new_users_month=totals["new_users_month"],
         active_users_today=active_users_today,
-        banned_users=banned_users,
-        users_by_day=users_by_day
+        banned_users=totals["banned_users"],
+        users_by_day=rollup_series(db, "new_users", days)
     )
 
 
 @router.get("/analytics/listings", response_model=ListingAnalytics)
 def get_listing_analytics(
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: User = Depends(get_admin_user),
+    days: int = Query(30, description="Length of listings_by_day: 7, 30, 90 or 365")
 ):
     """Get listing analytics."""
+    _check_window(days)
     today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    week_ago = today_start - timedelta(days=7)
-    
-    total_listings = db.query(Listing).count()
-    active_listings = db.query(Listing).filter(Listing.status == "available").count()
-    sold_listings = db.query(Listing).filter(Listing.status == "sold").count()
-    hidden_listings = db.query(Listing).filter(Listing.status == "hidden").count()
-    new_listings_today = db.query(Listing).filter(Listing.created_at >= today_start).count()
-    new_listings_week = db.query(Listing).filter(Listing.created_at >= week_ago).count()
+    totals = rollup_totals(db, today=today, week=today - timedelta(days=7))
     
-    # Listings by category
+    # Count and average price per category in one grouped pass
     categories = db.query(
-        Listing.category, func.count(Listing.id).label('count')
-    ).group_by(Listing.category).all()
-    listings_by_category = [{"category": c[0], "count": c[1]} for c in categories]
-    
-    # Average price by category
-    avg_prices = db.query(
-        Listing.category, func.avg(Listing.price).label('avg_price')
+        Listing.category,
+        func.count(Listing.id).label('count'),
+        func.avg(Listing.price).label('avg_price')
     ).group_by(Listing.category).all()
-    avg_price_by_category = [{"category": a[0], "avg_price": round(a[1], 2)} for a in avg_prices]
-    
-    # Listings by day
-    listings_by_day = []
-    for i in range(30):
-        day = today - timedelta(days=i)
-        day_start = datetime.combine(day, datetime.min.time())
-        day_end = day_start + timedelta(days=1)
-        count = db.query(Listing).filter(
-            Listing.created_at >= day_start,
-            Listing.created_at < day_end
-        ).count()
-        listings_by_day.append({"date": day.isoformat(), "count": count})
-    
-    listings_by_day.reverse()
+    listings_by_category = [{"category": c.category, "count": c.count} for c in categories]
+    avg_price_by_category = [{"category": c.category, "avg_price": round(c.avg_price, 2)} for c in categories]
     
     return ListingAnalytics(
-        total_listings=total_listings,
-        active_listings=active_listings,
-        sold_listings=sold_listings,
-        hidden_listings=hidden_listings,
-        new_listings_today=new_listings_today,
-        new_listings_week=new_listings_week,
+        total_listings=totals["new_listings"],
+        active_listings=totals["available_listings"],
+        sold_listings=totals["sold_listings"],
+        hidden_listings=totals["hidden_listings"],
+        new_listings_today=totals["new_listings_today"],
+        new_listings_week=totals["new_listings_week"],
         listings_by_category=listings_by_category,
-        listings_by_day=listings_by_day,
+        listings_by_day=rollup_series(db, "new_listings", days),
         avg_price_by_category=avg_price_by_category
     )
 
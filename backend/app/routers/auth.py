@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models import User
 from ..schemas import (
     UserCreate, 
@@ -11,19 +13,18 @@ from ..schemas import (
     GoogleAuthRequest
 )
 from ..services.auth import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     validate_email_domain,
     verify_google_token,
     get_current_user
 )
+from ..services.passwords import password_hasher
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
     Only @apsit.edu.in emails are allowed.
@@ -36,7 +37,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User.id).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -44,7 +45,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -53,8 +54,8 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Create access token
     access_token = create_access_token(data={"sub": str(new_user.id)})
@@ -67,12 +68,12 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password.
     """
     # Find user
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await db.scalar(select(User).where(User.email == user_data.email))
     
     if not user or not user.hashed_password:
         raise HTTPException(
@@ -81,7 +82,7 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(user_data.password, user.hashed_password):
+    if not await password_hasher.verify(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -94,6 +95,11 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="Your account has been banned"
         )
     
+    # Upgrade the hash if the bcrypt cost factor has changed since it was made
+    if password_hasher.needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(user_data.password)
+        await db.commit()
+    
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
     
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, asc, or_
+from sqlalchemy import desc, func, select
 from typing import List, Optional
 import json
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models import User, Listing, Favorite
 from ..schemas import (
     ListingCreate,
@@ -13,31 +14,61 @@ from ..schemas import (
     ListingListResponse,
     FavoriteResponse
 )
-from ..services.auth import get_current_user, get_optional_user
-from ..services.upload import upload_image, delete_image
+from ..services.auth import get_current_user, get_optional_user, get_optional_user_async
+from ..services.upload import upload_images, delete_images, delete_images_async, release_images_async
+from ..services.listing_cache import listing_cache
+from ..services.view_counter import view_counter
+from ..services.search import apply_search
+from ..services.pagination import keyset_list, keyset_page_async
 
 router = APIRouter(prefix="/listings", tags=["Listings"])
 
+# sort_by -> (sort column, descending); Listing.id breaks ties
+LISTING_SORT_KEYS = {
+    "newest": (Listing.created_at, True),
+    "relevance": (Listing.created_at, True),
+    "oldest": (Listing.created_at, False),
+    "price_low": (Listing.price, False),
+    "price_high": (Listing.price, True),
+}
+
 
 @router.get("", response_model=ListingListResponse)
-def get_listings(
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user),
+async def get_listings(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[User] = Depends(get_optional_user_async),
     category: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     condition: Optional[str] = None,
     search: Optional[str] = None,
-    sort_by: Optional[str] = Query("newest", pattern="^(newest|oldest|price_low|price_high)$"),
+    sort_by: Optional[str] = Query("newest", pattern="^(newest|oldest|price_low|price_high|relevance)$"),
     page: int = Query(1, ge=1),
-    limit: int = Query(12, ge=1, le=50)
+    limit: int = Query(12, ge=1, le=50),
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ):
     """
     Get all listings with optional filters and pagination.
+    ``sort_by=relevance`` ranks full-text matches for ``search`` first.
+    Pass the returned ``next_cursor`` back as ``cursor`` to seek to the next
+    page without an OFFSET; ``include_total=false`` skips the COUNT query.
+    Anonymous pages are served from listing_cache, with an ETag.
     """
-    query = db.query(Listing).filter(
-        Listing.status == "available"
-    ).options(joinedload(Listing.seller))
+    cache_key = None
+    if current_user is None:
+        cache_key = listing_cache.key(
+            category=category, min_price=min_price, max_price=max_price, condition=condition,
+            search=search.strip() if search else None, sort_by=sort_by, page=page, limit=limit,
+            cursor=cursor, include_total=include_total
+        )
+        cached = listing_cache.get(cache_key)
+        if cached is not None:
+            return _cached_page(request, *cached)
+        generation = listing_cache.generation()
+    
+    query = select(Listing).filter(Listing.status == "available")
     
     # Apply filters
     if category:
@@ -52,40 +83,45 @@ def get_listings(
     if condition:
         query = query.filter(Listing.condition == condition)
     
+    search_rank = None
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Listing.title.ilike(search_term),
-                Listing.description.ilike(search_term)
-            )
-        )
-    
-    # Get total count before pagination
-    total = query.count()
+        query, search_rank = apply_search(query, db, search)
     
-    # Apply sorting
-    if sort_by == "newest":
-        query = query.order_by(desc(Listing.created_at))
-    elif sort_by == "oldest":
-        query = query.order_by(asc(Listing.created_at))
-    elif sort_by == "price_low":
-        query = query.order_by(asc(Listing.price))
-    elif sort_by == "price_high":
-        query = query.order_by(desc(Listing.price))
+    # Get total count before pagination (infinite scroll can skip it)
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
-    # Apply pagination
+    # Apply sorting and pagination
+    query = query.options(joinedload(Listing.seller))
     offset = (page - 1) * limit
-    listings = query.offset(offset).limit(limit).all()
+    if sort_by == "relevance" and search_rank is not None:
+        # Rank is computed per query, so relevance can only page by offset
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not supported for relevance sorting"
+            )
+        query = query.order_by(search_rank, desc(Listing.created_at), desc(Listing.id))
+        result = await db.execute(query.offset(offset).limit(limit))
+        listings = result.unique().scalars().all()
+        next_cursor = None
+    else:
+        sort_column, descending = LISTING_SORT_KEYS[sort_by]
+        listings, next_cursor = await keyset_page_async(
+            query, db, [sort_column, Listing.id], descending, limit,
+            cursor=cursor, offset=offset
+        )
     
     # Check if listings are favorited by current user
     favorite_listing_ids = set()
-    if current_user:
-        favorites = db.query(Favorite).filter(
-            Favorite.user_id == current_user.id,
-            Favorite.listing_id.in_([l.id for l in listings])
-        ).all()
-        favorite_listing_ids = {f.listing_id for f in favorites}
+    if current_user and listings:
+        favorite_listing_ids = set(await db.scalars(
+            select(Favorite.listing_id).filter(
+                Favorite.user_id == current_user.id,
+                Favorite.listing_id.in_([l.id for l in listings])
+            )
+        ))
     
     # Build response
     listing_responses = []
@@ -94,12 +130,40 @@ def get_listings(
         response.is_favorited = listing.id in favorite_listing_ids
         listing_responses.append(response)
     
-    return ListingListResponse(
+    result = ListingListResponse(
         listings=listing_responses,
         total=total,
         page=page,
-        pages=(total + limit - 1) // limit
+        pages=(total + limit - 1) // limit if total is not None else None,
+        next_cursor=next_cursor
     )
+    if cache_key is None:
+        return result
+    
+    body = result.model_dump_json().encode()
+    return _cached_page(request, listing_cache.put(cache_key, body, generation), body)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """True if an If-None-Match header names ``etag`` (weakly compared) or is ``*``."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _cached_page(request: Request, etag: str, body: bytes) -> Response:
+    """An anonymous listing page, or 304 if the client already has this version."""
+    headers = {
+        "ETag": etag,
+        # Browsers and proxies revalidate each time; the answer is usually a 304
+        "Cache-Control": "public, no-cache",
+        "Vary": "Authorization",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/{listing_id}", response_model=ListingResponse)
@@ -121,11 +185,11 @@ def get_listing(
             detail="Listing not found"
         )
     
-    # Increment view count
-    listing.views += 1
-    db.commit()
+    # Counted in memory and written in batches: a detail view stays a read
+    view_counter.record(listing_id)
     
     response = ListingResponse.model_validate(listing)
+    response.views = (listing.views or 0) + view_counter.pending(listing_id)
     
     # Check if favorited
     if current_user:
@@ -161,19 +225,8 @@ async def create_listing(
             detail="At least one image is required"
         )
     
-    # Upload images
-    images = []
-    for img in [image1, image2, image3]:
-        if img:
-            url = await upload_image(img, folder="listings")
-            if url:
-                images.append(url)
-    
-    if not images:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to upload images"
-        )
+    # Upload images (concurrently; nothing is kept if any of them fails)
+    images = [url for url in await upload_images(db, [image1, image2, image3], folder="listings") if url]
     
     # Create listing
     listing = Listing(
@@ -189,7 +242,13 @@ async def create_listing(
     )
     
     db.add(listing)
-    db.commit()
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        await delete_images_async(db, images, uploaded=True)
+        raise
+    await release_images_async(db, images)
     db.refresh(listing)
     
     # Load seller relationship
@@ -246,24 +305,23 @@ async def update_listing(
     if listing_status:
         listing.status = listing_status
     
-    # Handle image updates
-    if image1:
-        # Delete old image
-        if listing.image_url:
-            delete_image(listing.image_url)
-        listing.image_url = await upload_image(image1, folder="listings")
-    
-    if image2:
-        if listing.image_url_2:
-            delete_image(listing.image_url_2)
-        listing.image_url_2 = await upload_image(image2, folder="listings")
-    
-    if image3:
-        if listing.image_url_3:
-            delete_image(listing.image_url_3)
-        listing.image_url_3 = await upload_image(image3, folder="listings")
+    # Handle image updates: upload the new ones concurrently, and only
+    # delete the images they replace once the change is committed
+    new_images = await upload_images(db, [image1, image2, image3], folder="listings")
+    replaced = []
+    for attr, url in zip(("image_url", "image_url_2", "image_url_3"), new_images):
+        if url:
+            replaced.append(getattr(listing, attr))
+            setattr(listing, attr, url)
     
-    db.commit()
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        await delete_images_async(db, new_images, uploaded=True)
+        raise
+    await release_images_async(db, new_images)
+    await delete_images_async(db, replaced)
     db.refresh(listing)
     
     # Load seller relationship
@@ -297,30 +355,38 @@ def delete_listing(
             detail="Not authorized to delete this listing"
         )
     
-    # Delete images
-    for img_url in [listing.image_url, listing.image_url_2, listing.image_url_3]:
-        if img_url:
-            delete_image(img_url)
-    
+    images = [listing.image_url, listing.image_url_2, listing.image_url_3]
     db.delete(listing)
     db.commit()
+    
+    # Delete images no other listing or profile shares
+    delete_images(db, images)
 
 
 @router.get("/user/me", response_model=List[ListingResponse])
 def get_my_listings(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all listings created by the current user.
+    Get the listings created by the current user, newest first. Pass the
+    X-Next-Cursor response header back as ``cursor`` for the next page;
+    ``format=ndjson`` streams them all instead.
     """
-    listings = db.query(Listing).options(
+    query = db.query(Listing).options(
         joinedload(Listing.seller)
     ).filter(
         Listing.seller_id == current_user.id
-    ).order_by(desc(Listing.created_at)).all()
+    )
     
-    return [ListingResponse.model_validate(l) for l in listings]
+    return keyset_list(
+        query, db, [Listing.created_at, Listing.id], True, ListingResponse.model_validate,
+        response, limit, cursor, output_format
+    )
 
 
 @router.post("/{listing_id}/favorite", response_model=FavoriteResponse)
@@ -382,28 +448,29 @@ def remove_favorite(
 
 @router.get("/favorites/me", response_model=List[ListingResponse])
 def get_my_favorites(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all favorited listings for the current user.
+    Get the current user's favorited listings, most recently saved first
+    (paged like /listings/user/me).
     """
-    favorites = db.query(Favorite).filter(
-        Favorite.user_id == current_user.id
-    ).all()
-    
-    listing_ids = [f.listing_id for f in favorites]
-    
-    listings = db.query(Listing).options(
-        joinedload(Listing.seller)
+    query = db.query(Favorite).options(
+        joinedload(Favorite.listing).joinedload(Listing.seller)
     ).filter(
-        Listing.id.in_(listing_ids)
-    ).all()
+        Favorite.user_id == current_user.id
+    )
     
-    responses = []
-    for listing in listings:
-        response = ListingResponse.model_validate(listing)
-        response.is_favorited = True
-        responses.append(response)
+    def favorited(favorite: Favorite) -> ListingResponse:
+        listing = ListingResponse.model_validate(favorite.listing)
+        listing.is_favorited = True
+        return listing
     
-    return responses
+    return keyset_list(
+        query, db, [Favorite.created_at, Favorite.id], True, favorited,
+        response, limit, cursor, output_format
+    )
@@ -1,75 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, or_, and_
+from sqlalchemy import select
 from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models import User, Message, Listing
 from ..schemas import MessageCreate, MessageResponse, ConversationResponse
-from ..services.auth import get_current_user
+from ..services.auth import get_current_user, get_current_user_async, authenticate_token
+from ..services.events import event_bus, user_channel
+from ..services.conversations import (
+    conversation_id, conversation_summaries, mark_read, mark_message_read as mark_one_read
+)
 
 router = APIRouter(prefix="/messages", tags=["Messages"])
 
+# Idle connections get a heartbeat so proxies don't time them out
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _publish_read(reader_id: int, sender_id: int, listing_id: Optional[int]):
+    """Tell both sides of a conversation that the reader caught up."""
+    event = {
+        "type": "message.read",
+        "reader_id": reader_id,
+        "sender_id": sender_id,
+        "listing_id": listing_id,
+    }
+    event_bus.publish(user_channel(reader_id), event)
+    event_bus.publish(user_channel(sender_id), event)
+
 
 @router.get("/conversations", response_model=List[ConversationResponse])
-def get_conversations(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_conversations(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=100)
 ):
     """
-    Get all conversations for the current user.
+    Get conversations for the current user, most recent first.
     A conversation is a unique pairing of sender/receiver for a specific listing.
     """
-    # Get all messages where user is sender or receiver
-    messages = db.query(Message).filter(
-        or_(
-            Message.sender_id == current_user.id,
-            Message.receiver_id == current_user.id
-        )
-    ).options(
-        joinedload(Message.listing),
-        joinedload(Message.sender),
-        joinedload(Message.receiver)
-    ).order_by(desc(Message.created_at)).all()
-    
-    # Group by conversation (unique combo of other_user and listing)
-    conversations_dict = {}
+    rows = (await db.execute(
+        conversation_summaries(current_user.id, limit, (page - 1) * limit)
+    )).all()
     
-    for msg in messages:
-        # Determine the other user in the conversation
-        other_user = msg.receiver if msg.sender_id == current_user.id else msg.sender
-        other_user_id = other_user.id
-        listing_id = msg.listing_id
-        
-        key = (other_user_id, listing_id)
-        
-        if key not in conversations_dict:
-            # Count unread messages in this conversation
-            unread_count = db.query(Message).filter(
-                Message.listing_id == listing_id,
-                Message.receiver_id == current_user.id,
-                Message.sender_id == other_user_id,
-                Message.is_read == False
-            ).count()
-            
-            conversations_dict[key] = ConversationResponse(
-                other_user_id=other_user_id,
-                other_user_name=other_user.name or other_user.email.split('@')[0],
-                other_user_profile_picture=other_user.profile_picture,
-                listing_id=listing_id,
-                listing_title=msg.listing.title if msg.listing else "Deleted Listing",
-                listing_image=msg.listing.image_url if msg.listing else None,
-                last_message=msg.content,
-                last_message_time=msg.created_at,
-                unread_count=unread_count
-            )
-    
-    # Return conversations sorted by last message time (most recent first)
-    return sorted(
-        conversations_dict.values(),
-        key=lambda x: x.last_message_time,
-        reverse=True
-    )
+    return [
+        ConversationResponse(
+            other_user_id=other_user.id,
+            other_user_name=other_user.name or other_user.email.split('@')[0],
+            other_user_profile_picture=other_user.profile_picture,
+            listing_id=msg.listing_id,
+            listing_title=listing.title if listing else "Deleted Listing",
+            listing_image=listing.image_url if listing else None,
+            last_message=msg.content,
+            last_message_time=msg.created_at,
+            unread_count=unread_count or 0
+        )
+        for msg, other_user, listing, unread_count in rows
+    ]
 
 
 @router.get("/conversation/{other_user_id}/{listing_id}", response_model=List[MessageResponse])
@@ -79,10 +74,15 @@ def get_conversation_messages(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     page: int = Query(1, ge=1),
-    limit: int = Query(50, ge=1, le=100)
+    limit: int = Query(50, ge=1, le=100),
+    before: Optional[int] = Query(None, ge=1)
 ):
     """
-    Get all messages in a specific conversation.
+    Get one page of a conversation, oldest message first.
+    Without ``before`` this is the latest ``limit`` messages (``page`` steps
+    further back); pass the id of the oldest message shown as ``before`` to
+    seek to the ones before it. Opening the latest page marks the other
+    side's messages as read.
     """
     # Verify users and listing exist
     other_user = db.query(User).filter(User.id == other_user_id).first()
@@ -92,27 +92,45 @@ def get_conversation_messages(
             detail="User not found"
         )
     
-    # Get messages in this conversation
-    messages = db.query(Message).filter(
-        Message.listing_id == listing_id,
-        or_(
-            and_(Message.sender_id == current_user.id, Message.receiver_id == other_user_id),
-            and_(Message.sender_id == other_user_id, Message.receiver_id == current_user.id)
-        )
+    # Mark the other side's messages as read in one statement
+    if before is None and page == 1 and mark_read(db, current_user.id, other_user_id, listing_id):
+        db.commit()
+        _publish_read(current_user.id, other_user_id, listing_id)
+    
+    # Newest first through the conversation's (conversation_id, id) index
+    query = db.query(Message).filter(
+        Message.conversation_id == conversation_id(current_user.id, other_user_id, listing_id)
     ).options(
         joinedload(Message.sender),
         joinedload(Message.receiver)
-    ).order_by(Message.created_at).all()
-    
-    # Mark messages as read
-    unread_messages = [m for m in messages if m.receiver_id == current_user.id and not m.is_read]
-    for msg in unread_messages:
-        msg.is_read = True
+    ).order_by(Message.id.desc())
+    if before is not None:
+        query = query.filter(Message.id < before)
+    else:
+        query = query.offset((page - 1) * limit)
+    messages = query.limit(limit).all()
     
-    if unread_messages:
+    return [MessageResponse.model_validate(m) for m in reversed(messages)]
+
+
+@router.post("/conversation/{other_user_id}/{listing_id}/read")
+def mark_conversation_read(
+    other_user_id: int,
+    listing_id: int,
+    up_to: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Mark the other side's messages in a conversation as read, only up to
+    message id ``up_to`` if given, with one UPDATE.
+    """
+    count = mark_read(db, current_user.id, other_user_id, listing_id, up_to_id=up_to)
+    if count:
         db.commit()
+        _publish_read(current_user.id, other_user_id, listing_id)
     
-    return [MessageResponse.model_validate(m) for m in messages]
+    return {"marked_read": count}
 
 
 @router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
@@ -165,23 +183,29 @@ def send_message(
         joinedload(Message.receiver)
     ).filter(Message.id == message.id).first()
     
-    return MessageResponse.model_validate(message)
+    response = MessageResponse.model_validate(message)
+    
+    # Push to the receiver and to the sender's other open tabs
+    event = {"type": "message.created", "message": response.model_dump(mode="json")}
+    event_bus.publish(user_channel(message.receiver_id), event)
+    event_bus.publish(user_channel(message.sender_id), event)
+    
+    return response
 
 
 @router.get("/unread/count")
-def get_unread_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Get count of unread messages for the current user.
     """
-    count = db.query(Message).filter(
-        Message.receiver_id == current_user.id,
-        Message.is_read == False
-    ).count()
-    
-    return {"unread_count": count}
+    # Always read the counter: cached users do not carry it
+    unread_count = await db.scalar(
+        select(User.unread_messages_count).where(User.id == current_user.id)
+    )
+    return {"unread_count": unread_count}
 
 
 @router.put("/{message_id}/read")
@@ -207,7 +231,94 @@ def mark_message_read(
             detail="Not authorized to mark this message as read"
         )
     
-    message.is_read = True
-    db.commit()
+    if mark_one_read(db, message):
+        db.commit()
+        _publish_read(current_user.id, message.sender_id, message.listing_id)
     
     return {"message": "Message marked as read"}
+
+
+# ============ REAL-TIME PUSH ============
+
+async def _stream_user(token: Optional[str], db: Session) -> Optional[User]:
+    """Authenticate a long-lived connection, then release its DB connection."""
+    if not token:
+        return None
+    try:
+        return await run_in_threadpool(authenticate_token, token, db)
+    finally:
+        db.close()
+
+
+@router.websocket("/ws")
+async def message_socket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Push new-message and read-receipt events to the connected user.
+    Browsers cannot set headers on WebSockets, so the JWT goes in ?token=.
+    """
+    user = await _stream_user(token, db)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    async with event_bus.subscribe(user_channel(user.id)) as subscription:
+        await websocket.accept()
+        
+        async def forward_events():
+            while True:
+                event = await subscription.get()
+                await websocket.send_json(event)
+        
+        async def wait_for_disconnect():
+            # Clients don't need to send anything; this just notices them leave
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+        
+        tasks = [asyncio.create_task(forward_events()), asyncio.create_task(wait_for_disconnect())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+@router.get("/stream")
+async def message_stream(
+    request: Request,
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db)
+):
+    """
+    Server-Sent Events fallback for clients that cannot open a WebSocket.
+    Accepts a Bearer header or ?token= (EventSource cannot set headers).
+    """
+    user = await _stream_user(credentials.credentials if credentials else token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    
+    async def event_source():
+        async with event_bus.subscribe(user_channel(user.id)) as subscription:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional
 
 from ..database import get_db
 from ..models import User, Listing, Review
 from ..schemas import ReviewCreate, ReviewResponse
 from ..services.auth import get_current_user
+from ..services.pagination import keyset_list
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
+# Newest first; Review.id breaks ties
+REVIEW_ORDER = [Review.created_at, Review.id]
+
 
 @router.post("", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 def create_review(
@@ -81,10 +85,16 @@ def create_review(
 @router.get("/listing/{listing_id}", response_model=List[ReviewResponse])
 def get_listing_reviews(
     listing_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db)
 ):
     """
-    Get all reviews associated with a listing.
+    Get the reviews associated with a listing, newest first. Pass the
+    X-Next-Cursor response header back as ``cursor`` for the next page;
+    ``format=ndjson`` streams them all instead.
     """
     listing = db.query(Listing).filter(Listing.id == listing_id).first()
     if not listing:
@@ -93,50 +103,66 @@ def get_listing_reviews(
             detail="Listing not found"
         )
     
-    reviews = db.query(Review).options(
+    query = db.query(Review).options(
         joinedload(Review.reviewer),
         joinedload(Review.reviewed_user)
     ).filter(
         Review.listing_id == listing_id
-    ).all()
+    )
     
-    return [ReviewResponse.model_validate(r) for r in reviews]
+    return keyset_list(
+        query, db, REVIEW_ORDER, True, ReviewResponse.model_validate, response, limit, cursor, output_format
+    )
 
 
 @router.get("/my-reviews", response_model=List[ReviewResponse])
 def get_my_reviews(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all reviews the current user has received.
+    Get the reviews the current user has received, newest first
+    (paged like /reviews/listing/{id}).
     """
-    reviews = db.query(Review).options(
+    query = db.query(Review).options(
         joinedload(Review.reviewer),
         joinedload(Review.listing)
     ).filter(
         Review.reviewed_user_id == current_user.id
-    ).all()
+    )
     
-    return [ReviewResponse.model_validate(r) for r in reviews]
+    return keyset_list(
+        query, db, REVIEW_ORDER, True, ReviewResponse.model_validate, response, limit, cursor, output_format
+    )
 
 
 @router.get("/given", response_model=List[ReviewResponse])
 def get_given_reviews(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all reviews the current user has given.
+    Get the reviews the current user has given, newest first (paged like
+    /reviews/listing/{id}).
     """
-    reviews = db.query(Review).options(
+    query = db.query(Review).options(
         joinedload(Review.reviewed_user),
         joinedload(Review.listing)
     ).filter(
         Review.reviewer_id == current_user.id
-    ).all()
+    )
     
-    return [ReviewResponse.model_validate(r) for r in reviews]
+    return keyset_list(
+        query, db, REVIEW_ORDER, True, ReviewResponse.model_validate, response, limit, cursor, output_format
+    )
 
 
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File, Form
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
 from typing import Optional, List
 
 from ..database import get_db
 from ..models import User, Listing, Review
-from ..schemas import UserUpdate, UserResponse, UserProfileResponse, ReviewResponse
-from ..services.auth import get_current_user, get_password_hash, verify_password
-from ..services.upload import upload_image, delete_image
+from ..schemas import UserUpdate, UserResponse, UserProfileResponse, ListingResponse, ReviewResponse
+from ..services.auth import get_current_user
+from ..services.pagination import keyset_list
+from ..services.passwords import password_hasher
+from ..services.upload import upload_image, delete_images_async, release_images_async
+from ..services.user_counters import average_rating
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -20,26 +22,6 @@ def get_my_profile(
     """
     Get current user's full profile with stats.
     """
-    # Get listing count
-    listing_count = db.query(Listing).filter(
-        Listing.seller_id == current_user.id
-    ).count()
-    
-    # Get total listings sold
-    sold_count = db.query(Listing).filter(
-        Listing.seller_id == current_user.id,
-        Listing.status == "sold"
-    ).count()
-    
-    # Get reviews received
-    reviews = db.query(Review).filter(
-        Review.reviewed_user_id == current_user.id
-    ).all()
-    
-    avg_rating = None
-    if reviews:
-        avg_rating = sum(r.rating for r in reviews) / len(reviews)
-    
     return UserProfileResponse(
         id=current_user.id,
         email=current_user.email,
@@ -47,10 +29,10 @@ def get_my_profile(
         phone=current_user.phone,
         profile_picture=current_user.profile_picture,
         created_at=current_user.created_at,
-        listing_count=listing_count,
-        sold_count=sold_count,
-        avg_rating=round(avg_rating, 1) if avg_rating else None,
-        review_count=len(reviews)
+        listing_count=current_user.listing_count,
+        sold_count=current_user.sold_count,
+        avg_rating=average_rating(current_user),
+        review_count=current_user.rating_count
     )
 
 
@@ -70,27 +52,6 @@ def get_user_profile(
             detail="User not found"
         )
     
-    # Get listing count
-    listing_count = db.query(Listing).filter(
-        Listing.seller_id == user_id,
-        Listing.status == "available"
-    ).count()
-    
-    # Get total listings sold
-    sold_count = db.query(Listing).filter(
-        Listing.seller_id == user_id,
-        Listing.status == "sold"
-    ).count()
-    
-    # Get reviews received
-    reviews = db.query(Review).filter(
-        Review.reviewed_user_id == user_id
-    ).all()
-    
-    avg_rating = None
-    if reviews:
-        avg_rating = sum(r.rating for r in reviews) / len(reviews)
-    
     return UserProfileResponse(
         id=user.id,
         email=user.email,
@@ -98,10 +59,10 @@ def get_user_profile(
         phone=user.phone,
         profile_picture=user.profile_picture,
         created_at=user.created_at,
-        listing_count=listing_count,
-        sold_count=sold_count,
-        avg_rating=round(avg_rating, 1) if avg_rating else None,
-        review_count=len(reviews)
+        listing_count=user.available_count,
+        sold_count=user.sold_count,
+        avg_rating=average_rating(user),
+        review_count=user.rating_count
     )
 
 
@@ -140,37 +101,51 @@ async def update_profile(
                 detail="Cannot set password for Google-only account"
             )
         
-        if not verify_password(current_password, current_user.hashed_password):
+        if not await password_hasher.verify(current_password, current_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
-        current_user.hashed_password = get_password_hash(new_password)
+        current_user.hashed_password = await password_hasher.hash(new_password)
     
     # Update profile picture if provided
+    old_picture = new_picture_url = None
     if profile_picture:
-        # Delete old picture if it's not a Google profile picture
-        if current_user.profile_picture and 'googleusercontent' not in current_user.profile_picture:
-            delete_image(current_user.profile_picture)
-        
-        new_picture_url = await upload_image(profile_picture, folder="profiles")
+        new_picture_url = await upload_image(db, profile_picture, folder="profiles")
         if new_picture_url:
+            old_picture = current_user.profile_picture
             current_user.profile_picture = new_picture_url
     
-    db.commit()
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        await delete_images_async(db, [new_picture_url], uploaded=True)
+        raise
+    await release_images_async(db, [new_picture_url])
+    
+    # Delete the old picture once nothing uses it, unless it's a Google profile picture
+    if old_picture and 'googleusercontent' not in old_picture:
+        await delete_images_async(db, [old_picture])
     db.refresh(current_user)
     
     return UserResponse.model_validate(current_user)
 
 
-@router.get("/{user_id}/listings")
+@router.get("/{user_id}/listings", response_model=List[ListingResponse])
 def get_user_listings(
     user_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db)
 ):
     """
-    Get all available listings for a specific user.
+    Get a user's available listings, newest first. Pass the X-Next-Cursor
+    response header back as ``cursor`` for the next page; ``format=ndjson``
+    streams them all instead.
     """
     user = db.query(User).filter(User.id == user_id).first()
     
@@ -180,24 +155,31 @@ def get_user_listings(
             detail="User not found"
         )
     
-    listings = db.query(Listing).options(
+    query = db.query(Listing).options(
         joinedload(Listing.seller)
     ).filter(
         Listing.seller_id == user_id,
         Listing.status == "available"
-    ).all()
+    )
     
-    from ..schemas import ListingResponse
-    return [ListingResponse.model_validate(l) for l in listings]
+    return keyset_list(
+        query, db, [Listing.created_at, Listing.id], True, ListingResponse.model_validate,
+        response, limit, cursor, output_format
+    )
 
 
 @router.get("/{user_id}/reviews", response_model=List[ReviewResponse])
 def get_user_reviews(
     user_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db)
 ):
     """
-    Get all reviews for a specific user.
+    Get the reviews a user has received, newest first (paged like
+    /users/{user_id}/listings).
     """
     user = db.query(User).filter(User.id == user_id).first()
     
@@ -207,11 +189,14 @@ def get_user_reviews(
             detail="User not found"
         )
     
-    reviews = db.query(Review).options(
+    query = db.query(Review).options(
         joinedload(Review.reviewer),
         joinedload(Review.listing)
     ).filter(
         Review.reviewed_user_id == user_id
-    ).all()
+    )
     
-    return [ReviewResponse.model_validate(r) for r in reviews]
+    return keyset_list(
+        query, db, [Review.created_at, Review.id], True, ReviewResponse.model_validate,
+        response, limit, cursor, output_format
+    )
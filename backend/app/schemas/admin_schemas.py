@@ -89,6 +89,7 @@ class AdminUserResponse(BaseModel):
     created_at: datetime
     last_login: Optional[datetime] = None
     listing_count: int = 0
+    trades_count: int = 0
     reports_count: int = 0
 
     model_config = ConfigDict(from_attributes=True)
@@ -162,9 +163,10 @@ class HideListingRequest(BaseModel):
 
 class ListingListResponse(BaseModel):
     listings: List[AdminListingResponse]
-    total: int
+    total: Optional[int] = None
     page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 # ============ REPORTS ============
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, computed_field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
+from ..services.image_variants import IMAGE_VARIANTS, variant_url
+
 
 class ConditionEnum(str, Enum):
     new = "new"
@@ -168,12 +170,28 @@ class ListingResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        """Small WebP copy of the first image, for listing cards."""
+        return variant_url(self.image_url, "thumb")
+
+    @computed_field
+    @property
+    def image_variants(self) -> List[Optional[dict]]:
+        """Resized WebP copies of image_url, image_url_2 and image_url_3 (None for remote images)."""
+        return [
+            {name: variant_url(url, name) for name in IMAGE_VARIANTS} if variant_url(url, "thumb") else None
+            for url in (self.image_url, self.image_url_2, self.image_url_3)
+        ]
+
 
 class ListingListResponse(BaseModel):
     listings: List[ListingResponse]
-    total: int
+    total: Optional[int] = None
     page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class ListingUpdate(BaseModel):
@@ -8,4 +8,8 @@ from .auth import (
     get_current_user,
     get_optional_user
 )
+from .passwords import password_hasher
 from .upload import upload_image, delete_image
+# Registers the write hooks that keep daily_metrics, image_refs and the
+# user profile counters current
+from . import analytics, image_refs, user_counters
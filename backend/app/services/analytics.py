@@ -0,0 +1,182 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import Date, case, cast, delete, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..database import SessionLocal
+from ..models import DailyMetric, Listing, Message, User
+from .derived_counters import DerivedCounter, add_counts, register
+
+logger = logging.getLogger(__name__)
+
+# Time-series windows the admin analytics endpoints accept, in days
+ANALYTICS_WINDOWS = (7, 30, 90, 365)
+
+# What each model contributes to daily_metrics: column -> row condition (None counts every row)
+ROLLUP_METRICS = {
+    User: {"new_users": None, "banned_users": User.is_banned == True},
+    Listing: {
+        "new_listings": None,
+        "available_listings": Listing.status == "available",
+        "sold_listings": Listing.status == "sold",
+        "hidden_listings": Listing.status == "hidden",
+    },
+    Message: {"new_messages": None},
+}
+
+# Attributes whose change moves a row between metrics or days
+ROLLUP_TRACKED = {
+    User: ("is_banned", "created_at"),
+    Listing: ("status", "created_at"),
+    Message: ("created_at",),
+}
+
+METRIC_NAMES = [name for metrics in ROLLUP_METRICS.values() for name in metrics]
+
+
+def today_start() -> datetime:
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+# ============ DAILY METRICS ROLLUP ============
+
+def day_of(column, dialect: str):
+    """Truncate a timestamp column to its calendar day on the given backend."""
+    if dialect == "postgresql":
+        return cast(func.date_trunc("day", column), Date)
+    return func.date(column)
+
+
+def rollup_select(model, dialect: str, *criteria, sign: int = 1):
+    """Per-day metric counts for the ``model`` rows matching ``criteria``."""
+    day = day_of(model.created_at, dialect).label("day")
+    columns = [day]
+    for name, condition in ROLLUP_METRICS[model].items():
+        count = func.count() if condition is None else func.count(case((condition, 1)))
+        columns.append((count if sign > 0 else -count).label(name))
+    return select(*columns).where(model.created_at.isnot(None), *criteria).group_by(day)
+
+
+def rollup_rows(connection, model, *criteria, sign: int = 1):
+    """Add (``sign=1``) or remove (``sign=-1``) the matching ``model`` rows' contribution to daily_metrics."""
+    add_counts(
+        connection, DailyMetric.__table__, "day",
+        rollup_select(model, connection.dialect.name, *criteria, sign=sign)
+    )
+
+
+DAILY_METRICS = register(DerivedCounter("daily_metrics", rollup_rows, ROLLUP_TRACKED))
+
+
+def rollup_totals(db: Session, **since: date) -> Dict[str, int]:
+    """
+    All-time totals of every daily_metrics column, plus ``<column>_<name>``
+    for each ``name=day`` keyword: the column summed from that day on.
+    One query over the rollup, however big the live tables are.
+    """
+    columns = [func.coalesce(func.sum(DailyMetric.__table__.c[name]), 0).label(name) for name in METRIC_NAMES]
+    for label, first_day in since.items():
+        columns += [
+            func.coalesce(
+                func.sum(case((DailyMetric.day >= first_day, DailyMetric.__table__.c[name]), else_=0)), 0
+            ).label(f"{name}_{label}")
+            for name in METRIC_NAMES
+        ]
+    return dict(db.execute(select(*columns)).one()._mapping)
+
+
+def rollup_series(db: Session, name: str, days: int) -> List[Dict]:
+    """
+    ``[{"date": "YYYY-MM-DD", "count": n}, ...]`` of one daily_metrics column
+    for the last ``days`` days (oldest first, today included, empty days as 0).
+    """
+    first_day = datetime.utcnow().date() - timedelta(days=days - 1)
+    column = DailyMetric.__table__.c[name]
+    rows = db.execute(select(DailyMetric.day, column).where(DailyMetric.day >= first_day)).all()
+
+    counts = {_as_date(day): count for day, count in rows}
+    return [
+        {"date": day.isoformat(), "count": counts.get(day, 0)}
+        for day in (first_day + timedelta(days=i) for i in range(days))
+    ]
+
+
+def check_rollup(db: Session) -> List[Dict]:
+    """
+    Compare daily_metrics with counts taken from the live tables. Returns one
+    ``{"day", "metric", "stored", "live"}`` entry per disagreement.
+    """
+    dialect = db.get_bind().dialect.name
+    live: Dict[date, Dict[str, int]] = {}
+    for model in ROLLUP_METRICS:
+        for row in db.execute(rollup_select(model, dialect)).mappings():
+            live.setdefault(_as_date(row["day"]), {}).update(
+                (name, value) for name, value in row.items() if name != "day"
+            )
+
+    stored = {
+        _as_date(row.day): {name: getattr(row, name) for name in METRIC_NAMES}
+        for row in db.query(DailyMetric).all()
+    }
+
+    mismatches = []
+    for day in sorted(live.keys() | stored.keys()):
+        for name in METRIC_NAMES:
+            expected = live.get(day, {}).get(name, 0)
+            actual = stored.get(day, {}).get(name, 0)
+            if expected != actual:
+                mismatches.append({"day": day.isoformat(), "metric": name, "stored": actual, "live": expected})
+    return mismatches
+
+
+def rebuild_rollup(db: Session) -> int:
+    """Recompute daily_metrics from the live tables. Returns the number of days."""
+    db.execute(delete(DailyMetric).execution_options(synchronize_session=False))
+    connection = db.connection()
+    for model in ROLLUP_METRICS:
+        rollup_rows(connection, model)
+    return db.query(func.count(DailyMetric.day)).scalar()
+
+
+def reconcile_rollup(db: Session) -> List[Dict]:
+    """Rebuild daily_metrics if it has drifted; returns what was wrong."""
+    mismatches = check_rollup(db)
+    if mismatches:
+        rebuild_rollup(db)
+    return mismatches
+
+
+def _reconcile_once() -> None:
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_rollup(db)
+        db.commit()
+        if mismatches:
+            logger.warning("daily_metrics drifted on %d day/metric pairs; rebuilt", len(mismatches))
+    except Exception as e:
+        db.rollback()
+        logger.error("daily_metrics reconciliation failed: %s", e)
+    finally:
+        db.close()
+
+
+async def reconcile_rollup_forever(interval_seconds: int) -> None:
+    """
+    Background job: every ``interval_seconds``, repair whatever the write
+    hooks missed (raw SQL edits, bulk loads, crashed transactions).
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await run_in_threadpool(_reconcile_once)
@@ -6,14 +6,16 @@ from jwt.exceptions import PyJWTError
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from google.oauth2 import id_token
 from google.auth.transport import requests
 import re
 
 from ..config import settings
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models import User
+from .user_cache import load_user, load_user_async
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +24,13 @@ security = HTTPBearer()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking; request handlers use password_hasher)"""
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
 def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Generate password hash (blocking; request handlers use password_hasher)"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(settings.BCRYPT_ROUNDS)).decode('utf-8')
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -82,35 +84,59 @@ def verify_google_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
-    credentials_exception = HTTPException(
+def _token_user_id(token: str) -> Optional[int]:
+    payload = verify_token(token)
+    if payload is None:
+        return None
+    
+    user_id = payload.get("sub")
+    if user_id is None:
+        return None
+    
+    return int(user_id)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def authenticate_token(token: str, db: Session) -> Optional[User]:
+    """Resolve a JWT to its user, or None if the token or user is invalid"""
+    user_id = _token_user_id(token)
+    if user_id is None:
+        return None
     
-    token = credentials.credentials
-    payload = verify_token(token)
-    
-    if payload is None:
-        raise credentials_exception
-    
-    user_id = payload.get("sub")
+    return load_user(db, user_id)
+
+
+async def authenticate_token_async(token: str, db: AsyncSession) -> Optional[User]:
+    """authenticate_token for an AsyncSession"""
+    user_id = _token_user_id(token)
     if user_id is None:
-        raise credentials_exception
+        return None
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return await load_user_async(db, user_id)
+
+
+# Plain ``def`` so FastAPI runs the blocking lookup in the threadpool
+# instead of on the event loop.
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user from JWT token"""
+    user = authenticate_token(credentials.credentials, db)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     return user
 
 
-async def get_optional_user(
+def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
@@ -118,7 +144,27 @@ async def get_optional_user(
     if credentials is None:
         return None
     
-    try:
-        return await get_current_user(credentials, db)
-    except HTTPException:
+    return authenticate_token(credentials.credentials, db)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user for routes that use the async session"""
+    user = await authenticate_token_async(credentials.credentials, db)
+    if user is None:
+        raise _credentials_exception()
+    
+    return user
+
+
+async def get_optional_user_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[User]:
+    """get_optional_user for routes that use the async session"""
+    if credentials is None:
         return None
+    
+    return await authenticate_token_async(credentials.credentials, db)
@@ -0,0 +1,227 @@
+from typing import Optional
+
+from sqlalchemy import and_, case, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from ..models import Conversation, Listing, Message, User
+
+
+def _participants(user_id: int, other_user_id: int):
+    return sorted((user_id, other_user_id))
+
+
+def _unread_column(conversation_user_a_id: int, user_id: int) -> str:
+    return "unread_count_a" if user_id == conversation_user_a_id else "unread_count_b"
+
+
+def conversation_summaries(user_id: int, limit: int, offset: int = 0) -> Select:
+    """
+    One row per conversation the given user takes part in:
+    ``(last Message, other User, Listing or None, unread_count)``,
+    most recent conversation first.
+
+    Reads the materialized ``conversations`` table, so the cost depends on
+    the page size, not on how many messages the user has exchanged.
+    """
+    is_a = Conversation.user_a_id == user_id
+    other_user_id = case((is_a, Conversation.user_b_id), else_=Conversation.user_a_id)
+    unread_count = case((is_a, Conversation.unread_count_a), else_=Conversation.unread_count_b)
+
+    return (
+        select(Message, User, Listing, unread_count)
+        .select_from(Conversation)
+        .join(Message, Message.id == Conversation.last_message_id)
+        .join(User, User.id == other_user_id)
+        .outerjoin(Listing, Listing.id == Conversation.listing_id)
+        .where(or_(Conversation.user_a_id == user_id, Conversation.user_b_id == user_id))
+        .order_by(Conversation.last_message_at.desc(), Conversation.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+def conversation_id(user_id: int, other_user_id: int, listing_id: Optional[int]):
+    """Scalar subquery for the id of the conversation between two users about a listing."""
+    user_a_id, user_b_id = _participants(user_id, other_user_id)
+    return (
+        select(Conversation.id)
+        .where(
+            Conversation.user_a_id == user_a_id,
+            Conversation.user_b_id == user_b_id,
+            Conversation.listing_id == listing_id
+        )
+        .scalar_subquery()
+    )
+
+
+def _release_unread(db: Session, reader_id: int, other_user_id: int, listing_id: Optional[int], count: int):
+    """Take ``count`` newly read messages off the reader's counters."""
+    user_a_id, user_b_id = _participants(reader_id, other_user_id)
+    column = _unread_column(user_a_id, reader_id)
+    db.execute(
+        update(Conversation)
+        .where(
+            Conversation.user_a_id == user_a_id,
+            Conversation.user_b_id == user_b_id,
+            Conversation.listing_id == listing_id
+        )
+        .values({column: getattr(Conversation, column) - count})
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(User)
+        .where(User.id == reader_id)
+        .values(unread_messages_count=User.unread_messages_count - count)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_read(
+    db: Session,
+    reader_id: int,
+    other_user_id: int,
+    listing_id: Optional[int],
+    up_to_id: Optional[int] = None
+) -> int:
+    """
+    Mark messages from ``other_user_id`` to ``reader_id`` about a listing as
+    read (optionally only those with id <= ``up_to_id``) in one UPDATE, and
+    adjust the unread counters by the number of rows that actually changed.
+    Returns that number; the caller commits.
+    """
+    stmt = update(Message).where(
+        Message.listing_id == listing_id,
+        Message.sender_id == other_user_id,
+        Message.receiver_id == reader_id,
+        Message.is_read == False
+    )
+    if up_to_id is not None:
+        stmt = stmt.where(Message.id <= up_to_id)
+
+    count = db.execute(
+        stmt.values(is_read=True).execution_options(synchronize_session=False)
+    ).rowcount
+    if count:
+        _release_unread(db, reader_id, other_user_id, listing_id, count)
+    return count
+
+
+def mark_message_read(db: Session, message: Message) -> bool:
+    """Mark one message read for its receiver. Returns False if it already was."""
+    count = db.execute(
+        update(Message)
+        .where(Message.id == message.id, Message.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if count:
+        _release_unread(db, message.receiver_id, message.sender_id, message.listing_id, count)
+    return bool(count)
+
+
+def forget_conversations(db: Session, user_id: Optional[int] = None, listing_id: Optional[int] = None):
+    """
+    Drop conversations involving a user or listing whose messages are being
+    deleted, and take their unread messages off the remaining participants'
+    totals. Call after deleting the messages; the caller commits.
+    """
+    conditions = []
+    if user_id is not None:
+        conditions.append(or_(Conversation.user_a_id == user_id, Conversation.user_b_id == user_id))
+    if listing_id is not None:
+        conditions.append(Conversation.listing_id == listing_id)
+    if not conditions:
+        return
+
+    doomed = db.query(Conversation).filter(or_(*conditions)).all()
+    for conversation in doomed:
+        for participant, unread in (
+            (conversation.user_a_id, conversation.unread_count_a),
+            (conversation.user_b_id, conversation.unread_count_b),
+        ):
+            if unread and participant != user_id:
+                db.execute(
+                    update(User)
+                    .where(User.id == participant)
+                    .values(unread_messages_count=User.unread_messages_count - unread)
+                    .execution_options(synchronize_session=False)
+                )
+    db.execute(
+        delete(Conversation)
+        .where(Conversation.id.in_([c.id for c in doomed]))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _ordered_pair(db: Session):
+    """SQL expressions for (lower, higher) participant id of a message."""
+    if db.get_bind().dialect.name == "postgresql":
+        return (
+            func.least(Message.sender_id, Message.receiver_id),
+            func.greatest(Message.sender_id, Message.receiver_id),
+        )
+    # SQLite's multi-argument min()/max() are scalar, not aggregates
+    return (
+        func.min(Message.sender_id, Message.receiver_id),
+        func.max(Message.sender_id, Message.receiver_id),
+    )
+
+
+def rebuild_conversations(db: Session) -> int:
+    """
+    Recompute every conversation and unread counter from the messages table.
+    Used to backfill existing data and to repair drift. Returns the number
+    of conversations written; the caller commits.
+    """
+    user_a_id, user_b_id = _ordered_pair(db)
+    is_unread = Message.is_read == False
+
+    grouped = db.execute(
+        select(
+            user_a_id.label("user_a_id"),
+            user_b_id.label("user_b_id"),
+            Message.listing_id,
+            func.max(Message.id).label("last_message_id"),
+            func.max(Message.created_at).label("last_message_at"),
+            func.sum(case((and_(is_unread, Message.receiver_id == user_a_id), 1), else_=0)).label("unread_count_a"),
+            func.sum(case((and_(is_unread, Message.receiver_id == user_b_id), 1), else_=0)).label("unread_count_b"),
+        ).group_by(user_a_id, user_b_id, Message.listing_id)
+    ).all()
+
+    db.execute(update(Message).values(conversation_id=None).execution_options(synchronize_session=False))
+    db.execute(delete(Conversation).execution_options(synchronize_session=False))
+    db.add_all([
+        Conversation(
+            user_a_id=row.user_a_id,
+            user_b_id=row.user_b_id,
+            listing_id=row.listing_id,
+            last_message_id=row.last_message_id,
+            last_message_at=row.last_message_at,
+            unread_count_a=row.unread_count_a or 0,
+            unread_count_b=row.unread_count_b or 0,
+        )
+        for row in grouped
+    ])
+    db.flush()
+
+    owning_conversation = (
+        select(Conversation.id)
+        .where(
+            Conversation.user_a_id == user_a_id,
+            Conversation.user_b_id == user_b_id,
+            Conversation.listing_id == Message.listing_id
+        )
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Message).values(conversation_id=owning_conversation).execution_options(synchronize_session=False)
+    )
+
+    unread = (
+        select(func.count(Message.id))
+        .where(Message.receiver_id == User.id, is_unread)
+        .scalar_subquery()
+    )
+    db.execute(update(User).values(unread_messages_count=unread).execution_options(synchronize_session=False))
+    return len(grouped)
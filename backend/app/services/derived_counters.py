@@ -0,0 +1,120 @@
+"""
+Tables of counts derived from other tables: daily_metrics
+(services/analytics.py), image_refs (services/image_refs.py) and the
+profile counters on users (services/user_counters.py).
+
+Each one registers a DerivedCounter. Its ORM write hooks keep it current
+row by row. Bulk UPDATE/DELETE statements skip those hooks, so they go
+through count_rows / recounted, which move every counter over the model
+together.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence
+
+from sqlalchemy import event, insert, inspect, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+class DerivedCounter:
+    """
+    Counts kept over the rows of each model in ``tracked``.
+    ``apply(connection, model, *criteria, sign=1)`` adds (``sign=1``) or
+    removes (``sign=-1``) the matching rows' share in one statement.
+    ``tracked[model]`` names the attributes whose change moves a row
+    between counts.
+    """
+
+    def __init__(self, name: str, apply: Callable, tracked: Dict[type, Sequence[str]]):
+        self.name = name
+        self.apply = apply
+        self.tracked = tracked
+
+    def _changed(self, model, target) -> bool:
+        state = inspect(target)
+        return any(state.attrs[key].history.has_changes() for key in self.tracked[model])
+
+    def _count(self, mapper, connection, target):
+        model = mapper.class_
+        self.apply(connection, model, model.id == target.id)
+
+    def _uncount(self, mapper, connection, target):
+        model = mapper.class_
+        self.apply(connection, model, model.id == target.id, sign=-1)
+
+    def _recount_before(self, mapper, connection, target):
+        # The row still holds its old values here, so take them out...
+        if self._changed(mapper.class_, target):
+            self._uncount(mapper, connection, target)
+
+    def _recount_after(self, mapper, connection, target):
+        # ...and add the new ones back once the UPDATE has run
+        if self._changed(mapper.class_, target):
+            self._count(mapper, connection, target)
+
+
+_counters: List[DerivedCounter] = []
+
+
+def register(counter: DerivedCounter) -> DerivedCounter:
+    """Keep ``counter`` current through the ORM write hooks of its models."""
+    _counters.append(counter)
+    for model in counter.tracked:
+        event.listen(model, "after_insert", counter._count)
+        event.listen(model, "before_update", counter._recount_before)
+        event.listen(model, "after_update", counter._recount_after)
+        event.listen(model, "before_delete", counter._uncount)
+    return counter
+
+
+def _counters_for(model, changing: Sequence[str] = ()) -> List[DerivedCounter]:
+    return [
+        counter for counter in _counters
+        if model in counter.tracked and (not changing or set(changing) & set(counter.tracked[model]))
+    ]
+
+
+def count_rows(connection, model, *criteria, sign: int = 1) -> None:
+    """
+    Add (``sign=1``) or remove (``sign=-1``) the matching ``model`` rows in
+    every derived counter. Call with ``sign=-1`` before a bulk DELETE.
+    """
+    for counter in _counters_for(model):
+        counter.apply(connection, model, *criteria, sign=sign)
+
+
+@contextmanager
+def recounted(connection, model, *criteria, changing: Sequence[str] = ()) -> Iterator[None]:
+    """
+    Wrap a bulk UPDATE of the matching ``model`` rows. Their counts are
+    taken out before it and added back after it. Only counters that track
+    one of the ``changing`` attributes are touched (all of them if none
+    are given). ``criteria`` must still match the same rows after the
+    UPDATE.
+    """
+    counters = _counters_for(model, changing)
+    for counter in counters:
+        counter.apply(connection, model, *criteria, sign=-1)
+    yield
+    for counter in counters:
+        counter.apply(connection, model, *criteria)
+
+
+def add_counts(connection, table, key: str, rows) -> None:
+    """
+    Add the rows of the ``rows`` select to ``table``. Each row has a ``key``
+    column plus one column per count; a missing key is inserted.
+    """
+    names = [column.name for column in rows.selected_columns if column.name != key]
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = (pg_insert if dialect == "postgresql" else sqlite_insert)(table).from_select([key, *names], rows)
+        connection.execute(upsert.on_conflict_do_update(
+            index_elements=[key],
+            set_={name: table.c[name] + upsert.excluded[name] for name in names}
+        ))
+    else:
+        for row in connection.execute(rows).mappings().all():
+            changes = {name: table.c[name] + row[name] for name in names}
+            if connection.execute(update(table).where(table.c[key] == row[key]).values(**changes)).rowcount == 0:
+                connection.execute(insert(table).values(**row))
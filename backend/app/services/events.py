@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-connection buffer; a client that stops reading loses events, not memory
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+def user_channel(user_id: int) -> str:
+    """Channel carrying real-time events for one user."""
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """A single listener on a channel, bound to the event loop that created it."""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def _push(self, event: dict) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropping event for slow subscriber on %s", self.channel)
+
+    def deliver(self, event: dict) -> None:
+        """Thread-safe hand-off into the subscriber's event loop."""
+        self._loop.call_soon_threadsafe(self._push, event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Wait for the next event; returns None if ``timeout`` elapses first."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryBackend:
+    """Single-process backend: publishing delivers straight to local subscribers."""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[str, dict], None]] = None
+
+    def bind(self, deliver: Callable[[str, dict], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, channel: str, event: dict) -> None:
+        if self._deliver:
+            self._deliver(channel, event)
+
+    async def start(self) -> None:
+        pass
+
+
+class RedisBackend:
+    """
+    Fan-out across workers through Redis PUBLISH/PSUBSCRIBE.
+    Requires the optional ``redis`` package.
+    """
+
+    PREFIX = "tradehub:"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("EVENT_BUS_URL points at Redis but the 'redis' package is not installed") from e
+        self._url = url
+        self._publisher = redis.Redis.from_url(url)
+        self._deliver: Optional[Callable[[str, dict], None]] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def bind(self, deliver: Callable[[str, dict], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, channel: str, event: dict) -> None:
+        try:
+            self._publisher.publish(self.PREFIX + channel, json.dumps(event))
+        except Exception as e:
+            logger.error("Event publish failed: %s", e)
+
+    async def start(self) -> None:
+        # One listener per worker process, started by the first subscriber
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.from_url(self._url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(self.PREFIX + "*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage" or not self._deliver:
+                        continue
+                    channel = message["channel"].decode()[len(self.PREFIX):]
+                    self._deliver(channel, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Event listener lost its Redis connection: %s", e)
+            finally:
+                # Each attempt has its own connection: release it before the next
+                for connection in (pubsub, client):
+                    with suppress(Exception):
+                        await connection.aclose()
+            await asyncio.sleep(1)
+
+
+class EventBus:
+    """
+    In-process pub/sub for real-time notifications.
+
+    ``publish`` is synchronous and thread-safe so sync route handlers running
+    in the threadpool can call it directly. Cross-worker fan-out is delegated
+    to the backend chosen by EVENT_BUS_URL.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        backend.bind(self._deliver_local)
+
+    def _deliver_local(self, channel: str, event: dict) -> None:
+        with self._lock:
+            targets = list(self._subscriptions.get(channel, ()))
+        for subscription in targets:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The subscriber's loop has already shut down
+                pass
+
+    def publish(self, channel: str, event: dict) -> None:
+        self._backend.publish(channel, event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        await self._backend.start()
+        subscription = Subscription(channel)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                listeners = self._subscriptions.get(channel)
+                if listeners is not None:
+                    listeners.discard(subscription)
+                    if not listeners:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscriptions.values())
+
+
+def _create_backend(url: str):
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    if url and not url.startswith("memory://"):
+        logger.warning("Unknown EVENT_BUS_URL scheme '%s', using in-memory bus", url.split("://")[0])
+    return MemoryBackend()
+
+
+event_bus = EventBus(_create_backend(settings.EVENT_BUS_URL))
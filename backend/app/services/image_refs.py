@@ -0,0 +1,45 @@
+"""
+Reference counts of locally stored images (the image_refs table), so
+services/upload.py only deletes a content-addressed blob once nothing
+points at it.
+"""
+from sqlalchemy import String, func, literal, select, union_all
+
+from ..models import ImageRef, Listing, User
+from .derived_counters import DerivedCounter, add_counts, register
+
+# Columns holding image URLs; only local ("/uploads/...") ones are counted
+IMAGE_COLUMNS = {
+    Listing: ("image_url", "image_url_2", "image_url_3"),
+    User: ("profile_picture",),
+}
+
+
+def image_ref_select(model, *criteria, sign: int = 1):
+    """``(url, ref_count)`` per local image referenced by the matching ``model`` rows."""
+    table = model.__table__
+    urls = union_all(*(
+        select(table.c[name].label("url")).where(table.c[name].like("/uploads/%"), *criteria)
+        for name in IMAGE_COLUMNS[model]
+    )).subquery()
+    return select(urls.c.url, (func.count() * sign).label("ref_count")).group_by(urls.c.url)
+
+
+def image_ref_rows(connection, model, *criteria, sign: int = 1):
+    """Add (``sign=1``) or remove (``sign=-1``) the matching ``model`` rows' image references."""
+    add_counts(connection, ImageRef.__table__, "url", image_ref_select(model, *criteria, sign=sign))
+
+
+def image_ref_add(connection, url: str, count: int = 1):
+    """
+    Add ``count`` references to one image (negative to drop them). Uploads
+    hold one from before their URL is handed out until the row that uses
+    it is committed, so the blob cannot be deleted in between.
+    """
+    add_counts(
+        connection, ImageRef.__table__, "url",
+        select(literal(url, String).label("url"), literal(count).label("ref_count"))
+    )
+
+
+IMAGE_REFS = register(DerivedCounter("image_refs", image_ref_rows, IMAGE_COLUMNS))
@@ -0,0 +1,16 @@
+"""
+Resized copies of local uploads. Kept free of imports so the schemas can
+build variant URLs without loading the upload pipeline.
+"""
+from typing import Dict, Optional
+
+# WebP copies stored next to each local original as <name>.<variant>.webp:
+# variant -> longest edge in pixels
+IMAGE_VARIANTS: Dict[str, int] = {"thumb": 480, "medium": 1280}
+
+
+def variant_url(image_url: Optional[str], variant: str) -> Optional[str]:
+    """URL of a resized copy of a local upload (None for remote or missing images)."""
+    if not image_url or not image_url.startswith('/uploads/'):
+        return None
+    return f"{image_url.rsplit('.', 1)[0]}.{variant}.webp"
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Listing, User
+from .events import event_bus
+
+logger = logging.getLogger(__name__)
+
+# Published on the event bus so every worker drops its pages
+INVALIDATION_CHANNEL = "listing-cache"
+
+# Listing columns that change without invalidating: the view count is
+# shown on the pages but may lag by up to the TTL
+IGNORED_LISTING_COLUMNS = {"views"}
+
+# Seller fields embedded in every listing of the page (SellerInfo)
+SELLER_COLUMNS = ("name", "email", "profile_picture")
+
+
+class ListingPageCache:
+    """
+    Per-process LRU of anonymous ``GET /api/listings`` responses, keyed by
+    the normalised query parameters and stored as the JSON body plus its
+    ETag. Any committed listing write (or a change to a seller shown on
+    the pages) empties it on every worker, through the session hooks below
+    and the event bus; the TTL bounds staleness from writes that bypass
+    the ORM.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a page rendered before a write
+        # committed is never stored after it
+        self._generation = 0
+        self.hits = self.misses = self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    @staticmethod
+    def key(**params) -> str:
+        """Cache key for a set of query parameters; None and empty values are left out."""
+        return "&".join(
+            f"{name}={value}" for name, value in sorted(params.items()) if value is not None and value != ""
+        )
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """``(etag, body)`` for ``key``, if cached and fresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: str, body: bytes, generation: int) -> str:
+        """Store ``body`` and return its ETag (also when it is not stored)."""
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if not self.enabled:
+            return etag
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, etag, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return etag
+
+    def clear(self) -> None:
+        """Drop every page in this process only."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def invalidate(self) -> None:
+        """Drop every page here and on every other worker."""
+        self.clear()
+        self.invalidations += 1
+        event_bus.publish(INVALIDATION_CHANNEL, {})
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+listing_cache = ListingPageCache(settings.LISTING_CACHE_MAX_ENTRIES, settings.LISTING_CACHE_TTL_SECONDS)
+
+
+def _changes_pages(obj, deleted: bool) -> bool:
+    if isinstance(obj, Listing):
+        if deleted:
+            return True
+        state = inspect(obj)
+        return any(
+            attr.history.has_changes() for attr in state.attrs if attr.key not in IGNORED_LISTING_COLUMNS
+        )
+    if isinstance(obj, User) and not deleted:
+        state = inspect(obj)
+        return any(state.attrs[key].history.has_changes() for key in SELLER_COLUMNS)
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _note_listing_changes(session, flush_context):
+    if session.info.get("listing_pages_changed"):
+        return
+    if (
+        any(isinstance(obj, Listing) for obj in session.new)
+        or any(_changes_pages(obj, deleted=False) for obj in session.dirty)
+        or any(_changes_pages(obj, deleted=True) for obj in session.deleted)
+    ):
+        session.info["listing_pages_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_listing_pages(session):
+    if session.info.pop("listing_pages_changed", False):
+        listing_cache.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_listing_changes(session, previous_transaction):
+    session.info.pop("listing_pages_changed", None)
+
+
+async def listen_for_invalidations() -> None:
+    """Apply invalidations published by other workers (runs for the app's lifetime)."""
+    while True:
+        try:
+            async with event_bus.subscribe(INVALIDATION_CHANNEL) as subscription:
+                while True:
+                    if await subscription.get() is not None:
+                        listing_cache.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Listing cache invalidation listener failed: %s", e)
+            await asyncio.sleep(1)
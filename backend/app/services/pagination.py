@@ -0,0 +1,205 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import DateTime, String, asc, desc, tuple_, type_coerce
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import Select
+
+# Response header carrying the cursor of the next page on endpoints whose
+# body is a bare JSON array
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Rows fetched per query while streaming an NDJSON export
+STREAM_BATCH_SIZE = 200
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack sort-key values into an opaque, URL-safe cursor."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Unpack a cursor produced by encode_cursor. Raises 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
+def _comparable(db: Session, column, value):
+    """
+    Return a (column, value) pair that compares correctly on this backend.
+
+    SQLite stores DateTime as text, and rows written by CURRENT_TIMESTAMP have
+    no fractional seconds, so the bound value must use the same layout.
+    """
+    if value is None or not isinstance(column.type, DateTime):
+        return column, value
+
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    if db.get_bind().dialect.name != "sqlite":
+        return column, moment
+
+    text_value = moment.strftime("%Y-%m-%d %H:%M:%S")
+    if moment.microsecond:
+        text_value += f".{moment.microsecond:06d}"
+    return type_coerce(column, String), text_value
+
+
+def _seek(query, db, columns, descending, limit, cursor, offset):
+    """Order ``query`` by ``columns`` and bound it to one page plus one row."""
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        pairs = [_comparable(db, c, v) for c, v in zip(columns, values)]
+        keys = tuple_(*(c for c, _ in pairs))
+        bounds = tuple_(*(v for _, v in pairs))
+        query = query.filter(keys < bounds if descending else keys > bounds)
+        offset = 0
+
+    direction = desc if descending else asc
+    return query.order_by(*(direction(c) for c in columns)).offset(offset).limit(limit + 1)
+
+
+def _split_page(rows: list, columns: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0] if isinstance(rows[-1], Row) else rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
+
+def keyset_page(
+    query: Query,
+    db: Session,
+    columns: Sequence,
+    descending: bool,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page ordered by ``columns`` (last one must be unique, e.g. id).
+    The query may add columns after its entity; the cursor is read from the
+    entity.
+
+    With a cursor the page starts strictly after the row it encodes, so the
+    database seeks through the index instead of skipping ``offset`` rows.
+    Returns the rows and the cursor for the following page (None at the end).
+    """
+    rows = _seek(query, db, columns, descending, limit, cursor, offset).all()
+    return _split_page(rows, columns, limit)
+
+
+async def keyset_page_async(
+    stmt: Select,
+    db: AsyncSession,
+    columns: Sequence,
+    descending: bool,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """keyset_page for a ``select()`` of one entity run on an AsyncSession."""
+    result = await db.execute(_seek(stmt, db, columns, descending, limit, cursor, offset))
+    return _split_page(result.unique().scalars().all(), columns, limit)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Send ``next_cursor`` in the X-Next-Cursor header (omitted on the last page)."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def _stream_rows(
+    query: Query,
+    db: Session,
+    columns: Sequence,
+    descending: bool,
+    to_model: Callable[[Any], BaseModel],
+    cursor: Optional[str],
+) -> Iterator[str]:
+    try:
+        while True:
+            rows, cursor = keyset_page(query, db, columns, descending, STREAM_BATCH_SIZE, cursor=cursor)
+            if rows:
+                yield "".join(to_model(row).model_dump_json() + "\n" for row in rows)
+            # Keep the identity map to one batch
+            db.expunge_all()
+            if cursor is None:
+                return
+    finally:
+        db.close()
+
+
+def keyset_stream(
+    query: Query,
+    db: Session,
+    columns: Sequence,
+    descending: bool,
+    to_model: Callable[[Any], BaseModel],
+    cursor: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Stream every row of ``query`` (from ``cursor`` on) as NDJSON, one
+    ``to_model(row)`` per line. Rows are read STREAM_BATCH_SIZE at a time
+    with the same keyset seek as keyset_page, so memory stays at one batch
+    and the first line goes out after one small query, however many rows
+    there are. The request's dependency has closed ``db`` by the time the
+    body is sent; the session reconnects for the stream and is closed
+    again at the end.
+    """
+    if cursor:
+        # Build (not run) the first seek so a bad cursor gets its 400 now,
+        # not after the 200 has been sent
+        _seek(query, db, columns, descending, STREAM_BATCH_SIZE, cursor, 0)
+    return StreamingResponse(
+        _stream_rows(query, db, columns, descending, to_model, cursor),
+        media_type="application/x-ndjson",
+    )
+
+
+def keyset_list(
+    query: Query,
+    db: Session,
+    columns: Sequence,
+    descending: bool,
+    to_model: Callable[[Any], BaseModel],
+    response: Response,
+    limit: int,
+    cursor: Optional[str] = None,
+    output_format: str = "json",
+):
+    """
+    Body of a list endpoint: one keyset page of ``to_model(row)``s with the
+    next page's cursor in the X-Next-Cursor header, or, for
+    ``output_format="ndjson"``, every row streamed by keyset_stream.
+    """
+    if output_format == "ndjson":
+        return keyset_stream(query, db, columns, descending, to_model, cursor=cursor)
+    rows, next_cursor = keyset_page(query, db, columns, descending, limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return [to_model(row) for row in rows]
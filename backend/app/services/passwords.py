@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
+
+import bcrypt
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small pool of worker processes so a burst of logins
+    cannot pin every core the request handlers need. At most
+    ``max_pending`` hashes may be queued or running; past that, callers get
+    a 503 with Retry-After rather than waiting behind the queue.
+
+    ``workers=0`` hashes in the request threadpool instead (same limit),
+    for environments where spawning processes is not worth it.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = self.rejected = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the workers only need bcrypt, not a copy of
+            # this process's threads, sockets and connection pools
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy. Please try again shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+
+    def _release(self, _future: Optional[Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    async def _run(self, fn, *args):
+        self._acquire()
+        if self.workers <= 0:
+            try:
+                return await run_in_threadpool(fn, *args)
+            finally:
+                self._release()
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """bcrypt hash of ``password`` at the configured cost."""
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(bcrypt.checkpw, plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True if the hash was made at a different cost than the configured one."""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING, settings.BCRYPT_ROUNDS
+)
@@ -0,0 +1,176 @@
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from ..config import settings
+from .auth import verify_token
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``requests`` per ``period`` seconds for the matching method + path."""
+    name: str
+    method: str
+    path: str  # regular expression matched against the full path
+    requests: int
+    period: float
+    per_user: bool = False  # key by the token's user instead of the client IP
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and re.fullmatch(self.path, path) is not None
+
+    @property
+    def interval(self) -> float:
+        """Seconds between requests at the steady rate."""
+        return self.period / self.requests
+
+
+RATE_LIMITS: List[RateLimit] = [
+    # Credential endpoints, per client IP
+    RateLimit("auth", "POST", r"/api/auth/(login|register|google|google-token)", 10, 60),
+    RateLimit("admin-login", "POST", r"/api/admin/login", 10, 60),
+    # Writes, per signed-in user
+    RateLimit("messages", "POST", r"/api/messages", 30, 60, per_user=True),
+    RateLimit("listing-create", "POST", r"/api/listings", 20, 3600, per_user=True),
+    RateLimit("listing-write", "PUT", r"/api/listings/\d+", 60, 60, per_user=True),
+    RateLimit("listing-delete", "DELETE", r"/api/listings/\d+", 60, 60, per_user=True),
+    RateLimit("reports", "POST", r"/api/reports", 10, 3600, per_user=True),
+]
+
+
+class MemoryStore:
+    """
+    Per-process GCRA state: one float (the theoretical arrival time) per
+    key, in least-recently-updated order. Keys whose TAT has passed carry
+    no information; a periodic sweep pops them off the front, stopping at
+    the first live one, so it only touches keys it removes. Past
+    ``max_keys`` the least recently updated key is dropped in O(1), so a
+    spray of new keys never costs more than a dict operation per request.
+    """
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._next_sweep = time.monotonic() + self.SWEEP_INTERVAL
+        self.sweeps = 0
+
+    async def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        # Single event loop, no awaits below: the update is atomic
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + limit.interval
+        allow_at = new_tat - limit.period
+        if allow_at > now:
+            return False, allow_at - now
+        if key not in self._tats and len(self._tats) >= self.max_keys:
+            # Full of live keys: forget the stalest one (it fails open)
+            self._tats.popitem(last=False)
+        self._tats[key] = new_tat
+        self._tats.move_to_end(key)
+        return True, 0.0
+
+    def _sweep(self, now: float) -> None:
+        # Oldest updates have the earliest TATs (give or take the longer
+        # periods); anything expired behind a live key waits for a later sweep
+        while self._tats:
+            key = next(iter(self._tats))
+            if self._tats[key] > now:
+                break
+            self._tats.popitem(last=False)
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        self.sweeps += 1
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def reset(self) -> None:
+        self._tats.clear()
+
+
+class RedisStore:
+    """
+    GCRA state shared by every worker, in Redis or any server speaking its
+    protocol. Each key expires when its TAT passes, so idle keys cost
+    nothing. Requires the optional ``redis`` package.
+    """
+
+    PREFIX = "tradehub:ratelimit:"
+
+    # KEYS[1] = key; ARGV = now, interval, period (milliseconds)
+    GCRA = """
+    local now = tonumber(ARGV[1])
+    local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+    if tat < now then tat = now end
+    local new_tat = tat + tonumber(ARGV[2])
+    local allow_at = new_tat - tonumber(ARGV[3])
+    if allow_at > now then return {0, allow_at - now} end
+    redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+    return {1, 0}
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_STORE_URL points at Redis but the 'redis' package is not installed") from e
+        self._client = aioredis.from_url(url)
+        self._script = self._client.register_script(self.GCRA)
+
+    async def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        allowed, wait_ms = await self._script(
+            keys=[self.PREFIX + key],
+            args=[int(time.time() * 1000), int(limit.interval * 1000), int(limit.period * 1000)],
+        )
+        return bool(allowed), int(wait_ms) / 1000
+
+    def reset(self) -> None:
+        pass
+
+
+def _create_store(url: str):
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    if url and not url.startswith("memory://"):
+        logger.warning("Unknown RATE_LIMIT_STORE_URL scheme '%s', using in-memory store", url.split("://")[0])
+    return MemoryStore()
+
+
+class RateLimiter:
+    def __init__(self, store, limits: List[RateLimit]):
+        self.store = store
+        self.limits = limits
+
+    def match(self, method: str, path: str) -> Optional[RateLimit]:
+        return next((limit for limit in self.limits if limit.matches(method, path)), None)
+
+    async def check(self, limit: RateLimit, client_ip: str, authorization: Optional[str]) -> Tuple[bool, float]:
+        """Count one request against ``limit``; returns (allowed, retry after seconds)."""
+        subject = f"ip:{client_ip}"
+        if limit.per_user and authorization and authorization.lower().startswith("bearer "):
+            payload = verify_token(authorization[7:])
+            if payload and payload.get("sub"):
+                subject = f"user:{payload['sub']}"
+        try:
+            return await self.store.hit(f"{limit.name}:{subject}", limit)
+        except Exception as e:
+            # A store outage must not take the API down with it
+            logger.error("Rate limit store failed, allowing request: %s", e)
+            return True, 0.0
+
+
+rate_limiter = RateLimiter(_create_store(settings.RATE_LIMIT_STORE_URL), RATE_LIMITS)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
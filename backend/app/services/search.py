@@ -0,0 +1,94 @@
+import re
+import logging
+from typing import Optional, Tuple, TypeVar
+
+from sqlalchemy import func, literal_column, or_, table, column, text
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import Select
+
+from ..models import Listing
+from ..models.models import LISTING_SEARCH_DDL
+
+logger = logging.getLogger(__name__)
+
+# Only word characters reach the database; everything else is a separator.
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_SEARCH_TERMS = 8
+
+_listings_fts = table("listings_fts", column("rowid"), column("rank"))
+_search_vector = literal_column("listings.search_vector")
+
+# A legacy Query or a select(); both support .filter() and .join()
+ListingQuery = TypeVar("ListingQuery", Query, Select)
+
+
+def tokenize(search: str) -> list[str]:
+    """Split free text into lowercase search terms."""
+    return _TOKEN_RE.findall(search.lower())[:MAX_SEARCH_TERMS]
+
+
+def _postgres_query(terms: list[str]) -> str:
+    # "text book" -> "text:* & book:*" (every term, prefix match)
+    return " & ".join(f"{t}:*" for t in terms)
+
+
+def _sqlite_query(terms: list[str]) -> str:
+    # "text book" -> '"text"* "book"*' (implicit AND, prefix match)
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def apply_search(query: ListingQuery, db, search: str) -> Tuple[ListingQuery, Optional[object]]:
+    """
+    Restrict a Listing query (or select) to rows matching ``search``.
+    ``db`` may be a Session or an AsyncSession; only its dialect is used.
+
+    Returns the filtered query and an ORDER BY clause ranking the best
+    matches first (None when the backend cannot rank).
+    """
+    terms = tokenize(search)
+    if not terms:
+        return query, None
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("english", _postgres_query(terms))
+        query = query.filter(_search_vector.op("@@")(tsquery))
+        return query, func.ts_rank_cd(_search_vector, tsquery).desc()
+
+    if dialect == "sqlite":
+        match = text("listings_fts MATCH :fts_query").bindparams(fts_query=_sqlite_query(terms))
+        query = query.join(_listings_fts, _listings_fts.c.rowid == Listing.id).filter(match)
+        # FTS5 rank is bm25, where lower means more relevant
+        return query, _listings_fts.c.rank.asc()
+
+    # Unknown backend: fall back to a substring scan
+    search_term = f"%{search}%"
+    query = query.filter(
+        or_(
+            Listing.title.ilike(search_term),
+            Listing.description.ilike(search_term)
+        )
+    )
+    return query, None
+
+
+def install_search_index(db: Session) -> None:
+    """
+    Create the search column/table for an existing database and backfill it.
+    Safe to run repeatedly.
+    """
+    dialect = db.get_bind().dialect.name
+    statements = LISTING_SEARCH_DDL.get(dialect)
+    if not statements:
+        logger.warning("Full-text search is not supported on %s", dialect)
+        return
+
+    for statement in statements:
+        db.execute(text(statement))
+
+    if dialect == "sqlite":
+        # External-content tables only index rows written after the triggers exist
+        db.execute(text("INSERT INTO listings_fts(listings_fts) VALUES ('rebuild')"))
+
+    db.commit()
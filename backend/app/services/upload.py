@@ -1,13 +1,32 @@
+import asyncio
+from collections import Counter
+import hashlib
 import os
+import re
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import aiofiles
+import aiofiles.os
+import anyio
+from PIL import Image, ImageOps, UnidentifiedImageError
 #import cloudinary
 #import cloudinary.uploader
 from fastapi import UploadFile, HTTPException, status
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import uuid
 from pathlib import Path
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
 
 from ..config import settings
+from ..models import ImageRef
+from .image_refs import image_ref_add
+from .image_variants import IMAGE_VARIANTS
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +44,18 @@ else:
 UPLOAD_DIR = Path("uploads").resolve()
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Uploads arrive here in pieces and are renamed into place when complete
+INCOMING_FOLDER = ".incoming"
+
+# Uploads are copied in chunks of this size, never held whole in memory
+CHUNK_SIZE = 64 * 1024
+
+# Shared by every request in this worker, so a burst of listings cannot
+# open an unbounded number of connections to the image store. Created on
+# first use, for the event loop that uses it (see _upload_slots_for_loop)
+_upload_slots: Optional[asyncio.Semaphore] = None
+_upload_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
 # Allowed extensions mapped from MIME types
 _MIME_TO_EXT = {
     "image/jpeg": "jpg",
@@ -32,6 +63,89 @@ _MIME_TO_EXT = {
     "image/webp": "webp",
 }
 
+_EXT_TO_FORMAT = {"jpg": "JPEG", "png": "PNG", "webp": "WEBP"}
+
+WEBP_QUALITY = 80
+
+_image_pool: Optional[ProcessPoolExecutor] = None
+
+
+def process_image(source: str, stem: str, ext: str, variants: Dict[str, Tuple[int, int]]) -> Optional[str]:
+    """
+    Rewrite ``source`` in place without its metadata (EXIF, GPS, comments),
+    applying the EXIF orientation first, and write ``<stem>.<variant>.webp``
+    for each variant. Returns the SHA-256 of the rewritten file, or None if
+    ``source`` is not a decodable image. Runs in the image worker processes.
+    """
+    try:
+        with Image.open(source) as image:
+            image.load()
+            ImageOps.exif_transpose(image, in_place=True)
+            options = {"icc_profile": image.info.get("icc_profile")}
+            if ext == "jpg":
+                # Re-use the upload's quantisation tables: no visible generation loss
+                options["quality"] = "keep" if image.format == "JPEG" and image.mode in ("L", "RGB", "CMYK") else 90
+            image.save(source, format=_EXT_TO_FORMAT[ext], **options)
+
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            base = image.convert("RGBA" if has_alpha else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        return None
+
+    for name, size in variants.items():
+        copy = base.copy()
+        copy.thumbnail(size, Image.Resampling.LANCZOS)
+        copy.save(f"{stem}.{name}.webp", format="WEBP", quality=WEBP_QUALITY, method=4)
+
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def run_image_job(fn, *args):
+    """Run ``fn(*args)`` in the image worker processes (or the threadpool if IMAGE_WORKERS is 0)."""
+    global _image_pool
+    if settings.IMAGE_WORKERS <= 0:
+        return await run_in_threadpool(fn, *args)
+    if _image_pool is None:
+        _image_pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return await asyncio.wrap_future(_image_pool.submit(fn, *args))
+
+
+def shutdown_image_pool() -> None:
+    global _image_pool
+    if _image_pool is not None:
+        _image_pool.shutdown(wait=False, cancel_futures=True)
+        _image_pool = None
+
+
+def _variant_path(file_path: Path, variant: str) -> Path:
+    return Path(f"{file_path.with_suffix('')}.{variant}.webp")
+
+
+def _remove_variants(file_path: Path) -> None:
+    for name in IMAGE_VARIANTS:
+        _variant_path(file_path, name).unlink(missing_ok=True)
+
+
+async def _store_blob(temp_path: Path, file_path: Path) -> None:
+    """
+    Move a processed upload and its variants to their content-addressed
+    names. If the blob is already stored the copies are simply dropped:
+    same name, same bytes.
+    """
+    if await aiofiles.os.path.exists(file_path):
+        return
+    # Variants first, so an original that exists always has them
+    for name in IMAGE_VARIANTS:
+        await aiofiles.os.replace(_variant_path(temp_path, name), _variant_path(file_path, name))
+    # Same filesystem: readers see the whole file or nothing
+    await aiofiles.os.replace(temp_path, file_path)
+
 
 def _validate_image(file: UploadFile) -> str:
     """Validate image file type and return safe extension. Raises HTTPException on failure."""
@@ -44,34 +158,76 @@ def _validate_image(file: UploadFile) -> str:
     return _MIME_TO_EXT.get(content_type, "jpg")
 
 
-async def upload_image(file: UploadFile, folder: str = "listings") -> Optional[str]:
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Image too large. Maximum size is {settings.MAX_IMAGE_SIZE_MB}MB"
+    )
+
+
+async def _receive(file: UploadFile) -> Path:
+    """
+    Stream ``file`` into a temporary file under UPLOAD_DIR, CHUNK_SIZE bytes
+    at a time, giving up as soon as it exceeds the size limit. The caller
+    owns (and must move or remove) the returned path.
+    """
+    max_bytes = settings.MAX_IMAGE_SIZE_MB * 1024 * 1024
+    # The multipart parser already knows the size of spooled uploads
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large()
+
+    incoming = UPLOAD_DIR / INCOMING_FOLDER
+    incoming.mkdir(exist_ok=True)
+    temp_path = incoming / f"{uuid.uuid4().hex}.part"
+    received = 0
+    try:
+        async with aiofiles.open(temp_path, 'wb') as out:
+            while chunk := await file.read(CHUNK_SIZE):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise _too_large()
+                await out.write(chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return temp_path
+
+
+async def upload_image(db: Session, file: UploadFile, folder: str = "listings") -> Optional[str]:
     """
     Upload image to Cloudinary or local storage.
-    Returns the URL of the uploaded image.
+    Returns the URL of the uploaded image. A local image comes with a
+    reference already held in image_refs; pass the URL to release_images
+    once the row that uses it is committed (or to delete_images with
+    ``uploaded=True`` if it never will be), or to their _async versions
+    from async code.
     """
     if not file:
         return None
 
     ext = _validate_image(file)
 
-    # Read content and check size
-    content = await file.read()
-    max_bytes = settings.MAX_IMAGE_SIZE_MB * 1024 * 1024
-    if len(content) > max_bytes:
+    # Sanitise folder name to prevent path traversal
+    safe_folder = Path(folder).name  # strips any "../" tricks
+    folder_path = (UPLOAD_DIR / safe_folder).resolve()
+    if not str(folder_path).startswith(str(UPLOAD_DIR)) or safe_folder == INCOMING_FOLDER:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Image too large. Maximum size is {settings.MAX_IMAGE_SIZE_MB}MB"
+            detail="Invalid upload folder"
         )
 
     # Generate safe unique filename (no user-controlled parts)
     unique_filename = f"{uuid.uuid4().hex}.{ext}"
 
+    temp_path = await _receive(file)
+
     # If Cloudinary is configured, use it
     if settings.cloudinary_configured:
         try:
-            result = cloudinary.uploader.upload(
-                content,
-                folder=f"apsit_tradehub/{folder}",
+            result = await run_in_threadpool(
+                cloudinary.uploader.upload,
+                str(temp_path),
+                folder=f"apsit_tradehub/{safe_folder}",
                 public_id=unique_filename.split('.')[0],
                 resource_type="image"
             )
@@ -79,34 +235,80 @@ async def upload_image(file: UploadFile, folder: str = "listings") -> Optional[s
         except Exception as e:
             logger.error("Cloudinary upload failed: %s", e)
             return None
+        finally:
+            temp_path.unlink(missing_ok=True)
     else:
-        # Fall back to local storage
+        # Fall back to local storage: strip metadata and write the resized
+        # copies off the event loop, then file the result under its hash
         try:
-            # Sanitise folder name to prevent path traversal
-            safe_folder = Path(folder).name  # strips any "../" tricks
-            folder_path = (UPLOAD_DIR / safe_folder).resolve()
-            if not str(folder_path).startswith(str(UPLOAD_DIR)):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid upload folder"
-                )
             folder_path.mkdir(exist_ok=True)
-
-            file_path = folder_path / unique_filename
-            with open(file_path, 'wb') as f:
-                f.write(content)
-
-            return f"/uploads/{safe_folder}/{unique_filename}"
-        except HTTPException:
-            raise
+            sizes = {name: (size, size) for name, size in IMAGE_VARIANTS.items()}
+            digest = await run_image_job(process_image, str(temp_path), str(temp_path.with_suffix('')), ext, sizes)
+            if digest:
+                content_filename = f"{digest}.{ext}"
+                url = f"/uploads/{safe_folder}/{content_filename}"
+                # Referenced before _store_blob looks for an existing copy,
+                # so delete_images cannot remove it from under this upload
+                await run_in_threadpool(_hold_images, db, [url])
+                try:
+                    await _store_blob(temp_path, folder_path / content_filename)
+                except BaseException:
+                    await release_images_async(db, [url])
+                    raise
+                return url
         except Exception as e:
             logger.error("Local upload failed: %s", e)
             return None
+        finally:
+            temp_path.unlink(missing_ok=True)
+            _remove_variants(temp_path)
+
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The uploaded file is not a valid image"
+        )
+
+
+def _upload_slots_for_loop() -> asyncio.Semaphore:
+    """This worker's upload semaphore, (re)created for the running event loop."""
+    global _upload_slots, _upload_slots_loop
+    loop = asyncio.get_running_loop()
+    if _upload_slots is None or _upload_slots_loop is not loop:
+        _upload_slots = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+        _upload_slots_loop = loop
+    return _upload_slots
+
+
+async def upload_images(db: Session, files: List[Optional[UploadFile]], folder: str = "listings") -> List[Optional[str]]:
+    """
+    Upload several images concurrently; returns their URLs in order (None
+    where no file was given). All or nothing: if any upload fails, those
+    that succeeded are released again and the error is raised.
+    """
+    async def upload_one(file: Optional[UploadFile]) -> Optional[str]:
+        if not file:
+            return None
+        async with _upload_slots_for_loop():
+            url = await upload_image(db, file, folder=folder)
+        if url is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to upload images"
+            )
+        return url
+
+    results = await asyncio.gather(*(upload_one(file) for file in files), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await delete_images_async(db, [result for result in results if isinstance(result, str)], uploaded=True)
+        raise errors[0]
+    return results
 
 
 def delete_image(image_url: str) -> bool:
     """
-    Delete image from storage.
+    Delete image from storage, whether or not anything still uses it
+    (delete_images checks first).
     """
     if not image_url:
         return False
@@ -131,8 +333,171 @@ def delete_image(image_url: str) -> bool:
                     return False
                 if file_path.exists():
                     os.remove(file_path)
+                    _remove_variants(file_path)
                     return True
             return False
         except Exception as e:
             logger.error("Local delete failed: %s", e)
             return False
+
+
+def _hold_images(db: Session, image_urls, count: int = 1) -> None:
+    """Add ``count`` references to each local image in ``image_urls``, committed at once."""
+    with Session(bind=db.get_bind()) as session:
+        for url, times in Counter(url for url in image_urls if url and url.startswith('/uploads/')).items():
+            image_ref_add(session.connection(), url, count * times)
+        session.commit()
+
+
+def _delete_unused(db: Session, image_urls, release: bool) -> None:
+    """
+    Delete the local images in ``image_urls`` whose count is zero, first
+    dropping one upload reference per occurrence if ``release`` is set.
+    Each count is read with its row locked and the file removed before
+    that lock is let go, so an upload taking a new reference either
+    commits first (and the file stays) or waits and stores it again.
+    """
+    urls = Counter(url for url in image_urls if url and url.startswith('/uploads/'))
+    # Its own transaction: the caller's session may hold uncommitted changes
+    with Session(bind=db.get_bind()) as session:
+        for url, times in urls.items():
+            if release:
+                image_ref_add(session.connection(), url, -times)
+            count = session.scalar(select(ImageRef.ref_count).where(ImageRef.url == url).with_for_update())
+            if not count:
+                delete_image(url)
+            session.commit()
+
+
+def release_images(db: Session, image_urls) -> None:
+    """
+    Drop the references upload_image took for ``image_urls`` now that the
+    row using them is committed. Call once per upload, after the commit.
+    """
+    _delete_unused(db, image_urls, release=True)
+
+
+def delete_images(db: Session, image_urls, uploaded: bool = False) -> None:
+    """
+    Delete the images in ``image_urls`` that nothing references any more
+    (best effort). Call after committing the change that dropped them, or
+    with ``uploaded=True`` for fresh upload_image URLs that will not be
+    saved after all (their references are released first).
+    """
+    _delete_unused(db, image_urls, release=uploaded)
+    for image_url in set(filter(None, image_urls)):
+        if not image_url.startswith('/uploads/'):
+            delete_image(image_url)
+
+
+# For async routes: the reference counts are read and written through a
+# blocking Session (and the files removed), so keep that off the event loop
+
+async def release_images_async(db: Session, image_urls) -> None:
+    """release_images, run in the threadpool."""
+    await run_in_threadpool(release_images, db, image_urls)
+
+
+async def delete_images_async(db: Session, image_urls, uploaded: bool = False) -> None:
+    """delete_images, run in the threadpool."""
+    await run_in_threadpool(delete_images, db, image_urls, uploaded)
+
+
+# ============ SERVING ============
+
+# Files named by upload_image after their SHA-256 (and their variants)
+CONTENT_NAME = re.compile(r"[0-9a-f]{64}(\.[a-z]+)?\.(jpg|png|webp)")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Older uuid-named uploads: may be rewritten by scripts/generate_image_variants.py
+REVALIDATE_CACHE = "public, max-age=86400"
+
+_BYTE_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class PartialFileResponse(Response):
+    """206 response carrying bytes ``start``..``end`` (inclusive) of a file."""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, end: int, size: int, headers: Headers):
+        headers = MutableHeaders(headers=headers)
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        headers["content-length"] = str(end - start + 1)
+        super().__init__(status_code=status.HTTP_206_PARTIAL_CONTENT, headers=dict(headers))
+        self.path, self.start, self.end = path, start, end
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0 and bool(chunk)})
+                if not chunk:
+                    break
+
+
+def _byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    ``(start, end)`` for a single ``bytes=`` range, or None to send the
+    whole file (absent, malformed or multi-range headers). Raises 416 for
+    a range that starts past the end.
+    """
+    match = _BYTE_RANGE.fullmatch(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"content-range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+class UploadFiles(StaticFiles):
+    """
+    StaticFiles for uploads/. Content-named files never change, so they are
+    cached for a year with their name as a strong ETag and browsers never
+    re-request them; If-None-Match still gets a 304 for clients that do.
+    Single byte ranges are honoured, and files still being received are
+    never served.
+    """
+
+    def lookup_path(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        if Path(path).parts[:1] == (INCOMING_FOLDER,):
+            return "", None
+        return super().lookup_path(path)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        headers = {"accept-ranges": "bytes"}
+        if CONTENT_NAME.fullmatch(name):
+            headers["cache-control"] = IMMUTABLE_CACHE
+            headers["etag"] = f'"{name}"'
+        else:
+            headers["cache-control"] = REVALIDATE_CACHE
+
+        response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if status_code == 200 and range_header and if_range in (None, response.headers["etag"]):
+            byte_range = _byte_range(range_header, stat_result.st_size)
+            if byte_range:
+                return PartialFileResponse(full_path, *byte_range, stat_result.st_size, response.headers)
+        return response
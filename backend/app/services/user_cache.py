@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..config import settings
+from ..models import User
+from .events import event_bus
+
+logger = logging.getLogger(__name__)
+
+# Published on the event bus so every worker drops its copy
+INVALIDATION_CHANNEL = "user-cache"
+
+# Kept out of snapshots: changes without an ORM update of the user
+# (unread and profile counters) or should not sit in memory (password
+# hash). They are loaded from the database on first access instead.
+UNCACHED_COLUMNS = {
+    "unread_messages_count", "listing_count", "available_count", "sold_count",
+    "rating_sum", "rating_count", "hashed_password",
+}
+
+
+class UserCache:
+    """
+    Per-process LRU of user column snapshots with a TTL, so authenticated
+    requests can skip the ``SELECT ... FROM users`` for their token.
+
+    Entries are dropped when a session that changed the user commits (see
+    the session hooks below), on every worker through the event bus; the
+    TTL bounds staleness from writes that bypass the ORM.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a read racing with a write
+        # cannot store what it read before the write committed
+        self._generation = 0
+        self.hits = self.misses = self.invalidations = self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, snapshot: dict, generation: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, user_id: int) -> None:
+        """Drop one entry in this process only."""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user here and on every other worker."""
+        self.discard(user_id)
+        self.invalidations += 1
+        event_bus.publish(INVALIDATION_CHANNEL, {"user_id": user_id})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+user_cache = UserCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+
+
+def _snapshot(user: User) -> dict:
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+        if attr.key not in UNCACHED_COLUMNS
+    }
+
+
+def load_user(db: Session, user_id: int) -> Optional[User]:
+    """
+    The user with ``user_id`` attached to ``db``: rebuilt from the cache
+    without a query when possible, else loaded and cached.
+    """
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        generation = user_cache.generation()
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is not None:
+            user_cache.put(user_id, _snapshot(user), generation)
+        return user
+
+    return db.merge(_detached(snapshot), load=False)
+
+
+async def load_user_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    """load_user for an AsyncSession."""
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        generation = user_cache.generation()
+        user = await db.get(User, user_id)
+        if user is not None:
+            user_cache.put(user_id, _snapshot(user), generation)
+        return user
+
+    return await db.merge(_detached(snapshot), load=False)
+
+
+def _detached(snapshot: dict) -> User:
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_users(session, previous_transaction):
+    session.info.pop("changed_user_ids", None)
+
+
+async def listen_for_invalidations() -> None:
+    """Apply invalidations published by other workers (runs for the app's lifetime)."""
+    while True:
+        try:
+            async with event_bus.subscribe(INVALIDATION_CHANNEL) as subscription:
+                while True:
+                    event = await subscription.get()
+                    if event and "user_id" in event:
+                        user_cache.discard(event["user_id"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("User cache invalidation listener failed: %s", e)
+            await asyncio.sleep(1)
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+from sqlalchemy import case, func, literal_column, or_, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..database import SessionLocal
+from ..models import Listing, Review, User
+from .derived_counters import DerivedCounter, register
+
+logger = logging.getLogger(__name__)
+
+# What each model adds to its owner's counters on users: (owner column,
+# {counter: value summed over the owner's rows})
+USER_COUNTERS = {
+    Listing: (Listing.seller_id, {
+        "listing_count": literal_column("1"),
+        "available_count": case((Listing.status == "available", 1), else_=0),
+        "sold_count": case((Listing.status == "sold", 1), else_=0),
+    }),
+    Review: (Review.reviewed_user_id, {
+        "rating_count": literal_column("1"),
+        "rating_sum": Review.rating,
+    }),
+}
+
+# Attributes whose change moves a row between counters or owners
+USER_COUNTERS_TRACKED = {
+    Listing: ("seller_id", "status"),
+    Review: ("reviewed_user_id", "rating"),
+}
+
+
+def user_counter_values(model, *criteria):
+    """
+    ``{counter: scalar subquery}`` summing the matching ``model`` rows of
+    each user, correlated to the enclosing statement on users.
+    """
+    owner, counters = USER_COUNTERS[model]
+    users = User.__table__
+    return {
+        name: select(func.coalesce(func.sum(value), 0))
+        .where(owner == users.c.id, *criteria)
+        .correlate(users)
+        .scalar_subquery()
+        for name, value in counters.items()
+    }
+
+
+def user_counter_rows(connection, model, *criteria, sign: int = 1):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) the matching ``model`` rows'
+    contribution to their owners' counters in one UPDATE.
+    """
+    owner, _ = USER_COUNTERS[model]
+    users = User.__table__
+    changes = {
+        name: users.c[name] + value if sign > 0 else users.c[name] - value
+        for name, value in user_counter_values(model, *criteria).items()
+    }
+    connection.execute(
+        update(users).where(users.c.id.in_(select(owner).where(*criteria))).values(**changes)
+    )
+
+
+USER_PROFILE_COUNTERS = register(DerivedCounter("user_counters", user_counter_rows, USER_COUNTERS_TRACKED))
+
+
+def _live_counters() -> Dict:
+    """``{counter: correlated subquery}`` recomputing every counter from the live tables."""
+    live = {}
+    for model in USER_COUNTERS:
+        live.update(user_counter_values(model))
+    return live
+
+
+def average_rating(user: User):
+    """Mean review rating (one decimal) from the user's counters, None without reviews."""
+    if not user.rating_count:
+        return None
+    return round(user.rating_sum / user.rating_count, 1)
+
+
+def check_user_counters(db: Session) -> List[Dict]:
+    """
+    Compare the profile counters on users with listings and reviews. Returns
+    one ``{"user_id", "counter", "stored", "live"}`` entry per disagreement.
+    """
+    users = User.__table__
+    live = _live_counters()
+    rows = db.execute(
+        select(users.c.id, *(users.c[name] for name in live), *(value.label(f"live_{name}") for name, value in live.items()))
+        .where(or_(*(users.c[name] != value for name, value in live.items())))
+        .order_by(users.c.id)
+    ).mappings()
+
+    return [
+        {"user_id": row["id"], "counter": name, "stored": row[name], "live": row[f"live_{name}"]}
+        for row in rows for name in live
+        if row[name] != row[f"live_{name}"]
+    ]
+
+
+def rebuild_user_counters(db: Session, user_ids=None) -> int:
+    """Recompute the counters of ``user_ids`` (all users if None). Returns the rows updated."""
+    users = User.__table__
+    statement = update(users).values(**_live_counters())
+    if user_ids is not None:
+        statement = statement.where(users.c.id.in_(user_ids))
+    return db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+
+def reconcile_user_counters(db: Session) -> List[Dict]:
+    """Rebuild the counters of users that have drifted; returns what was wrong."""
+    mismatches = check_user_counters(db)
+    if mismatches:
+        rebuild_user_counters(db, sorted({m["user_id"] for m in mismatches}))
+    return mismatches
+
+
+def _reconcile_once() -> None:
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_user_counters(db)
+        db.commit()
+        if mismatches:
+            users = len({m["user_id"] for m in mismatches})
+            logger.warning("Profile counters drifted for %d users; rebuilt", users)
+    except Exception as e:
+        db.rollback()
+        logger.error("Profile counter reconciliation failed: %s", e)
+    finally:
+        db.close()
+
+
+async def reconcile_user_counters_forever(interval_seconds: int) -> None:
+    """
+    Background job: every ``interval_seconds``, repair profile counters the
+    write hooks missed (raw SQL edits, bulk loads).
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await run_in_threadpool(_reconcile_once)
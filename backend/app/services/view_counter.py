@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import threading
+from collections import Counter
+
+from sqlalchemy import bindparam, update
+from starlette.concurrency import run_in_threadpool
+
+from ..database import engine
+from ..models import Listing
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Listing detail views, buffered in memory and written in batches, so a
+    page view is a pure read: no transaction, no row lock, and no lost
+    increments from concurrent ``views = views + 1`` read-modify-writes.
+    """
+
+    def __init__(self, bind):
+        self.bind = bind
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self.flushed = 0
+
+    def record(self, listing_id: int) -> None:
+        with self._lock:
+            self._pending[listing_id] += 1
+
+    def pending(self, listing_id: int) -> int:
+        """Views of ``listing_id`` not yet written to the database."""
+        return self._pending.get(listing_id, 0)
+
+    def flush(self) -> int:
+        """
+        Add the buffered views to listings.views with one executemany UPDATE
+        (``views = views + n``). Returns the number of views written; on
+        failure they go back into the buffer.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+        if not batch:
+            return 0
+
+        listings = Listing.__table__
+        statement = (
+            update(listings)
+            .where(listings.c.id == bindparam("listing_id"))
+            .values(views=listings.c.views + bindparam("n"))
+        )
+        # Same row order in every worker, so concurrent flushes cannot deadlock
+        rows = [{"listing_id": listing_id, "n": n} for listing_id, n in sorted(batch.items())]
+        try:
+            with self.bind.begin() as connection:
+                connection.execute(statement, rows)
+        except Exception:
+            with self._lock:
+                self._pending.update(batch)
+            raise
+        total = sum(batch.values())
+        self.flushed += total
+        return total
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pending_listings": len(self._pending),
+            "pending_views": sum(self._pending.values()),
+            "flushed": self.flushed,
+        }
+
+
+view_counter = ViewCounter(engine)
+
+
+def flush_views(final: bool = False) -> None:
+    """Flush the buffer, logging instead of raising (``final``: nothing will retry)."""
+    try:
+        view_counter.flush()
+    except Exception as e:
+        if final:
+            logger.error("Dropping %d buffered listing views: %s", view_counter.stats()["pending_views"], e)
+        else:
+            logger.error("Flushing listing views failed, will retry: %s", e)
+
+
+async def flush_views_forever(interval_seconds: float) -> None:
+    """Background job: write the buffered views every ``interval_seconds``."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await run_in_threadpool(flush_views)
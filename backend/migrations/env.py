@@ -0,0 +1,63 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.database import Base, engine as app_engine
+import app.models  # noqa: F401  (registers the tables)
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Objects created by raw DDL rather than from the models (see models.LISTING_SEARCH_DDL)
+UNMANAGED_TABLE_PREFIXES = ("listings_fts",)
+UNMANAGED_COLUMNS = {("listings", "search_vector")}
+UNMANAGED_INDEXES = {"ix_listings_search_vector"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table":
+        return not name.startswith(UNMANAGED_TABLE_PREFIXES)
+    if type_ == "column":
+        return (obj.table.name, name) not in UNMANAGED_COLUMNS
+    if type_ == "index":
+        return name not in UNMANAGED_INDEXES
+    return True
+
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can only ALTER by copying the table
+        render_as_batch=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit the SQL to stdout instead of running it (alembic upgrade --sql)."""
+    url = config.get_main_option("sqlalchemy.url") or app_engine.url.render_as_string(hide_password=False)
+    _configure(url=url, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    url = config.get_main_option("sqlalchemy.url")
+    connectable = create_engine(url, poolclass=pool.NullPool) if url else app_engine
+
+    with connectable.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,231 @@
+"""baseline schema
+
+The schema as it stood before migrations were introduced (previously
+created by Base.metadata.create_all at startup). Databases created that
+way should be stamped at this revision, then upgraded.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('icon', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=True),
+    sa.Column('google_id', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('profile_picture', sa.String(length=500), nullable=True),
+    sa.Column('role', sa.Enum('user', 'admin', 'super_admin', name='roleenum'), nullable=True),
+    sa.Column('is_banned', sa.Boolean(), nullable=True),
+    sa.Column('banned_reason', sa.String(length=500), nullable=True),
+    sa.Column('banned_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('banned_by', sa.Integer(), nullable=True),
+    sa.Column('ban_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['banned_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('google_id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    op.create_table('admin_activity_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=100), nullable=False),
+    sa.Column('target_type', sa.String(length=50), nullable=True),
+    sa.Column('target_id', sa.Integer(), nullable=True),
+    sa.Column('details', sa.Text(), nullable=True),
+    sa.Column('ip_address', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['admin_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_admin_activity_logs_id'), 'admin_activity_logs', ['id'], unique=False)
+
+    op.create_table('listings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('condition', sa.String(length=20), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('image_url_2', sa.String(length=500), nullable=True),
+    sa.Column('image_url_3', sa.String(length=500), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('views', sa.Integer(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('hidden_reason', sa.String(length=500), nullable=True),
+    sa.Column('hidden_by', sa.Integer(), nullable=True),
+    sa.Column('hidden_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['hidden_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_listings_category', 'listings', ['category'], unique=False)
+    op.create_index('ix_listings_created_at', 'listings', ['created_at'], unique=False)
+    op.create_index(op.f('ix_listings_id'), 'listings', ['id'], unique=False)
+    op.create_index('ix_listings_seller_id', 'listings', ['seller_id'], unique=False)
+    op.create_index('ix_listings_status', 'listings', ['status'], unique=False)
+    op.create_index('ix_listings_status_created', 'listings', ['status', 'created_at'], unique=False)
+
+    op.create_table('platform_settings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.Text(), nullable=True),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    op.create_index(op.f('ix_platform_settings_id'), 'platform_settings', ['id'], unique=False)
+
+    op.create_table('favorites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('listing_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_favorites_id'), 'favorites', ['id'], unique=False)
+    op.create_index('ix_favorites_user_listing', 'favorites', ['user_id', 'listing_id'], unique=True)
+
+    op.create_table('messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('receiver_id', sa.Integer(), nullable=False),
+    sa.Column('listing_id', sa.Integer(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('is_flagged', sa.Boolean(), nullable=True),
+    sa.Column('flagged_reason', sa.String(length=200), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('deleted_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ),
+    sa.ForeignKeyConstraint(['receiver_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
+
+    op.create_table('reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reviewer_id', sa.Integer(), nullable=False),
+    sa.Column('reviewed_user_id', sa.Integer(), nullable=False),
+    sa.Column('listing_id', sa.Integer(), nullable=True),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ),
+    sa.ForeignKeyConstraint(['reviewed_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['reviewer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reviews_id'), 'reviews', ['id'], unique=False)
+
+    op.create_table('reports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reporter_id', sa.Integer(), nullable=False),
+    sa.Column('report_type', sa.Enum('user', 'listing', 'message', name='reporttypeenum'), nullable=False),
+    sa.Column('reported_user_id', sa.Integer(), nullable=True),
+    sa.Column('listing_id', sa.Integer(), nullable=True),
+    sa.Column('message_id', sa.Integer(), nullable=True),
+    sa.Column('reason', sa.Enum('spam', 'fake', 'inappropriate', 'scam', 'harassment', 'other', name='reportreasonenum'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.Enum('pending', 'reviewed', 'resolved', 'dismissed', name='reportstatusenum'), nullable=True),
+    sa.Column('reviewed_by', sa.Integer(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('action_taken', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ),
+    sa.ForeignKeyConstraint(['message_id'], ['messages.id'], ),
+    sa.ForeignKeyConstraint(['reported_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['reporter_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reports_id'), 'reports', ['id'], unique=False)
+
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_reports_id'), table_name='reports')
+
+    op.drop_table('reports')
+    op.drop_index(op.f('ix_reviews_id'), table_name='reviews')
+
+    op.drop_table('reviews')
+    op.drop_index(op.f('ix_messages_id'), table_name='messages')
+
+    op.drop_table('messages')
+    op.drop_index('ix_favorites_user_listing', table_name='favorites')
+    op.drop_index(op.f('ix_favorites_id'), table_name='favorites')
+
+    op.drop_table('favorites')
+    op.drop_index(op.f('ix_platform_settings_id'), table_name='platform_settings')
+
+    op.drop_table('platform_settings')
+    op.drop_index('ix_listings_status_created', table_name='listings')
+    op.drop_index('ix_listings_status', table_name='listings')
+    op.drop_index('ix_listings_seller_id', table_name='listings')
+    op.drop_index(op.f('ix_listings_id'), table_name='listings')
+    op.drop_index('ix_listings_created_at', table_name='listings')
+    op.drop_index('ix_listings_category', table_name='listings')
+
+    op.drop_table('listings')
+    op.drop_index(op.f('ix_admin_activity_logs_id'), table_name='admin_activity_logs')
+
+    op.drop_table('admin_activity_logs')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+    op.drop_table('users')
+    op.drop_index(op.f('ix_categories_id'), table_name='categories')
+
+    op.drop_table('categories')
+
+    # PostgreSQL keeps enum types after their tables are dropped
+    for enum_name in ("reportstatusenum", "reportreasonenum", "reporttypeenum", "roleenum"):
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,109 @@
+"""listing full-text search and status/price index
+
+PostgreSQL gets a generated tsvector column with a GIN index, SQLite an
+FTS5 table kept in sync by triggers. Indexes are built CONCURRENTLY on
+PostgreSQL so listings stay writable while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+POSTGRES_UPGRADE = [
+    """
+    ALTER TABLE listings ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+]
+POSTGRES_CONCURRENT_UPGRADE = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_listings_search_vector ON listings USING GIN (search_vector)",
+]
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_listings_search_vector",
+    "ALTER TABLE listings DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+        title, description,
+        content='listings', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS listings_fts_ai AFTER INSERT ON listings BEGIN
+        INSERT INTO listings_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS listings_fts_ad AFTER DELETE ON listings BEGIN
+        INSERT INTO listings_fts(listings_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS listings_fts_au AFTER UPDATE OF title, description ON listings BEGIN
+        INSERT INTO listings_fts(listings_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO listings_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    # Index rows that existed before the triggers
+    "INSERT INTO listings_fts(listings_fts) VALUES ('rebuild')",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS listings_fts_au",
+    "DROP TRIGGER IF EXISTS listings_fts_ad",
+    "DROP TRIGGER IF EXISTS listings_fts_ai",
+    "DROP TABLE IF EXISTS listings_fts",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_UPGRADE:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        if dialect == "postgresql":
+            for statement in POSTGRES_CONCURRENT_UPGRADE:
+                op.execute(statement)
+        op.create_index(
+            'ix_listings_status_price', 'listings', ['status', 'price'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_status_price', table_name='listings')
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
@@ -0,0 +1,118 @@
+"""materialized conversations and unread counters
+
+Adds the conversations table, messages.conversation_id and
+users.unread_messages_count, then backfills them from existing messages.
+Objects already created by scripts/backfill_conversations.py are left as
+they are.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _backfill(dialect: str) -> None:
+    if dialect == "postgresql":
+        low, high = "LEAST(sender_id, receiver_id)", "GREATEST(sender_id, receiver_id)"
+    else:
+        low, high = "MIN(sender_id, receiver_id)", "MAX(sender_id, receiver_id)"
+
+    op.execute(f"""
+        INSERT INTO conversations
+            (user_a_id, user_b_id, listing_id, last_message_id, last_message_at, unread_count_a, unread_count_b)
+        SELECT {low}, {high}, listing_id, MAX(id), MAX(created_at),
+               SUM(CASE WHEN is_read = FALSE AND receiver_id = {low} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN is_read = FALSE AND receiver_id = {high} THEN 1 ELSE 0 END)
+        FROM messages
+        GROUP BY {low}, {high}, listing_id
+    """)
+    op.execute(f"""
+        UPDATE messages SET conversation_id = (
+            SELECT c.id FROM conversations c
+            WHERE c.user_a_id = {low} AND c.user_b_id = {high} AND c.listing_id = messages.listing_id
+        )
+    """)
+    op.execute("""
+        UPDATE users SET unread_messages_count = (
+            SELECT COUNT(*) FROM messages m WHERE m.receiver_id = users.id AND m.is_read = FALSE
+        )
+    """)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table('conversations'):
+        op.create_table('conversations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_a_id', sa.Integer(), nullable=False),
+        sa.Column('user_b_id', sa.Integer(), nullable=False),
+        sa.Column('listing_id', sa.Integer(), nullable=True),
+        sa.Column('last_message_id', sa.Integer(), nullable=True),
+        sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('unread_count_a', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('unread_count_b', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ),
+        sa.ForeignKeyConstraint(['user_a_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['user_b_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_conversations_participants_listing', 'conversations', ['user_a_id', 'user_b_id', 'listing_id'],
+        unique=True, if_not_exists=True
+    )
+    op.create_index(
+        'ix_conversations_user_a_last', 'conversations', ['user_a_id', 'last_message_at'],
+        unique=False, if_not_exists=True
+    )
+    op.create_index(
+        'ix_conversations_user_b_last', 'conversations', ['user_b_id', 'last_message_at'],
+        unique=False, if_not_exists=True
+    )
+
+    user_columns = {c['name'] for c in inspector.get_columns('users')}
+    if 'unread_messages_count' not in user_columns:
+        with op.batch_alter_table('users', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('unread_messages_count', sa.Integer(), server_default='0', nullable=False))
+
+    message_columns = {c['name'] for c in inspector.get_columns('messages')}
+    if 'conversation_id' not in message_columns:
+        with op.batch_alter_table('messages', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('conversation_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                'fk_messages_conversation_id', 'conversations', ['conversation_id'], ['id']
+            )
+    op.create_index(op.f('ix_messages_conversation_id'), 'messages', ['conversation_id'], unique=False, if_not_exists=True)
+
+    if bind.execute(sa.text("SELECT COUNT(*) FROM conversations")).scalar() == 0:
+        _backfill(bind.dialect.name)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_messages_conversation_id'), table_name='messages')
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_messages_conversation_id', type_='foreignkey')
+        batch_op.drop_column('conversation_id')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('unread_messages_count')
+
+    op.drop_index('ix_conversations_user_b_last', table_name='conversations')
+    op.drop_index('ix_conversations_user_a_last', table_name='conversations')
+    op.drop_index('ix_conversations_participants_listing', table_name='conversations')
+    op.drop_index(op.f('ix_conversations_id'), table_name='conversations')
+    op.drop_table('conversations')
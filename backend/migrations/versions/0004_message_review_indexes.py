@@ -0,0 +1,46 @@
+"""composite indexes for message and review access paths
+
+Built CONCURRENTLY on PostgreSQL so messages and reviews stay writable
+while the indexes build.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_messages_listing_sender_receiver', 'messages', ['listing_id', 'sender_id', 'receiver_id', 'created_at']),
+    ('ix_messages_receiver_read', 'messages', ['receiver_id', 'is_read']),
+    ('ix_messages_sender_id', 'messages', ['sender_id']),
+    ('ix_reviews_reviewed_user_rating', 'reviews', ['reviewed_user_id', 'rating']),
+    ('ix_reviews_reviewer_reviewed_listing', 'reviews', ['reviewer_id', 'reviewed_user_id', 'listing_id']),
+    ('ix_reviews_listing_id', 'reviews', ['listing_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+"""report moderation queue indexes
+
+Built CONCURRENTLY on PostgreSQL so reports stay writable while the
+indexes build.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_reports_status_created', 'reports', ['status', 'created_at']),
+    ('ix_reports_reason_created', 'reports', ['reason', 'created_at']),
+    ('ix_reports_reporter_id', 'reports', ['reporter_id']),
+    ('ix_reports_reported_user_id', 'reports', ['reported_user_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
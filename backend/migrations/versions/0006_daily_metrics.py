@@ -0,0 +1,90 @@
+"""daily metrics rollup for admin analytics
+
+Adds the daily_metrics table and backfills it from users, listings and
+messages; afterwards the ORM write hooks keep it current. Also indexes
+users.last_login for the "active today" count.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 10:40:00
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+METRICS = [
+    'new_users', 'banned_users', 'new_listings', 'available_listings',
+    'sold_listings', 'hidden_listings', 'new_messages',
+]
+
+# Per source table: metric column -> SQL counted per row
+SOURCES = {
+    'users': {
+        'new_users': '1',
+        'banned_users': 'CASE WHEN is_banned THEN 1 ELSE 0 END',
+    },
+    'listings': {
+        'new_listings': '1',
+        'available_listings': "CASE WHEN status = 'available' THEN 1 ELSE 0 END",
+        'sold_listings': "CASE WHEN status = 'sold' THEN 1 ELSE 0 END",
+        'hidden_listings': "CASE WHEN status = 'hidden' THEN 1 ELSE 0 END",
+    },
+    'messages': {
+        'new_messages': '1',
+    },
+}
+
+
+def _backfill(bind) -> None:
+    if bind.dialect.name == "postgresql":
+        day = "CAST(date_trunc('day', created_at) AS DATE)"
+    else:
+        day = "date(created_at)"
+
+    days = {}
+    for table, metrics in SOURCES.items():
+        sums = ", ".join(f"SUM({expression}) AS {name}" for name, expression in metrics.items())
+        rows = bind.execute(sa.text(
+            f"SELECT {day} AS day, {sums} FROM {table} WHERE created_at IS NOT NULL GROUP BY {day}"
+        )).mappings()
+        for row in rows:
+            values = days.setdefault(str(row['day'])[:10], dict.fromkeys(METRICS, 0))
+            values.update((name, row[name]) for name in metrics)
+
+    daily_metrics = sa.table('daily_metrics', sa.column('day', sa.Date()), *(sa.column(m, sa.Integer()) for m in METRICS))
+    op.bulk_insert(daily_metrics, [
+        {'day': date.fromisoformat(day), **values} for day, values in sorted(days.items())
+    ])
+
+
+def upgrade() -> None:
+    op.create_table('daily_metrics',
+    sa.Column('day', sa.Date(), nullable=False),
+    *(sa.Column(name, sa.Integer(), server_default='0', nullable=False) for name in METRICS),
+    sa.PrimaryKeyConstraint('day')
+    )
+    _backfill(op.get_bind())
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_users_last_login'), 'users', ['last_login'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_users_last_login'), table_name='users', postgresql_concurrently=True, if_exists=True)
+    op.drop_table('daily_metrics')
@@ -0,0 +1,45 @@
+"""image reference counts for shared uploads
+
+Adds image_refs and fills it from the image columns of listings and
+users; afterwards the ORM write hooks keep it current.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+IMAGE_COLUMNS = {
+    'listings': ['image_url', 'image_url_2', 'image_url_3'],
+    'users': ['profile_picture'],
+}
+
+
+def upgrade() -> None:
+    op.create_table('image_refs',
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('url')
+    )
+
+    urls = " UNION ALL ".join(
+        f"SELECT {column} AS url FROM {table} WHERE {column} LIKE '/uploads/%'"
+        for table, columns in IMAGE_COLUMNS.items() for column in columns
+    )
+    op.execute(f"INSERT INTO image_refs (url, ref_count) SELECT url, COUNT(*) FROM ({urls}) AS refs GROUP BY url")
+
+
+def downgrade() -> None:
+    op.drop_table('image_refs')
@@ -0,0 +1,45 @@
+"""profile counters on users
+
+Adds the listing and rating counters the profile pages read and fills
+them from listings and reviews; afterwards the ORM write hooks keep them
+current.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 18:40:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTERS = {
+    'listing_count': "SELECT COUNT(*) FROM listings WHERE listings.seller_id = users.id",
+    'available_count': "SELECT COUNT(*) FROM listings WHERE listings.seller_id = users.id AND listings.status = 'available'",
+    'sold_count': "SELECT COUNT(*) FROM listings WHERE listings.seller_id = users.id AND listings.status = 'sold'",
+    'rating_sum': "SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.reviewed_user_id = users.id",
+    'rating_count': "SELECT COUNT(*) FROM reviews WHERE reviews.reviewed_user_id = users.id",
+}
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        for name in COUNTERS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("UPDATE users SET " + ", ".join(f"{name} = ({query})" for name, query in COUNTERS.items()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        for name in reversed(list(COUNTERS)):
+            batch_op.drop_column(name)
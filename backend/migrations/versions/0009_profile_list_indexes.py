@@ -0,0 +1,60 @@
+"""ordering indexes for the paged profile lists
+
+The per-user and per-listing review, listing and favorite lists page
+newest first by (created_at, id); each gets an index on its filter column
+plus created_at. ix_listings_seller_id and ix_reviews_listing_id are
+prefixes of the new indexes and are dropped. Built CONCURRENTLY on
+PostgreSQL like 0004.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 20:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_listings_seller_created', 'listings', ['seller_id', 'created_at']),
+    ('ix_reviews_listing_created', 'reviews', ['listing_id', 'created_at']),
+    ('ix_reviews_reviewed_user_created', 'reviews', ['reviewed_user_id', 'created_at']),
+    ('ix_reviews_reviewer_created', 'reviews', ['reviewer_id', 'created_at']),
+    ('ix_favorites_user_created', 'favorites', ['user_id', 'created_at']),
+]
+
+REPLACED = [
+    ('ix_listings_seller_id', 'listings', ['seller_id']),
+    ('ix_reviews_listing_id', 'reviews', ['listing_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+        for name, table, _ in REPLACED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,47 @@
+"""conversation page index on messages
+
+Conversation pages read a conversation's messages newest first and seek
+with "before id", so index (conversation_id, id). The single-column
+ix_messages_conversation_id is a prefix of it and is dropped. Built
+CONCURRENTLY on PostgreSQL like 0004.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 21:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_conversation_message', 'messages', ['conversation_id', 'id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index(
+            'ix_messages_conversation_id', table_name='messages',
+            postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_conversation_id', 'messages', ['conversation_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index(
+            'ix_messages_conversation_message', table_name='messages',
+            postgresql_concurrently=True, if_exists=True
+        )
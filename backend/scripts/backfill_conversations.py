@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Rebuild the conversations table and unread counters from the messages.
+
+Migration 0003 creates and backfills them, and message inserts keep them
+in sync afterwards; run this to repair drift (e.g. after editing messages
+by hand or bulk-loading them without the ORM).
+
+Usage:
+    cd backend
+    python scripts/backfill_conversations.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.conversations import rebuild_conversations
+
+
+def backfill():
+    db = SessionLocal()
+    try:
+        count = rebuild_conversations(db)
+        db.commit()
+        print(f"✅ Rebuilt {count} conversations and all unread counters")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Backfill failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the inbox query behind GET /api/messages/conversations.
+
+Seeds an in-memory SQLite database with one user who has C conversations
+of M messages each, then times the inbox query (a read of the materialized
+conversations table) against the original implementation (load every
+message, group in Python, one COUNT per conversation). The inbox query
+stays at 1 round trip whatever M is; the old version issues 1 + C queries
+and materializes C * M ORM rows.
+
+Usage:
+    cd backend
+    python scripts/bench_conversations.py
+"""
+
+import sys
+import os
+import statistics
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert, or_, StaticPool
+from sqlalchemy.orm import sessionmaker, joinedload
+
+from app.database import Base
+from app.models import User, Listing, Message
+import app.services  # noqa: F401  (installs the derived-counter write hooks)
+from app.services.conversations import conversation_summaries, rebuild_conversations
+
+GRID = [(10, 10), (10, 100), (10, 1000), (100, 10), (100, 100), (1000, 10)]
+RUNS = 5
+
+
+def seed(db, conversations: int, per_conversation: int) -> int:
+    me = User(email="me@apsit.edu.in", name="Me")
+    db.add(me)
+    db.flush()
+    others = [User(email=f"u{i}@apsit.edu.in", name=f"User {i}") for i in range(conversations)]
+    db.add_all(others)
+    listing = Listing(
+        seller_id=me.id, title="Bench", description="Bench listing",
+        category="Books", condition="good", price=1.0
+    )
+    db.add(listing)
+    db.flush()
+
+    rows = []
+    for other in others:
+        for n in range(per_conversation):
+            mine = n % 2 == 0
+            rows.append({
+                "sender_id": me.id if mine else other.id,
+                "receiver_id": other.id if mine else me.id,
+                "listing_id": listing.id,
+                "content": f"message {n}",
+                "is_read": n < per_conversation - 3,
+            })
+    # Core bulk insert skips the ORM hooks, so materialize conversations afterwards
+    db.execute(insert(Message), rows)
+    rebuild_conversations(db)
+    db.commit()
+    return me.id
+
+
+def legacy(db, user_id: int):
+    """The pre-aggregate implementation, kept here for comparison."""
+    messages = db.query(Message).filter(
+        or_(Message.sender_id == user_id, Message.receiver_id == user_id)
+    ).options(
+        joinedload(Message.listing), joinedload(Message.sender), joinedload(Message.receiver)
+    ).order_by(Message.created_at.desc()).all()
+
+    seen = {}
+    for msg in messages:
+        other = msg.receiver if msg.sender_id == user_id else msg.sender
+        key = (other.id, msg.listing_id)
+        if key not in seen:
+            seen[key] = db.query(Message).filter(
+                Message.listing_id == msg.listing_id,
+                Message.receiver_id == user_id,
+                Message.sender_id == other.id,
+                Message.is_read == False
+            ).count()
+    return seen
+
+
+def aggregate(db, user_id: int):
+    return db.execute(conversation_summaries(user_id, limit=50)).all()
+
+
+def measure(fn, session_factory, engine, user_id):
+    timings, statements = [], []
+    for _ in range(RUNS):
+        db = session_factory()
+        count = [0]
+
+        def _count(*args):
+            count[0] += 1
+
+        event.listen(engine, "before_cursor_execute", _count)
+        start = time.perf_counter()
+        fn(db, user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+        event.remove(engine, "before_cursor_execute", _count)
+        statements.append(count[0])
+        db.close()
+    return statistics.median(timings), statements[0]
+
+
+def main():
+    print(f"{'convs':>6} {'msgs/conv':>9} | {'legacy ms':>10} {'queries':>8} | {'inbox ms':>12} {'queries':>8}")
+    for conversations, per_conversation in GRID:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as db:
+            user_id = seed(db, conversations, per_conversation)
+
+        legacy_ms, legacy_queries = measure(legacy, session_factory, engine, user_id)
+        agg_ms, agg_queries = measure(aggregate, session_factory, engine, user_id)
+        print(
+            f"{conversations:>6} {per_conversation:>9} | {legacy_ms:>10.1f} {legacy_queries:>8} | "
+            f"{agg_ms:>12.1f} {agg_queries:>8}"
+        )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
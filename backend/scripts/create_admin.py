@@ -14,8 +14,9 @@ import os
 # Add the parent directory to the path so we can import the app modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, run_migrations
 from app.models import User, RoleEnum
+import app.services  # noqa: F401  (installs the derived-counter write hooks)
 
 
 def create_admin():
@@ -25,8 +26,8 @@ def create_admin():
     print("  APSIT TradeHub - Create Super Admin")
     print("="*50 + "\n")
     
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    # Bring the schema up to date
+    run_migrations()
     
     db = SessionLocal()
     
@@ -102,7 +103,7 @@ def create_admin():
 
 def list_admins():
     """List all admin users."""
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
     db = SessionLocal()
     try:
         admins = db.query(User).filter(
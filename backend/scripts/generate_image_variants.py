@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Create the resized WebP copies for images uploaded before they existed.
+
+New uploads get their thumb/medium variants (and lose their EXIF data)
+when they are stored; this walks uploads/ and does the same for every
+original that is still missing a variant. Files that cannot be decoded
+are reported and left alone.
+
+Usage:
+    cd backend
+    python scripts/generate_image_variants.py
+    python scripts/generate_image_variants.py --dry-run   # only list what would change
+"""
+
+import sys
+import os
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.image_variants import IMAGE_VARIANTS
+from app.services.upload import INCOMING_FOLDER, UPLOAD_DIR, process_image
+
+
+def originals():
+    for path in sorted(UPLOAD_DIR.rglob("*")):
+        if not path.is_file() or INCOMING_FOLDER in path.parts:
+            continue
+        ext = path.suffix.lstrip(".").lower()
+        # <name>.<variant>.webp files are the copies themselves
+        if ext not in ("jpg", "png", "webp") or Path(path.stem).suffix.lstrip(".") in IMAGE_VARIANTS:
+            continue
+        yield path, ext
+
+
+def main(dry_run: bool):
+    sizes = {name: (size, size) for name, size in IMAGE_VARIANTS.items()}
+    done = failed = 0
+    for path, ext in originals():
+        stem = path.with_suffix("")
+        if all(Path(f"{stem}.{name}.webp").exists() for name in IMAGE_VARIANTS):
+            continue
+        if dry_run:
+            print(f"  would process {path.relative_to(UPLOAD_DIR)}")
+            done += 1
+        elif process_image(str(path), str(stem), ext, sizes):
+            done += 1
+        else:
+            print(f"  ❌ not a decodable image: {path.relative_to(UPLOAD_DIR)}")
+            failed += 1
+
+    print(f"✅ {'Would process' if dry_run else 'Processed'} {done} images" + (f", {failed} failed" if failed else ""))
+
+
+if __name__ == "__main__":
+    main("--dry-run" in sys.argv[1:])
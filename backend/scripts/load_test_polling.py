@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Load-test the polling routes: async session vs. the threadpool.
+
+The frontend polls GET /api/messages/unread/count and
+GET /api/messages/conversations every few seconds per open tab. Those
+routes now run on the AsyncSession; this script fires N concurrent
+pollers at them and, for comparison, at threadpool copies of the same
+routes (plain ``def`` handlers on the sync Session, i.e. the previous
+implementation), then prints throughput and latency for each.
+
+By default everything runs in-process against a seeded SQLite file. Point
+it at a running server instead (e.g. one build before and one after this
+change, both on PostgreSQL) with --base-url and a user's JWT; only the
+real routes are hit then.
+
+Usage:
+    cd backend
+    python scripts/load_test_polling.py
+    python scripts/load_test_polling.py --concurrency 10 100 500 --seconds 10
+    python scripts/load_test_polling.py --base-url http://localhost:8000 --token <jwt>
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUTES = {
+    "async": ["/api/messages/unread/count", "/api/messages/conversations"],
+    "threadpool": ["/bench/threadpool/unread/count", "/bench/threadpool/conversations"],
+}
+
+
+def build_app():
+    """The real app on a seeded SQLite file, plus threadpool copies of the polled routes."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load_test.db')}"
+
+    from fastapi import APIRouter, Depends
+    from sqlalchemy.orm import Session
+
+    from app.database import Base, SessionLocal, engine, get_db
+    from app.main import app
+    from app.models import Listing, Message, User
+    from app.services.auth import create_access_token, get_current_user
+    from app.services.conversations import conversation_summaries
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    me = User(email="poller@apsit.edu.in", name="Poller")
+    others = [User(email=f"peer{i}@apsit.edu.in", name=f"Peer {i}") for i in range(20)]
+    db.add_all([me, *others])
+    db.flush()
+    listing = Listing(
+        seller_id=me.id, title="Load test", description="Load test listing",
+        category="Books", condition="good", price=1.0
+    )
+    db.add(listing)
+    db.flush()
+    for n, other in enumerate(others * 5):
+        db.add(Message(sender_id=other.id, receiver_id=me.id, listing_id=listing.id, content=f"hi {n}"))
+    db.commit()
+    token = create_access_token({"sub": str(me.id)})
+    db.close()
+
+    threadpool = APIRouter(prefix="/bench/threadpool")
+
+    @threadpool.get("/unread/count")
+    def unread_count(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+        return {"unread_count": db.query(User.unread_messages_count).filter(User.id == user.id).scalar()}
+
+    @threadpool.get("/conversations")
+    def conversations(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+        return [row[0].id for row in db.execute(conversation_summaries(user.id, 50)).all()]
+
+    app.include_router(threadpool)
+    return app, token
+
+
+async def poll(client, paths, headers, deadline, latencies, errors):
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(paths[i % len(paths)], headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        i += 1
+
+
+async def run(client, paths, headers, concurrency, seconds):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(poll(client, paths, headers, deadline, latencies, errors) for _ in range(concurrency)))
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+
+    return len(latencies) / seconds, statistics.median(latencies) if latencies else 0.0, pct(0.95), pct(0.99), len(errors)
+
+
+async def main(args):
+    import httpx
+
+    if args.base_url:
+        modes = {"async": ROUTES["async"]}
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        token = args.token
+    else:
+        app, token = build_app()
+        modes = ROUTES
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60)
+
+    headers = {"Authorization": f"Bearer {token}"}
+    print(f"{'mode':>10} {'pollers':>8} | {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    async with client:
+        for concurrency in args.concurrency:
+            for mode, paths in modes.items():
+                rps, p50, p95, p99, errors = await run(client, paths, headers, concurrency, args.seconds)
+                print(f"{mode:>10} {concurrency:>8} | {rps:>8.0f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--base-url", help="Hit a running server instead of the in-process app")
+    parser.add_argument("--token", help="JWT of the polling user (with --base-url)")
+    args = parser.parse_args()
+    if args.base_url and not args.token:
+        parser.error("--base-url needs --token")
+    asyncio.run(main(args))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Rebuild or check the daily_metrics rollup behind the admin dashboard.
+
+Migration 0006 backfills it and the write hooks keep it current; the app
+also reconciles it every METRICS_RECONCILE_INTERVAL_SECONDS. Run this after
+bulk-loading or hand-editing users, listings or messages.
+
+Usage:
+    cd backend
+    python scripts/rebuild_metrics.py           # recompute from the live tables
+    python scripts/rebuild_metrics.py --check   # only report disagreements
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.analytics import check_rollup, rebuild_rollup
+
+
+def check():
+    db = SessionLocal()
+    try:
+        mismatches = check_rollup(db)
+        for m in mismatches:
+            print(f"  {m['day']}  {m['metric']:<20} stored={m['stored']} live={m['live']}")
+        if mismatches:
+            print(f"❌ {len(mismatches)} day/metric pairs disagree with the live tables")
+            sys.exit(1)
+        print("✅ daily_metrics matches the live tables")
+    finally:
+        db.close()
+
+
+def rebuild():
+    db = SessionLocal()
+    try:
+        days = rebuild_rollup(db)
+        db.commit()
+        print(f"✅ Rebuilt daily_metrics for {days} days")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        check()
+    else:
+        rebuild()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Create (if missing) and backfill the listings full-text search index.
+
+Migration 0002 installs the index; run this whenever the SQLite FTS5
+table needs rebuilding (e.g. after bulk-loading listings outside SQLite
+triggers, or after restoring a copy of the listings table).
+
+Usage:
+    cd backend
+    python scripts/rebuild_search_index.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.search import install_search_index
+
+
+def rebuild():
+    db = SessionLocal()
+    try:
+        install_search_index(db)
+        print("✅ Listing search index is up to date")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Rebuild or check the listing and rating counters on users.
+
+Migration 0008 backfills them and the write hooks keep them current; the
+app also reconciles them every USER_COUNTERS_RECONCILE_INTERVAL_SECONDS.
+Run this after bulk-loading or hand-editing listings or reviews.
+
+Usage:
+    cd backend
+    python scripts/rebuild_user_counters.py           # recompute from the live tables
+    python scripts/rebuild_user_counters.py --check   # only report disagreements
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.user_counters import check_user_counters, rebuild_user_counters
+
+
+def check():
+    db = SessionLocal()
+    try:
+        mismatches = check_user_counters(db)
+        for m in mismatches:
+            print(f"  user {m['user_id']:<8} {m['counter']:<16} stored={m['stored']} live={m['live']}")
+        if mismatches:
+            print(f"❌ {len(mismatches)} user/counter pairs disagree with the live tables")
+            sys.exit(1)
+        print("✅ User counters match the live tables")
+    finally:
+        db.close()
+
+
+def rebuild():
+    db = SessionLocal()
+    try:
+        users = rebuild_user_counters(db)
+        db.commit()
+        print(f"✅ Rebuilt counters for {users} users")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        check()
+    else:
+        rebuild()
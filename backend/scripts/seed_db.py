@@ -13,14 +13,14 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, run_migrations
 from app.models.models import User, RoleEnum, Listing, ConditionEnum, ListingStatusEnum
 from app.services.auth import get_password_hash
 
 
 def seed():
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Bring the schema up to date
+    run_migrations()
     db = SessionLocal()
 
     try:
@@ -1,25 +1,34 @@
 """
 Shared test fixtures for APSIT TradeHub backend tests.
 
-Uses an in-memory SQLite database so tests run without any external services.
+Uses a throwaway SQLite file so tests run without any external services;
+a file rather than :memory: so the sync and async engines share it.
 """
+import tempfile
+from pathlib import Path
+
 import pytest
 from typing import Generator, Callable
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, StaticPool
+from sqlalchemy import create_engine, event, NullPool, StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
-from app.database import Base, get_db
+from app.database import Base, async_database_url, get_async_db, get_db
 from app.main import app
 from app.models.models import User, Listing, Review, Message, Favorite, RoleEnum
 from app.services.auth import get_password_hash, create_access_token
+from app.services.listing_cache import listing_cache
+from app.services.rate_limit import rate_limiter
+from app.services.user_cache import user_cache
+from app.services.view_counter import view_counter
 
 
 # ---------------------------------------------------------------------------
 # Database fixtures
 # ---------------------------------------------------------------------------
 
-SQLALCHEMY_DATABASE_URL = "sqlite://"  # in-memory
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{Path(tempfile.mkdtemp()) / 'test.db'}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -28,6 +37,19 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Each TestClient runs its own event loop, so async connections are not pooled
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _fast_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.close()
+
 
 @pytest.fixture(autouse=True)
 def setup_database():
@@ -35,6 +57,11 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    # Ids are reused by the next test's fresh tables
+    user_cache.clear()
+    listing_cache.clear()
+    view_counter.reset()
+    rate_limiter.store.reset()
 
 
 @pytest.fixture()
@@ -55,7 +82,14 @@ def _override_get_db():
         session.close()
 
 
+async def _override_get_async_db():
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+
 app.dependency_overrides[get_db] = _override_get_db
+app.dependency_overrides[get_async_db] = _override_get_async_db
+view_counter.bind = engine
 
 
 @pytest.fixture()
@@ -65,6 +99,57 @@ def client() -> Generator[TestClient, None, None]:
         yield c
 
 
+def _statement_recorder(with_parameters: bool):
+    from contextlib import contextmanager
+
+    @contextmanager
+    def _record_statements():
+        statements: list = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters) if with_parameters else statement)
+
+        engines = (engine, async_engine.sync_engine)
+        for target in engines:
+            event.listen(target, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            for target in engines:
+                event.remove(target, "before_cursor_execute", _record)
+
+    return _record_statements
+
+
+@pytest.fixture()
+def count_queries() -> Callable:
+    """
+    Context manager counting SQL statements sent to the test database.
+
+        with count_queries() as queries:
+            client.get(...)
+        assert len(queries) == 3
+    """
+    return _statement_recorder(with_parameters=False)
+
+
+@pytest.fixture()
+def capture_queries() -> Callable:
+    """Like count_queries, but records ``(statement, parameters)`` pairs."""
+    return _statement_recorder(with_parameters=True)
+
+
+@pytest.fixture()
+def explain_plan() -> Callable:
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for a statement."""
+    def _explain(statement: str, parameters=()) -> list[str]:
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        return [row[-1] for row in rows]
+
+    return _explain
+
+
 # ---------------------------------------------------------------------------
 # Helper factories
 # ---------------------------------------------------------------------------
@@ -118,6 +203,7 @@ def create_test_listing(db: Session) -> Callable:
     def _create(
         seller: User,
         title: str | None = None,
+        description: str = "A valid test description that is long enough to pass validation checks.",
         price: float = 100.0,
         category: str = "Books",
         condition: str = "good",
@@ -129,7 +215,7 @@ def create_test_listing(db: Session) -> Callable:
         listing = Listing(
             seller_id=seller.id,
             title=title,
-            description="A valid test description that is long enough to pass validation checks.",
+            description=description,
             price=price,
             category=category,
             condition=condition,
@@ -0,0 +1,353 @@
+"""
+Tests for admin endpoints: /api/admin/*
+"""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, update
+from app.models.models import (
+    DailyMetric, ImageRef, Message, Report, ReportReasonEnum, ReportStatusEnum, ReportTypeEnum, Review, RoleEnum
+)
+from app.services.analytics import check_rollup, reconcile_rollup
+from app.services.user_counters import check_user_counters
+
+
+class TestAdminUserList:
+    """GET /api/admin/users"""
+
+    def _report(self, db, reporter, reported):
+        db.add(Report(
+            reporter_id=reporter.id, reported_user_id=reported.id,
+            report_type=ReportTypeEnum.user, reason=ReportReasonEnum.spam
+        ))
+        db.commit()
+
+    def test_counts(
+        self, client: TestClient, admin_user, admin_headers, create_test_user, create_test_listing, db
+    ):
+        """Each user carries their listing, sold and report counts."""
+        seller = create_test_user(email="seller@apsit.edu.in")
+        create_test_listing(seller=seller)
+        create_test_listing(seller=seller, status="sold")
+        create_test_listing(seller=seller, status="sold")
+        self._report(db, admin_user, seller)
+
+        response = client.get("/api/admin/users", headers=admin_headers)
+        assert response.status_code == 200
+        by_email = {u["email"]: u for u in response.json()["users"]}
+
+        assert by_email["seller@apsit.edu.in"]["listing_count"] == 3
+        assert by_email["seller@apsit.edu.in"]["trades_count"] == 2
+        assert by_email["seller@apsit.edu.in"]["reports_count"] == 1
+        assert by_email["admin@apsit.edu.in"]["listing_count"] == 0
+        assert by_email["admin@apsit.edu.in"]["reports_count"] == 0
+
+    def test_sort_by_trades(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing
+    ):
+        """sort_by=trades puts the users with the most sold listings first."""
+        for email, sold in (("one@apsit.edu.in", 1), ("three@apsit.edu.in", 3), ("two@apsit.edu.in", 2)):
+            user = create_test_user(email=email)
+            create_test_listing(seller=user)
+            for _ in range(sold):
+                create_test_listing(seller=user, status="sold")
+
+        response = client.get("/api/admin/users?sort_by=trades&limit=3", headers=admin_headers)
+        assert response.status_code == 200
+        assert [u["email"] for u in response.json()["users"]] == [
+            "three@apsit.edu.in", "two@apsit.edu.in", "one@apsit.edu.in"
+        ]
+
+    def test_constant_query_count(
+        self, client: TestClient, admin_user, admin_headers, create_test_user, create_test_listing,
+        count_queries, db
+    ):
+        """The number of queries does not grow with the page size."""
+        def add_user(i):
+            user = create_test_user(email=f"n{i}@apsit.edu.in")
+            create_test_listing(seller=user)
+            self._report(db, admin_user, user)
+
+        add_user(0)
+        client.get("/api/admin/users", headers=admin_headers)
+        with count_queries() as few:
+            client.get("/api/admin/users", headers=admin_headers)
+
+        for i in range(1, 10):
+            add_user(i)
+        with count_queries() as many:
+            response = client.get("/api/admin/users", headers=admin_headers)
+
+        assert len(response.json()["users"]) == 11
+        assert len(many) == len(few)
+
+
+class TestAdminListingList:
+    """GET /api/admin/listings"""
+
+    def test_constant_query_count(
+        self, client: TestClient, admin_user, admin_headers, create_test_user, create_test_listing,
+        count_queries, db
+    ):
+        """Sellers and report counts come with the page, however long it is."""
+        def add_listing(i):
+            seller = create_test_user(email=f"s{i}@apsit.edu.in", name=f"Seller {i}")
+            listing = create_test_listing(seller=seller)
+            db.add(Report(
+                reporter_id=admin_user.id, reported_user_id=seller.id, listing_id=listing.id,
+                report_type=ReportTypeEnum.listing, reason=ReportReasonEnum.spam
+            ))
+            db.commit()
+
+        add_listing(0)
+        client.get("/api/admin/listings", headers=admin_headers)
+        with count_queries() as few:
+            client.get("/api/admin/listings", headers=admin_headers)
+
+        for i in range(1, 10):
+            add_listing(i)
+        with count_queries() as many:
+            response = client.get("/api/admin/listings?limit=5", headers=admin_headers)
+
+        listings = response.json()["listings"]
+        assert len(listings) == 5
+        assert response.json()["next_cursor"]
+        assert all(item["reports_count"] == 1 and item["seller_name"].startswith("Seller") for item in listings)
+        assert len(many) == len(few)
+
+
+class TestAdminReports:
+    """GET /api/admin/reports and /api/admin/reports/{id}"""
+
+    def _seed(self, db, create_test_user, create_test_listing, count):
+        reporter = create_test_user(email="reporter@apsit.edu.in")
+        reviewer = create_test_user(email="mod@apsit.edu.in", name="Mod")
+        for i in range(count):
+            target = create_test_user(email=f"target{i}@apsit.edu.in", name=f"Target {i}")
+            listing = create_test_listing(seller=target, title=f"Item {i}")
+            db.add(Report(
+                reporter_id=reporter.id, reported_user_id=target.id, listing_id=listing.id,
+                report_type=ReportTypeEnum.listing,
+                reason=ReportReasonEnum.scam if i % 2 else ReportReasonEnum.spam,
+                reviewed_by=reviewer.id
+            ))
+        db.commit()
+        return reporter
+
+    def test_list_includes_related_names(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, db
+    ):
+        self._seed(db, create_test_user, create_test_listing, 1)
+        report = client.get("/api/admin/reports", headers=admin_headers).json()["reports"][0]
+        assert report["reporter_email"] == "reporter@apsit.edu.in"
+        assert report["reported_user_name"] == "Target 0"
+        assert report["listing_title"] == "Item 0"
+        assert report["reviewer_name"] == "Mod"
+
+    def test_constant_query_count(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, count_queries, db
+    ):
+        """The queue costs the same number of queries for 1 or 20 reports."""
+        self._seed(db, create_test_user, create_test_listing, 1)
+        client.get("/api/admin/reports", headers=admin_headers)
+        with count_queries() as few:
+            client.get("/api/admin/reports", headers=admin_headers)
+
+        reporter = db.query(Report).first().reporter
+        for i in range(1, 20):
+            target = create_test_user(email=f"more{i}@apsit.edu.in")
+            listing = create_test_listing(seller=target)
+            db.add(Report(
+                reporter_id=reporter.id, reported_user_id=target.id, listing_id=listing.id,
+                report_type=ReportTypeEnum.listing, reason=ReportReasonEnum.other
+            ))
+        db.commit()
+        with count_queries() as many:
+            response = client.get("/api/admin/reports", headers=admin_headers)
+
+        assert len(response.json()["reports"]) == 20
+        assert len(many) == len(few)
+
+    def test_filter_by_reason_and_date(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, db
+    ):
+        self._seed(db, create_test_user, create_test_listing, 4)
+        scams = client.get("/api/admin/reports?reason=scam", headers=admin_headers).json()
+        assert scams["total"] == 2
+        assert {r["reason"] for r in scams["reports"]} == {"scam"}
+
+        in_range = client.get(
+            "/api/admin/reports?date_from=2000-01-01&date_to=2999-12-31", headers=admin_headers
+        ).json()
+        assert in_range["total"] == 4
+        future = client.get("/api/admin/reports?date_from=2999-01-01", headers=admin_headers).json()
+        assert future["total"] == 0
+
+    def test_detail_history_counts(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, db
+    ):
+        reporter = self._seed(db, create_test_user, create_test_listing, 3)
+        report = db.query(Report).first()
+        report.status = ReportStatusEnum.resolved
+        db.commit()
+
+        data = client.get(f"/api/admin/reports/{report.id}", headers=admin_headers).json()
+        assert data["reporter_id"] == reporter.id
+        assert data["reporter_total_reports"] == 3
+        assert data["reporter_valid_reports"] == 1
+        assert data["reported_user_total_reports"] == 1
+        assert data["listing_details"]["seller_email"] == "target0@apsit.edu.in"
+
+
+class TestAdminAnalytics:
+    """GET /api/admin/dashboard/stats and /api/admin/analytics/*"""
+
+    def _seed(self, db, create_test_user, create_test_listing):
+        seller = create_test_user(email="stats@apsit.edu.in")
+        banned = create_test_user(email="banned@apsit.edu.in")
+        banned.is_banned = True
+        create_test_listing(seller=seller, category="Books", price=100)
+        create_test_listing(seller=seller, category="Books", price=300, status="sold")
+        create_test_listing(seller=seller, category="Electronics", price=50, status="hidden")
+        old = create_test_listing(seller=seller, category="Electronics", price=10)
+        old.created_at = datetime.utcnow() - timedelta(days=40)
+        db.add(Report(
+            reporter_id=seller.id, reported_user_id=banned.id,
+            report_type=ReportTypeEnum.user, reason=ReportReasonEnum.spam
+        ))
+        db.commit()
+
+    def test_dashboard_stats_from_rollup(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, count_queries, db
+    ):
+        self._seed(db, create_test_user, create_test_listing)
+        with count_queries() as queries:
+            stats = client.get("/api/admin/dashboard/stats", headers=admin_headers).json()
+
+        assert stats == {
+            "total_users": 3, "total_listings": 4, "active_listings": 2, "total_messages": 0,
+            "pending_reports": 1, "banned_users": 1, "new_users_today": 3,
+            "new_listings_today": 3, "total_trades": 1,
+        }
+        # Admin lookup, the rollup totals and the pending-report count
+        assert len(queries) == 3
+
+    def test_user_analytics_window(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, count_queries, db
+    ):
+        self._seed(db, create_test_user, create_test_listing)
+        client.get("/api/admin/verify", headers=admin_headers)
+        for days in (7, 365):
+            with count_queries() as queries:
+                data = client.get(f"/api/admin/analytics/users?days={days}", headers=admin_headers).json()
+            assert len(data["users_by_day"]) == days
+            assert data["users_by_day"][-1] == {"date": datetime.utcnow().date().isoformat(), "count": 3}
+            # Rollup totals, active users and the series; the admin comes from the user cache
+            assert len(queries) == 3
+        assert data["total_users"] == 3
+        assert data["banned_users"] == 1
+
+    def test_listing_analytics(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, db
+    ):
+        self._seed(db, create_test_user, create_test_listing)
+        data = client.get("/api/admin/analytics/listings?days=90", headers=admin_headers).json()
+
+        assert data["total_listings"] == 4
+        assert data["sold_listings"] == 1
+        assert data["hidden_listings"] == 1
+        assert data["new_listings_week"] == 3
+        assert sum(day["count"] for day in data["listings_by_day"]) == 4
+        assert {c["category"]: c["avg_price"] for c in data["avg_price_by_category"]} == {
+            "Books": 200, "Electronics": 30
+        }
+
+    def test_rejects_unknown_window(self, client: TestClient, admin_headers):
+        response = client.get("/api/admin/analytics/users?days=14", headers=admin_headers)
+        assert response.status_code == 400
+
+
+class TestDailyMetrics:
+    """The daily_metrics rollup behind the dashboard and analytics"""
+
+    def test_write_paths_keep_rollup_exact(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        buyer = create_test_user(email="buyer@apsit.edu.in")
+        seller = create_test_user(email="seller@apsit.edu.in")
+        listings = [create_test_listing(seller=seller, title=f"Item {i}") for i in range(3)]
+        for listing in listings:
+            client.post("/api/messages", headers=get_auth_headers(buyer), json={
+                "receiver_id": seller.id, "listing_id": listing.id, "content": "Still available?"
+            })
+        listings[0].status = "sold"
+        listings[1].created_at = datetime.utcnow() - timedelta(days=3)
+        db.commit()
+        assert check_rollup(db) == []
+
+        client.put(f"/api/admin/users/{seller.id}/ban", headers=admin_headers, json={
+            "reason": "spam", "delete_listings": True
+        })
+        client.delete(f"/api/admin/listings/{listings[2].id}", headers=admin_headers)
+        db.expire_all()
+        assert check_rollup(db) == []
+
+        stats = client.get("/api/admin/dashboard/stats", headers=admin_headers).json()
+        assert stats["total_listings"] == 2
+        assert stats["total_messages"] == 2
+        assert stats["banned_users"] == 1
+        assert stats["active_listings"] == 0
+
+    def test_reconcile_repairs_drift(
+        self, client: TestClient, admin_headers, create_test_user, create_test_listing, db
+    ):
+        seller = create_test_user(email="seller@apsit.edu.in")
+        listing = create_test_listing(seller=seller)
+        # Written around the ORM, so the hooks never see it
+        db.execute(insert(Message).values(
+            sender_id=seller.id, receiver_id=seller.id, listing_id=listing.id, content="raw"
+        ))
+        db.execute(update(DailyMetric).values(new_users=DailyMetric.new_users + 5))
+        db.commit()
+
+        drift = {m["metric"]: (m["stored"], m["live"]) for m in check_rollup(db)}
+        assert drift == {"new_users": (7, 2), "new_messages": (0, 1)}
+
+        assert reconcile_rollup(db)
+        db.commit()
+        assert check_rollup(db) == []
+        stats = client.get("/api/admin/dashboard/stats", headers=admin_headers).json()
+        assert stats["total_users"] == 2
+        assert stats["total_messages"] == 1
+
+
+class TestBulkDeletes:
+    """Admin bulk paths keep every derived counter exact"""
+
+    def test_delete_user_keeps_derived_counts(
+        self, client: TestClient, admin_user, admin_headers, create_test_user, create_test_listing,
+        get_auth_headers, db
+    ):
+        admin_user.role = RoleEnum.super_admin
+        leaving = create_test_user(email="leaving@apsit.edu.in")
+        staying = create_test_user(email="staying@apsit.edu.in")
+        shared = "/uploads/listings/shared.jpg"
+        for seller in (leaving, staying):
+            create_test_listing(seller=seller).image_url = shared
+        db.commit()
+        kept = create_test_listing(seller=staying)
+        db.add_all([
+            Review(reviewer_id=leaving.id, reviewed_user_id=staying.id, listing_id=kept.id, rating=2),
+            Review(reviewer_id=staying.id, reviewed_user_id=leaving.id, rating=5),
+        ])
+        db.commit()
+        client.post("/api/messages", headers=get_auth_headers(leaving), json={
+            "receiver_id": staying.id, "listing_id": kept.id, "content": "Is it still available?"
+        })
+
+        response = client.delete(f"/api/admin/users/{leaving.id}", headers=admin_headers)
+        assert response.status_code == 200
+        db.expire_all()
+        assert check_rollup(db) == []
+        assert check_user_counters(db) == []
+        assert db.get(ImageRef, shared).ref_count == 1
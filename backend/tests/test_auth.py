@@ -1,8 +1,11 @@
 """
 Tests for authentication endpoints: /api/auth/*
 """
+import bcrypt
 import pytest
 from fastapi.testclient import TestClient
+from app.models.models import RoleEnum
+from app.services.passwords import password_hasher
 
 
 class TestRegister:
@@ -125,3 +128,90 @@ class TestGetMe:
             "/api/auth/me", headers={"Authorization": "Bearer invalidtoken"}
         )
         assert response.status_code == 401
+
+
+class TestUserCache:
+    """Authenticated users are served from the per-worker snapshot cache."""
+
+    def _user_queries(self, queries):
+        return [q for q in queries if "FROM users" in q]
+
+    def test_repeat_requests_skip_user_query(self, client: TestClient, test_user, test_user_headers, count_queries):
+        with count_queries() as first:
+            client.get("/api/auth/me", headers=test_user_headers)
+        with count_queries() as second:
+            response = client.get("/api/auth/me", headers=test_user_headers)
+
+        assert response.json()["email"] == test_user.email
+        assert len(self._user_queries(first)) == 1
+        assert self._user_queries(second) == []
+
+    def test_profile_update_invalidates(self, client: TestClient, test_user, test_user_headers):
+        client.get("/api/auth/me", headers=test_user_headers)
+        response = client.put(
+            "/api/users/me", headers=test_user_headers,
+            data={"name": "Renamed", "current_password": "testpass123", "new_password": "newpassword123"}
+        )
+        assert response.status_code == 200
+
+        assert client.get("/api/auth/me", headers=test_user_headers).json()["name"] == "Renamed"
+        login = client.post("/api/auth/login", json={"email": test_user.email, "password": "newpassword123"})
+        assert login.status_code == 200
+
+    def test_ban_and_role_change_invalidate(
+        self, client: TestClient, test_user, test_user_headers, admin_headers, db
+    ):
+        assert client.get("/api/admin/verify", headers=test_user_headers).status_code == 403
+        test_user.role = RoleEnum.admin
+        db.commit()
+        assert client.get("/api/admin/verify", headers=test_user_headers).status_code == 200
+
+        test_user.role = RoleEnum.user
+        db.commit()
+        client.put(f"/api/admin/users/{test_user.id}/ban", headers=admin_headers, json={"reason": "spam"})
+        test_user.role = RoleEnum.admin
+        db.commit()
+        assert client.get("/api/admin/verify", headers=test_user_headers).json()["detail"] == "Your account has been banned"
+
+        client.put(f"/api/admin/users/{test_user.id}/unban", headers=admin_headers, json={})
+        assert client.get("/api/admin/verify", headers=test_user_headers).status_code == 200
+
+    def test_stats_report_hit_rate(self, client: TestClient, admin_headers):
+        client.get("/api/admin/verify", headers=admin_headers)
+        stats = client.get("/api/admin/system/stats", headers=admin_headers).json()["user_cache"]
+        assert stats["hits"] >= 1
+        assert 0 < stats["hit_rate"] <= 1
+
+
+class TestPasswordHashing:
+    """Password hashing off the request path (services/passwords.py)"""
+
+    def test_login_upgrades_hash_cost(self, client: TestClient, test_user, db):
+        test_user.hashed_password = bcrypt.hashpw(b"testpass123", bcrypt.gensalt(4)).decode()
+        db.commit()
+
+        response = client.post("/api/auth/login", json={"email": test_user.email, "password": "testpass123"})
+        assert response.status_code == 200
+
+        db.refresh(test_user)
+        assert not password_hasher.needs_rehash(test_user.hashed_password)
+        assert bcrypt.checkpw(b"testpass123", test_user.hashed_password.encode())
+
+    def test_failed_login_keeps_hash(self, client: TestClient, test_user, db):
+        old_hash = bcrypt.hashpw(b"testpass123", bcrypt.gensalt(4)).decode()
+        test_user.hashed_password = old_hash
+        db.commit()
+
+        client.post("/api/auth/login", json={"email": test_user.email, "password": "wrongpass"})
+        db.refresh(test_user)
+        assert test_user.hashed_password == old_hash
+
+    def test_full_queue_sheds_load(self, client: TestClient, test_user, admin_headers, monkeypatch):
+        monkeypatch.setattr(password_hasher, "max_pending", 0)
+        response = client.post("/api/auth/login", json={"email": test_user.email, "password": "testpass123"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        stats = client.get("/api/admin/system/stats", headers=admin_headers).json()["password_hashing"]
+        assert stats["rejected"] >= 1
+        assert stats["pending"] == 0
@@ -0,0 +1,43 @@
+"""
+Tests for the connection-pool instrumentation in app/database.py.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.database import InstrumentedQueuePool, pool_stats
+
+
+@pytest.fixture()
+def small_pool(tmp_path):
+    """A one-connection pool that gives up after 50 ms."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestPoolStats:
+    """pool_stats and GET /api/admin/system/stats"""
+
+    def test_checkouts_and_timeouts(self, small_pool):
+        with small_pool.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert pool_stats(small_pool)["checked_out"] == 1
+            with pytest.raises(exc.TimeoutError):
+                small_pool.connect()
+
+        stats = pool_stats(small_pool)
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 2
+        assert stats["timeouts"] == 1
+        # The timed-out checkout waited the full 50 ms
+        assert stats["wait_histogram"]["le_100ms"] == 1
+        assert sum(stats["wait_histogram"].values()) == 2
+
+    def test_admin_endpoint(self, client: TestClient, admin_headers):
+        data = client.get("/api/admin/system/stats", headers=admin_headers).json()
+        assert set(data["db_pool"]) == {"sync", "async"}
+        assert "pool" in data["db_pool"]["sync"]
@@ -109,6 +109,26 @@ class TestGetFavorites:
         data = response.json()
         assert len(data) == 2
 
+    def test_get_favorites_paged_newest_saved_first(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers
+    ):
+        """Favorites page by cursor, most recently saved first."""
+        user = create_test_user(email="pagefav@apsit.edu.in")
+        seller = create_test_user(email="pagesell@apsit.edu.in")
+        listings = [create_test_listing(seller=seller, title=f"Fav {i}") for i in range(3)]
+        headers = get_auth_headers(user)
+        for listing in reversed(listings):
+            client.post(f"/api/listings/{listing.id}/favorite", headers=headers)
+
+        first = client.get("/api/listings/favorites/me", params={"limit": 2}, headers=headers)
+        second = client.get(
+            "/api/listings/favorites/me",
+            params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}, headers=headers
+        )
+        assert [l["title"] for l in first.json() + second.json()] == ["Fav 0", "Fav 1", "Fav 2"]
+        assert all(l["is_favorited"] for l in second.json())
+        assert "X-Next-Cursor" not in second.headers
+
     def test_get_favorites_empty(
         self, client: TestClient, test_user, test_user_headers
     ):
@@ -4,6 +4,7 @@ Tests for listing endpoints: /api/listings/*
 import pytest
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
+from app.services.view_counter import view_counter
 
 
 class TestGetListings:
@@ -49,6 +50,52 @@ class TestGetListings:
         assert data["total"] >= 1
         assert any("Python" in l["title"] for l in data["listings"])
 
+    def test_search_prefix_match(self, client: TestClient, create_test_user, create_test_listing, db):
+        """Partial words match as prefixes."""
+        seller = create_test_user()
+        create_test_listing(seller=seller, title="Python Textbook")
+        create_test_listing(seller=seller, title="Calculator")
+        response = client.get("/api/listings?search=pyth")
+        data = response.json()
+        assert [l["title"] for l in data["listings"]] == ["Python Textbook"]
+
+    def test_search_matches_description(self, client: TestClient, create_test_user, create_test_listing, db):
+        """Search covers the description as well as the title."""
+        seller = create_test_user()
+        create_test_listing(seller=seller, title="Drafter", description="Mini drafter with compass and protractor")
+        create_test_listing(seller=seller, title="Calculator")
+        response = client.get("/api/listings?search=compass")
+        data = response.json()
+        assert data["total"] == 1
+        assert data["listings"][0]["title"] == "Drafter"
+
+    def test_search_relevance_ranks_title_matches_first(
+        self, client: TestClient, create_test_user, create_test_listing, db
+    ):
+        """sort_by=relevance puts the strongest match first."""
+        seller = create_test_user()
+        create_test_listing(seller=seller, title="Notes bundle", description="Includes one calculus chapter")
+        create_test_listing(seller=seller, title="Calculus textbook", description="Calculus for calculus students")
+        response = client.get("/api/listings?search=calculus&sort_by=relevance")
+        data = response.json()
+        assert data["total"] == 2
+        assert data["listings"][0]["title"] == "Calculus textbook"
+
+    def test_search_index_follows_updates_and_deletes(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        """Edited and deleted listings are reflected in search results."""
+        seller = create_test_user()
+        listing = create_test_listing(seller=seller, title="Old Guitar")
+        headers = get_auth_headers(seller)
+
+        client.put(f"/api/listings/{listing.id}", headers=headers, data={"title": "Vintage Ukulele"})
+        assert client.get("/api/listings?search=guitar").json()["total"] == 0
+        assert client.get("/api/listings?search=ukulele").json()["total"] == 1
+
+        client.delete(f"/api/listings/{listing.id}", headers=headers)
+        assert client.get("/api/listings?search=ukulele").json()["total"] == 0
+
     def test_pagination(self, client: TestClient, create_test_user, create_test_listing, db):
         """Pagination returns correct page size."""
         seller = create_test_user()
@@ -61,6 +108,37 @@ class TestGetListings:
         assert data["total"] == 5
         assert data["pages"] == 3
 
+    @pytest.mark.parametrize("sort_by", ["newest", "oldest", "price_low", "price_high"])
+    def test_cursor_pagination_walks_every_listing_once(
+        self, client: TestClient, create_test_user, create_test_listing, db, sort_by
+    ):
+        """Following next_cursor visits each listing exactly once, in order."""
+        seller = create_test_user()
+        created = [create_test_listing(seller=seller, price=float(p)) for p in (30, 10, 20, 10, 40)]
+
+        seen, cursor = [], None
+        while True:
+            url = f"/api/listings?sort_by={sort_by}&limit=2&include_total=false"
+            if cursor:
+                url += f"&cursor={cursor}"
+            data = client.get(url).json()
+            assert data["total"] is None
+            seen.extend(l["id"] for l in data["listings"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(l.id for l in created)
+        assert len(seen) == len(set(seen))
+        if sort_by.startswith("price"):
+            prices = [next(l.price for l in created if l.id == i) for i in seen]
+            assert prices == sorted(prices, reverse=sort_by == "price_high")
+
+    def test_invalid_cursor(self, client: TestClient):
+        """Garbage cursor → 400."""
+        response = client.get("/api/listings?cursor=not-a-cursor")
+        assert response.status_code == 400
+
 
 class TestGetSingleListing:
     """GET /api/listings/{id}"""
@@ -79,10 +157,49 @@ class TestGetSingleListing:
         assert response.status_code == 404
 
 
+class TestViewCounter:
+    """Listing views buffered by view_counter and written in batches"""
+
+    def test_detail_view_is_a_pure_read(self, client: TestClient, create_test_listing, test_user, capture_queries):
+        listing = create_test_listing(seller=test_user)
+        with capture_queries() as queries:
+            response = client.get(f"/api/listings/{listing.id}")
+
+        assert response.json()["views"] == 1
+        assert not any(statement.lstrip().upper().startswith("UPDATE") for statement, _ in queries)
+
+    def test_flush_writes_batched_increments(self, client: TestClient, create_test_listing, test_user, db, count_queries):
+        first, second = create_test_listing(seller=test_user), create_test_listing(seller=test_user)
+        for listing_id in [first.id] * 3 + [second.id] * 2:
+            client.get(f"/api/listings/{listing_id}")
+        assert view_counter.pending(first.id) == 3
+
+        with count_queries() as queries:
+            assert view_counter.flush() == 5
+        assert len([q for q in queries if q.lstrip().upper().startswith("UPDATE")]) == 1
+
+        db.expire_all()
+        assert (db.get(type(first), first.id).views, db.get(type(second), second.id).views) == (3, 2)
+        assert client.get(f"/api/listings/{first.id}").json()["views"] == 4
+
+    def test_failed_flush_keeps_views(self, create_test_listing, test_user, monkeypatch):
+        listing = create_test_listing(seller=test_user)
+        view_counter.record(listing.id)
+
+        class Broken:
+            def begin(self):
+                raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(view_counter, "bind", Broken())
+        with pytest.raises(RuntimeError):
+            view_counter.flush()
+        assert view_counter.pending(listing.id) == 1
+
+
 class TestCreateListing:
     """POST /api/listings"""
 
-    @patch("app.routers.listings.upload_image", new_callable=AsyncMock)
+    @patch("app.services.upload.upload_image", new_callable=AsyncMock)
     def test_create_listing_with_auth(
         self, mock_upload, client: TestClient, test_user, test_user_headers
     ):
@@ -185,3 +302,67 @@ class TestDeleteListing:
         """Delete listing that doesn't exist → 404."""
         response = client.delete("/api/listings/99999", headers=test_user_headers)
         assert response.status_code == 404
+
+
+class TestAnonymousListingCache:
+    """GET /api/listings served from listing_cache for anonymous visitors"""
+
+    def test_repeat_request_skips_database(self, client: TestClient, create_test_listing, test_user, count_queries):
+        create_test_listing(seller=test_user)
+        first = client.get("/api/listings?category=Books")
+        with count_queries() as queries:
+            second = client.get("/api/listings?category=Books&search=")
+
+        assert queries == []
+        assert second.json() == first.json()
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["vary"] == "Authorization"
+
+    def test_if_none_match_gets_304(self, client: TestClient, create_test_listing, test_user):
+        create_test_listing(seller=test_user)
+        etag = client.get("/api/listings").headers["etag"]
+
+        response = client.get("/api/listings", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_if_none_match_compares_whole_tags(self, client: TestClient, create_test_listing, test_user):
+        create_test_listing(seller=test_user)
+        etag = client.get("/api/listings").headers["etag"]
+
+        def status_for(header):
+            return client.get("/api/listings", headers={"If-None-Match": header}).status_code
+
+        assert status_for(f'"other", W/{etag}') == 304
+        assert status_for("*") == 304
+        # A tag that merely contains this one is a different version
+        assert status_for(f'"other", "v1-{etag}"') == 200
+
+    def test_listing_writes_invalidate(
+        self, client: TestClient, create_test_listing, test_user, test_user_headers, admin_headers
+    ):
+        listing = create_test_listing(seller=test_user)
+        assert client.get("/api/listings").json()["total"] == 1
+
+        client.put(f"/api/listings/{listing.id}", headers=test_user_headers, data={"title": "Renamed lamp"})
+        assert client.get("/api/listings").json()["listings"][0]["title"] == "Renamed lamp"
+
+        client.put(f"/api/admin/listings/{listing.id}/hide", headers=admin_headers, json={"reason": "spam"})
+        assert client.get("/api/listings").json()["total"] == 0
+
+        client.put(f"/api/admin/listings/{listing.id}/show", headers=admin_headers)
+        assert client.get("/api/listings").json()["total"] == 1
+
+    def test_view_counts_do_not_invalidate(self, client: TestClient, create_test_listing, test_user):
+        listing = create_test_listing(seller=test_user)
+        client.get("/api/listings")
+        client.get(f"/api/listings/{listing.id}")
+
+        etag = client.get("/api/listings").headers["etag"]
+        assert client.get("/api/listings", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_signed_in_requests_not_cached(self, client: TestClient, create_test_listing, test_user, test_user_headers):
+        create_test_listing(seller=test_user)
+        response = client.get("/api/listings", headers=test_user_headers)
+        assert response.status_code == 200
+        assert "etag" not in response.headers
@@ -3,7 +3,8 @@ Tests for message endpoints: /api/messages/*
 """
 import pytest
 from fastapi.testclient import TestClient
-from app.models.models import Message
+from app.models.models import Conversation, Message, User
+from app.services.conversations import rebuild_conversations
 
 
 class TestSendMessage:
@@ -94,6 +95,79 @@ class TestGetConversations:
         assert len(data) >= 1
         assert data[0]["other_user_id"] == user2.id
 
+    def test_conversation_summary_fields(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        """Each conversation shows its latest message and its own unread count."""
+        me = create_test_user(email="me@apsit.edu.in")
+        alice = create_test_user(email="alice@apsit.edu.in")
+        bob = create_test_user(email="bob@apsit.edu.in")
+        book = create_test_listing(seller=me, title="Book")
+        lamp = create_test_listing(seller=me, title="Lamp")
+
+        db.add_all([
+            Message(sender_id=alice.id, receiver_id=me.id, listing_id=book.id, content="a1"),
+            Message(sender_id=me.id, receiver_id=alice.id, listing_id=book.id, content="a2"),
+            Message(sender_id=alice.id, receiver_id=me.id, listing_id=book.id, content="a3"),
+            Message(sender_id=alice.id, receiver_id=me.id, listing_id=lamp.id, content="l1", is_read=True),
+            Message(sender_id=bob.id, receiver_id=me.id, listing_id=book.id, content="b1"),
+        ])
+        db.commit()
+
+        data = client.get("/api/messages/conversations", headers=get_auth_headers(me)).json()
+        by_key = {(c["other_user_id"], c["listing_id"]): c for c in data}
+
+        assert len(data) == 3
+        assert data[0]["last_message"] == "b1"
+        assert by_key[(alice.id, book.id)]["last_message"] == "a3"
+        assert by_key[(alice.id, book.id)]["unread_count"] == 2
+        assert by_key[(alice.id, lamp.id)]["unread_count"] == 0
+        assert by_key[(bob.id, book.id)]["listing_title"] == "Book"
+
+    def test_conversations_paginated(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        """page/limit slice the conversation list."""
+        me = create_test_user(email="pg@apsit.edu.in")
+        listing = create_test_listing(seller=me)
+        for i in range(3):
+            other = create_test_user(email=f"pg{i}@apsit.edu.in")
+            db.add(Message(sender_id=other.id, receiver_id=me.id, listing_id=listing.id, content=f"m{i}"))
+            db.commit()
+
+        headers = get_auth_headers(me)
+        first = client.get("/api/messages/conversations?limit=2", headers=headers).json()
+        second = client.get("/api/messages/conversations?limit=2&page=2", headers=headers).json()
+        assert len(first) == 2
+        assert len(second) == 1
+        assert {c["last_message"] for c in first + second} == {"m0", "m1", "m2"}
+
+    def test_conversations_constant_query_count(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers,
+        count_queries, db
+    ):
+        """Query count does not grow with the number of conversations."""
+        me = create_test_user(email="qc@apsit.edu.in")
+        listing = create_test_listing(seller=me)
+        headers = get_auth_headers(me)
+
+        def add_conversation(i):
+            other = create_test_user(email=f"qc{i}@apsit.edu.in")
+            db.add(Message(sender_id=other.id, receiver_id=me.id, listing_id=listing.id, content="hi"))
+            db.commit()
+
+        add_conversation(0)
+        client.get("/api/messages/conversations", headers=headers)
+        with count_queries() as few:
+            client.get("/api/messages/conversations", headers=headers)
+
+        for i in range(1, 6):
+            add_conversation(i)
+        with count_queries() as many:
+            assert len(client.get("/api/messages/conversations", headers=headers).json()) == 6
+
+        assert len(many) == len(few)
+
     def test_get_conversations_without_auth(self, client: TestClient):
         """Get conversations without auth → 403."""
         response = client.get("/api/messages/conversations")
@@ -125,6 +199,29 @@ class TestGetConversationMessages:
         assert len(data) == 2
         assert data[0]["content"] == "First"
 
+    def test_conversation_pages_before_id(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        """limit returns the latest messages; before=<oldest id shown> seeks to older ones."""
+        user1 = create_test_user(email="a@apsit.edu.in")
+        user2 = create_test_user(email="b@apsit.edu.in")
+        listing = create_test_listing(seller=user2)
+        db.add_all([
+            Message(sender_id=user2.id, receiver_id=user1.id, listing_id=listing.id, content=f"m{i}")
+            for i in range(5)
+        ])
+        db.commit()
+
+        url = f"/api/messages/conversation/{user2.id}/{listing.id}"
+        headers = get_auth_headers(user1)
+        latest = client.get(url, params={"limit": 2}, headers=headers).json()
+        older = client.get(url, params={"limit": 2, "before": latest[0]["id"]}, headers=headers).json()
+        oldest = client.get(url, params={"limit": 2, "before": older[0]["id"]}, headers=headers).json()
+        assert [m["content"] for m in oldest + older + latest] == ["m0", "m1", "m2", "m3", "m4"]
+        assert [m["content"] for m in client.get(url, params={"limit": 2, "page": 2}, headers=headers).json()] == [
+            "m1", "m2"
+        ]
+
 
 class TestUnreadCount:
     """GET /api/messages/unread/count"""
@@ -153,6 +250,36 @@ class TestUnreadCount:
         assert response.json()["unread_count"] >= 1
 
 
+    def test_unread_count_tracks_reads(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        """Opening a conversation takes exactly its unread messages off the total."""
+        me = create_test_user(email="uc@apsit.edu.in")
+        alice = create_test_user(email="uca@apsit.edu.in")
+        book = create_test_listing(seller=me, title="Book")
+        lamp = create_test_listing(seller=me, title="Lamp")
+        db.add_all([
+            Message(sender_id=alice.id, receiver_id=me.id, listing_id=book.id, content="b1"),
+            Message(sender_id=alice.id, receiver_id=me.id, listing_id=book.id, content="b2"),
+            Message(sender_id=alice.id, receiver_id=me.id, listing_id=lamp.id, content="l1"),
+            Message(sender_id=me.id, receiver_id=alice.id, listing_id=lamp.id, content="l2"),
+        ])
+        db.commit()
+
+        headers = get_auth_headers(me)
+        assert client.get("/api/messages/unread/count", headers=headers).json()["unread_count"] == 3
+
+        client.get(f"/api/messages/conversation/{alice.id}/{book.id}", headers=headers)
+        assert client.get("/api/messages/unread/count", headers=headers).json()["unread_count"] == 1
+
+        # Reading again changes nothing
+        client.get(f"/api/messages/conversation/{alice.id}/{book.id}", headers=headers)
+        assert client.get("/api/messages/unread/count", headers=headers).json()["unread_count"] == 1
+
+        alice_unread = client.get("/api/messages/unread/count", headers=get_auth_headers(alice)).json()
+        assert alice_unread["unread_count"] == 1
+
+
 class TestMarkAsRead:
     """PUT /api/messages/{message_id}/read"""
 
@@ -182,3 +309,156 @@ class TestMarkAsRead:
         # Verify unread count is now 0
         count_resp = client.get("/api/messages/unread/count", headers=headers)
         assert count_resp.json()["unread_count"] == 0
+
+
+class TestMarkConversationRead:
+    """POST /api/messages/conversation/{other_user_id}/{listing_id}/read"""
+
+    def test_marks_up_to_message_in_one_update(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db, count_queries
+    ):
+        """Everything up to ``up_to`` is read with one UPDATE; later messages stay unread."""
+        reader = create_test_user(email="reader@apsit.edu.in")
+        sender = create_test_user(email="sender@apsit.edu.in")
+        listing = create_test_listing(seller=sender)
+        messages = [
+            Message(sender_id=sender.id, receiver_id=reader.id, listing_id=listing.id, content=f"m{i}")
+            for i in range(4)
+        ]
+        db.add_all(messages)
+        db.commit()
+        url = f"/api/messages/conversation/{sender.id}/{listing.id}/read"
+        up_to = messages[2].id
+        headers = get_auth_headers(reader)
+
+        with count_queries() as queries:
+            response = client.post(url, params={"up_to": up_to}, headers=headers)
+        assert response.json() == {"marked_read": 3}
+        assert sum(q.lstrip().upper().startswith("UPDATE MESSAGES") for q in queries) == 1
+        assert client.get("/api/messages/unread/count", headers=headers).json()["unread_count"] == 1
+
+        assert client.post(url, headers=headers).json() == {"marked_read": 1}
+        assert client.post(url, headers=headers).json() == {"marked_read": 0}
+        assert client.get("/api/messages/unread/count", headers=headers).json()["unread_count"] == 0
+
+
+class TestMessagePush:
+    """WS /api/messages/ws and GET /api/messages/stream"""
+
+    def test_websocket_receives_new_message(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        """Receiver's socket gets the message as soon as it is sent."""
+        sender = create_test_user(email="ws1@apsit.edu.in")
+        receiver = create_test_user(email="ws2@apsit.edu.in")
+        listing = create_test_listing(seller=receiver)
+        token = get_auth_headers(receiver)["Authorization"].split()[1]
+
+        with client.websocket_connect(f"/api/messages/ws?token={token}") as ws:
+            client.post(
+                "/api/messages",
+                json={"receiver_id": receiver.id, "listing_id": listing.id, "content": "Ping"},
+                headers=get_auth_headers(sender),
+            )
+            event = ws.receive_json()
+
+        assert event["type"] == "message.created"
+        assert event["message"]["content"] == "Ping"
+        assert event["message"]["sender_id"] == sender.id
+
+    def test_websocket_read_receipt(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, db
+    ):
+        """Opening a conversation notifies the original sender."""
+        sender = create_test_user(email="rr1@apsit.edu.in")
+        receiver = create_test_user(email="rr2@apsit.edu.in")
+        listing = create_test_listing(seller=receiver)
+        db.add(Message(sender_id=sender.id, receiver_id=receiver.id, listing_id=listing.id, content="Hi"))
+        db.commit()
+        token = get_auth_headers(sender)["Authorization"].split()[1]
+
+        with client.websocket_connect(f"/api/messages/ws?token={token}") as ws:
+            client.get(
+                f"/api/messages/conversation/{sender.id}/{listing.id}",
+                headers=get_auth_headers(receiver),
+            )
+            event = ws.receive_json()
+
+        assert event == {
+            "type": "message.read",
+            "reader_id": receiver.id,
+            "sender_id": sender.id,
+            "listing_id": listing.id,
+        }
+
+    def test_websocket_rejects_bad_token(self, client: TestClient):
+        """Invalid token → connection closed."""
+        from starlette.websockets import WebSocketDisconnect
+
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/api/messages/ws?token=garbage") as ws:
+                ws.receive_json()
+
+    def test_stream_without_auth(self, client: TestClient):
+        """SSE stream without a token → 401."""
+        response = client.get("/api/messages/stream")
+        assert response.status_code == 401
+
+
+class TestConversationOrder:
+    """Conversation.last_message_id under out-of-order inserts"""
+
+    def test_older_message_does_not_move_pointer_back(self, create_test_user, create_test_listing, db):
+        """A message committed after a newer one still counts as unread but stays behind it."""
+        me = create_test_user(email="order@apsit.edu.in")
+        alice = create_test_user(email="ordera@apsit.edu.in")
+        listing = create_test_listing(seller=me)
+        db.add(Message(id=10, sender_id=alice.id, receiver_id=me.id, listing_id=listing.id, content="newer"))
+        db.commit()
+        db.add(Message(id=5, sender_id=alice.id, receiver_id=me.id, listing_id=listing.id, content="older"))
+        db.commit()
+
+        conversation = db.query(Conversation).one()
+        db.refresh(me)
+        assert conversation.last_message_id == 10
+        assert conversation.last_message.content == "newer"
+        assert me.unread_messages_count == 2
+
+
+class TestConversationRebuild:
+    """services.conversations.rebuild_conversations"""
+
+    def test_rebuild_matches_incremental(self, create_test_user, create_test_listing, db):
+        """Rebuilding from messages reproduces the incrementally maintained rows."""
+        me = create_test_user(email="rb@apsit.edu.in")
+        alice = create_test_user(email="rba@apsit.edu.in")
+        bob = create_test_user(email="rbb@apsit.edu.in")
+        listing = create_test_listing(seller=me)
+        db.add_all([
+            Message(sender_id=alice.id, receiver_id=me.id, listing_id=listing.id, content="1"),
+            Message(sender_id=me.id, receiver_id=alice.id, listing_id=listing.id, content="2", is_read=True),
+            Message(sender_id=bob.id, receiver_id=me.id, listing_id=listing.id, content="3"),
+            Message(sender_id=me.id, receiver_id=bob.id, listing_id=listing.id, content="4"),
+        ])
+        db.commit()
+
+        def snapshot():
+            db.expire_all()
+            conversations = {
+                (c.user_a_id, c.user_b_id, c.listing_id): (c.last_message_id, c.unread_count_a, c.unread_count_b)
+                for c in db.query(Conversation).all()
+            }
+            counters = {u.id: u.unread_messages_count for u in db.query(User).all()}
+            threads = {
+                m.id: (m.conversation.user_a_id, m.conversation.user_b_id) for m in db.query(Message).all()
+            }
+            return conversations, counters, threads
+
+        before = snapshot()
+        db.query(User).update({User.unread_messages_count: 99})
+        db.commit()
+
+        assert rebuild_conversations(db) == 2
+        db.commit()
+        assert snapshot() == before
+        assert before[1] == {me.id: 2, alice.id: 0, bob.id: 1}
@@ -0,0 +1,133 @@
+"""
+Query-plan regression tests: the message, review and report access paths
+must be served by indexes, never by a full scan of their tables.
+"""
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from app.models.models import Message, Report, ReportReasonEnum, ReportTypeEnum, Review
+
+# SQLite reports a full scan as "SCAN <table>" ("SCAN TABLE <table>" before 3.36),
+# including "SCAN <table> USING COVERING INDEX", which still reads every entry
+FULL_SCAN = re.compile(r"\bSCAN (?:TABLE )?(messages|reviews|conversations|reports)\b")
+WATCHED_TABLES = re.compile(r"\b(messages|reviews|conversations|reports)\b")
+
+
+@pytest.fixture()
+def seeded(create_test_user, create_test_listing, db):
+    """A few users trading messages, reviews and reports on a few listings."""
+    users = [create_test_user(email=f"plan{i}@apsit.edu.in") for i in range(6)]
+    listings = [create_test_listing(seller=users[i], title=f"Plan item {i}") for i in range(3)]
+    for n in range(60):
+        sender, receiver = users[n % 6], users[(n + 1) % 6]
+        db.add(Message(
+            sender_id=sender.id, receiver_id=receiver.id,
+            listing_id=listings[n % 3].id, content=f"message {n}", is_read=n % 4 == 0
+        ))
+    for n in range(12):
+        db.add(Review(
+            reviewer_id=users[n % 6].id, reviewed_user_id=users[(n + 2) % 6].id,
+            listing_id=listings[n % 3].id, rating=n % 5 + 1
+        ))
+    reasons = list(ReportReasonEnum)
+    for n in range(30):
+        db.add(Report(
+            reporter_id=users[n % 6].id, reported_user_id=users[(n + 3) % 6].id,
+            report_type=ReportTypeEnum.user, reason=reasons[n % len(reasons)]
+        ))
+    db.commit()
+    return users, listings
+
+
+class TestQueryPlans:
+    """EXPLAIN QUERY PLAN for SQL issued by message, review and admin endpoints."""
+
+    def _assert_no_full_scans(self, capture_queries, explain_plan, request):
+        with capture_queries() as statements:
+            response = request()
+        assert response.status_code < 400, response.text
+
+        checked = 0
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+            if not WATCHED_TABLES.search(statement):
+                continue
+            plan = explain_plan(statement, parameters)
+            scans = [line for line in plan if FULL_SCAN.search(line)]
+            assert not scans, f"Full scan {scans} for:\n{statement}"
+            checked += 1
+        return checked
+
+    def test_message_endpoints(self, client: TestClient, seeded, get_auth_headers, capture_queries, explain_plan):
+        users, listings = seeded
+        headers = get_auth_headers(users[1])
+        requests = [
+            lambda: client.get(f"/api/messages/conversation/{users[0].id}/{listings[0].id}", headers=headers),
+            lambda: client.get("/api/messages/conversations", headers=headers),
+            lambda: client.get("/api/messages/unread/count", headers=headers),
+            lambda: client.get(
+                f"/api/messages/conversation/{users[0].id}/{listings[0].id}?limit=5&before=40", headers=headers
+            ),
+            lambda: client.post(
+                f"/api/messages/conversation/{users[0].id}/{listings[0].id}/read?up_to=30", headers=headers
+            ),
+        ]
+        checked = sum(self._assert_no_full_scans(capture_queries, explain_plan, r) for r in requests)
+        assert checked >= 5
+
+    def test_review_endpoints(self, client: TestClient, seeded, get_auth_headers, capture_queries, explain_plan):
+        users, listings = seeded
+        headers = get_auth_headers(users[2])
+        requests = [
+            lambda: client.get("/api/reviews/my-reviews", headers=headers),
+            lambda: client.get("/api/reviews/given", headers=headers),
+            lambda: client.get(f"/api/reviews/listing/{listings[1].id}", headers=headers),
+            lambda: client.get(f"/api/users/{users[3].id}", headers=headers),
+            lambda: client.get(f"/api/users/{users[3].id}/reviews", headers=headers),
+            lambda: client.post("/api/reviews", headers=headers, json={
+                "reviewed_user_id": users[5].id, "listing_id": listings[2].id, "rating": 4
+            }),
+        ]
+        checked = sum(self._assert_no_full_scans(capture_queries, explain_plan, r) for r in requests)
+        assert checked >= 6
+
+    def test_admin_user_detail(self, client: TestClient, seeded, admin_headers, capture_queries, explain_plan):
+        users, _ = seeded
+        checked = self._assert_no_full_scans(
+            capture_queries, explain_plan,
+            lambda: client.get(f"/api/admin/users/{users[0].id}", headers=admin_headers)
+        )
+        assert checked >= 5
+
+    def test_report_queue_filters(self, client: TestClient, seeded, admin_headers, capture_queries, explain_plan):
+        requests = [
+            lambda: client.get("/api/admin/reports?reason=scam", headers=admin_headers),
+            lambda: client.get(
+                "/api/admin/reports?reason=spam&date_from=2020-01-01&date_to=2100-01-01", headers=admin_headers
+            ),
+            lambda: client.get("/api/admin/reports?status=pending", headers=admin_headers),
+        ]
+        checked = sum(self._assert_no_full_scans(capture_queries, explain_plan, r) for r in requests)
+        assert checked >= 6
+
+    def test_profile_lists_read_in_index_order(
+        self, client: TestClient, seeded, get_auth_headers, capture_queries, explain_plan
+    ):
+        users, listings = seeded
+        headers = get_auth_headers(users[0])
+        client.post(f"/api/listings/{listings[1].id}/favorite", headers=headers)
+        urls = [
+            "/api/reviews/my-reviews", "/api/reviews/given", f"/api/reviews/listing/{listings[1].id}",
+            f"/api/users/{users[2].id}/reviews", f"/api/users/{users[0].id}/listings",
+            "/api/listings/user/me", "/api/listings/favorites/me",
+        ]
+        for url in urls:
+            with capture_queries() as statements:
+                assert client.get(f"{url}?limit=2", headers=headers).status_code == 200
+            pages = [(s, p) for s, p in statements if "ORDER BY" in s]
+            assert pages, url
+            for statement, parameters in pages:
+                plan = explain_plan(statement, parameters)
+                assert not any("TEMP B-TREE" in line or FULL_SCAN.search(line) for line in plan), (url, plan)
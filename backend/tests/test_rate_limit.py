@@ -0,0 +1,111 @@
+"""
+Tests for the GCRA rate limiter (services/rate_limit.py) and its middleware.
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+from app.services import rate_limit
+from app.services.rate_limit import MemoryStore, RateLimit
+
+
+class TestRateLimitMiddleware:
+    """429s from rate_limit_middleware"""
+
+    def test_login_burst_is_limited(self, client: TestClient):
+        payload = {"email": "nobody@apsit.edu.in", "password": "password1"}
+        statuses = [client.post("/api/auth/login", json=payload).status_code for _ in range(11)]
+
+        assert statuses[:10] == [401] * 10
+        assert statuses[10] == 429
+        limited = client.post("/api/auth/login", json=payload)
+        assert int(limited.headers["Retry-After"]) >= 1
+
+    def test_writes_are_limited_per_user(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers
+    ):
+        seller = create_test_user(email="seller@apsit.edu.in")
+        listing = create_test_listing(seller=seller)
+        chatty = create_test_user(email="chatty@apsit.edu.in")
+        quiet = create_test_user(email="quiet@apsit.edu.in")
+
+        def send(user):
+            return client.post("/api/messages", headers=get_auth_headers(user), json={
+                "receiver_id": seller.id, "listing_id": listing.id, "content": "hello"
+            }).status_code
+
+        assert [send(chatty) for _ in range(30)] == [201] * 30
+        assert send(chatty) == 429
+        assert send(quiet) == 201
+
+    def test_reads_are_not_limited(self, client: TestClient):
+        assert all(client.get("/api/listings").status_code == 200 for _ in range(40))
+
+
+class TestMemoryStore:
+    """GCRA bookkeeping in the per-process store"""
+
+    LIMIT = RateLimit("test", "POST", r"/x", requests=2, period=10)
+
+    def test_refills_at_the_steady_rate(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+        store = MemoryStore()
+
+        hit = lambda: asyncio.run(store.hit("k", self.LIMIT))
+        assert hit() == (True, 0.0)
+        assert hit() == (True, 0.0)
+        allowed, retry_after = hit()
+        assert not allowed and retry_after == 5
+
+        clock[0] += 5
+        assert hit() == (True, 0.0)
+
+    def test_idle_keys_are_evicted(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+        store = MemoryStore(max_keys=3)
+
+        for key in "abc":
+            asyncio.run(store.hit(key, self.LIMIT))
+        assert len(store) == 3
+
+        # A fourth key while full sweeps first, and never exceeds the bound
+        asyncio.run(store.hit("d", self.LIMIT))
+        assert len(store) <= 3
+
+        clock[0] += MemoryStore.SWEEP_INTERVAL + 1
+        asyncio.run(store.hit("e", self.LIMIT))
+        assert len(store) == 1
+
+    def test_sweep_stops_at_first_live_key(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+        store = MemoryStore()
+
+        for n in range(5):
+            asyncio.run(store.hit(f"old-{n}", self.LIMIT))
+        clock[0] += MemoryStore.SWEEP_INTERVAL - 1
+        asyncio.run(store.hit("live", self.LIMIT))
+
+        # The expired keys at the front go; the sweep stops at "live"
+        clock[0] += 2
+        asyncio.run(store.hit("new", self.LIMIT))
+        assert list(store._tats) == ["live", "new"]
+        assert store.sweeps == 1
+
+    def test_full_store_evicts_without_sweeping(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+        store = MemoryStore(max_keys=100)
+
+        for n in range(1000):
+            asyncio.run(store.hit(f"ip-{n}", self.LIMIT))
+        # Each new key past the bound drops the stalest one; no full passes
+        assert len(store) == 100
+        assert store.sweeps == 0
+        assert "ip-0" not in store._tats and "ip-999" in store._tats
+
+        # A key that keeps hitting is the most recent, so it is not the one dropped
+        asyncio.run(store.hit("ip-900", self.LIMIT))
+        asyncio.run(store.hit("new", self.LIMIT))
+        assert "ip-900" in store._tats and "ip-901" not in store._tats
@@ -1,9 +1,13 @@
 """
 Tests for review endpoints: /api/reviews/*
 """
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.models import Review
+
 
 class TestCreateReview:
     """POST /api/reviews"""
@@ -186,3 +190,47 @@ class TestDeleteReview:
         review_id = resp.json()["id"]
         delete_resp = client.delete(f"/api/reviews/{review_id}", headers=headers_other)
         assert delete_resp.status_code == 403
+
+
+class TestReviewPagination:
+    """Cursor pages and NDJSON export of the review lists"""
+
+    @pytest.fixture()
+    def reviewed_seller(self, create_test_user, create_test_listing, db):
+        seller = create_test_user(email="paged@apsit.edu.in")
+        listing = create_test_listing(seller=seller)
+        for n in range(5):
+            reviewer = create_test_user(email=f"reviewer{n}@apsit.edu.in")
+            db.add(Review(reviewer_id=reviewer.id, reviewed_user_id=seller.id, listing_id=listing.id, rating=n + 1))
+        db.commit()
+        return seller, listing
+
+    def test_pages_follow_next_cursor(self, client: TestClient, reviewed_seller):
+        _, listing = reviewed_seller
+        url = f"/api/reviews/listing/{listing.id}"
+        seen, cursor = [], None
+        while True:
+            response = client.get(url, params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200
+            assert len(response.json()) <= 2
+            seen += [r["id"] for r in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        # Newest first (same timestamp here, so id breaks the tie), each review once
+        assert seen == sorted(seen, reverse=True) and len(seen) == 5
+
+    def test_ndjson_streams_every_review(self, client: TestClient, reviewed_seller, monkeypatch):
+        seller, _ = reviewed_seller
+        monkeypatch.setattr("app.services.pagination.STREAM_BATCH_SIZE", 2)
+        response = client.get(f"/api/users/{seller.id}/reviews", params={"format": "ndjson", "limit": 1})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(r["rating"] for r in rows) == [1, 2, 3, 4, 5]
+
+    def test_invalid_cursor(self, client: TestClient, reviewed_seller):
+        seller, _ = reviewed_seller
+        for fmt in ("json", "ndjson"):
+            response = client.get(f"/api/users/{seller.id}/reviews", params={"cursor": "garbage", "format": fmt})
+            assert response.status_code == 400
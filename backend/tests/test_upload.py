@@ -0,0 +1,348 @@
+"""
+Tests for image storage: app/services/upload.py
+"""
+import asyncio
+import threading
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+from starlette.routing import Mount
+
+from app.config import settings
+from app.main import app
+from app.models import ImageRef
+from app.models.models import RoleEnum
+from app.services import upload
+from app.services.image_variants import variant_url
+
+
+MB = 1024 * 1024
+
+
+def image_bytes(size=(400, 300), fmt="JPEG", exif=None) -> bytes:
+    buffer = BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(buffer, format=fmt, **({"exif": exif} if exif else {}))
+    return buffer.getvalue()
+
+
+def open_upload(root, url) -> Image.Image:
+    return Image.open(root / url.split("/uploads/", 1)[1])
+
+
+def make_file(content: bytes, size=None, content_type="image/jpeg") -> UploadFile:
+    return UploadFile(
+        file=BytesIO(content), size=size, filename="photo.jpg",
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+@pytest.fixture()
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(settings, "MAX_IMAGE_SIZE_MB", 1)
+    return tmp_path
+
+
+def stored_files(root):
+    return sorted(p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file())
+
+
+class TestStreamingUpload:
+    """upload_image with local storage"""
+
+    def test_stores_file_atomically(self, upload_dir, db):
+        content = image_bytes((800, 600))
+        assert len(content) > upload.CHUNK_SIZE * 2
+        url = asyncio.run(upload.upload_image(db, make_file(content)))
+
+        assert url.startswith("/uploads/listings/") and url.endswith(".jpg")
+        assert open_upload(upload_dir, url).size == (800, 600)
+        assert stored_files(upload_dir / upload.INCOMING_FOLDER) == []
+
+    def test_oversized_stream_stops_early(self, upload_dir, db):
+        file = make_file(b"x" * (3 * MB))
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(upload.upload_image(db, file))
+
+        assert exc.value.status_code == 400
+        # Reading stopped at the first chunk past the limit
+        assert file.file.tell() <= MB + upload.CHUNK_SIZE
+        assert stored_files(upload_dir) == []
+
+    def test_declared_size_rejected_before_reading(self, upload_dir, db):
+        file = make_file(b"x" * (2 * MB), size=2 * MB)
+        with pytest.raises(HTTPException):
+            asyncio.run(upload.upload_image(db, file))
+        assert file.file.tell() == 0
+
+    def test_invalid_type_rejected(self, upload_dir, db):
+        with pytest.raises(HTTPException):
+            asyncio.run(upload.upload_image(db, make_file(b"GIF89a", content_type="image/gif")))
+        assert stored_files(upload_dir) == []
+
+
+class TestParallelUploads:
+    """upload_images and the listing routes that use it"""
+
+    LISTING = {
+        "title": "Desk lamp",
+        "description": "Barely used desk lamp with a spare bulb",
+        "price": "300",
+        "category": "Electronics",
+        "condition": "good",
+    }
+
+    def test_results_keep_order(self, upload_dir, db):
+        files = [make_file(image_bytes((40, 30))), None, make_file(image_bytes((60, 50)))]
+        urls = asyncio.run(upload.upload_images(db, files))
+
+        assert urls[1] is None
+        assert [open_upload(upload_dir, url).size for url in (urls[0], urls[2])] == [(40, 30), (60, 50)]
+
+    def test_upload_slots_follow_the_event_loop(self, upload_dir, db, monkeypatch):
+        # One slot, so the second file waits on it in each loop
+        monkeypatch.setattr(settings, "UPLOAD_CONCURRENCY", 1)
+        monkeypatch.setattr(upload, "_upload_slots", None)
+        for _ in range(2):
+            files = [make_file(image_bytes((40, 30))), make_file(image_bytes((60, 50)))]
+            assert all(asyncio.run(upload.upload_images(db, files)))
+
+    def test_one_failure_discards_the_rest(self, upload_dir, db):
+        files = [make_file(image_bytes()), make_file(b"x" * (2 * MB)), make_file(image_bytes())]
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(upload.upload_images(db, files))
+
+        assert exc.value.status_code == 400
+        assert stored_files(upload_dir) == []
+
+    def test_create_listing_keeps_no_orphans(self, upload_dir, client, test_user_headers):
+        response = client.post(
+            "/api/listings", headers=test_user_headers, data=self.LISTING,
+            files={
+                "image1": ("a.jpg", image_bytes(), "image/jpeg"),
+                "image2": ("b.gif", b"GIF89a", "image/gif"),
+            },
+        )
+        assert response.status_code == 400
+        assert stored_files(upload_dir) == []
+
+    def test_update_replaces_images_after_commit(self, upload_dir, client, test_user_headers):
+        created = client.post(
+            "/api/listings", headers=test_user_headers, data=self.LISTING,
+            files={"image1": ("a.jpg", image_bytes(), "image/jpeg")},
+        ).json()
+
+        updated = client.put(
+            f"/api/listings/{created['id']}", headers=test_user_headers,
+            files={
+                "image1": ("b.jpg", image_bytes((200, 100)), "image/jpeg"),
+                "image2": ("c.jpg", image_bytes(), "image/jpeg"),
+            },
+        ).json()
+
+        assert updated["image_url"] != created["image_url"]
+        # Two originals, each with its thumb and medium copies
+        assert len(stored_files(upload_dir / "listings")) == 6
+        assert open_upload(upload_dir, updated["image_url"]).size == (200, 100)
+
+
+class TestImageVariants:
+    """Metadata stripping and resized copies of local uploads"""
+
+    def test_strips_exif_and_applies_orientation(self, upload_dir, db):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees
+        exif[0x8825] = {1: "N"}  # GPS
+        url = asyncio.run(upload.upload_image(db, make_file(image_bytes((400, 300), exif=exif.tobytes()))))
+
+        original = open_upload(upload_dir, url)
+        assert original.size == (300, 400)
+        assert dict(original.getexif()) == {}
+
+    def test_writes_webp_variants(self, upload_dir, db):
+        buffer = BytesIO()
+        Image.linear_gradient("L").resize((2000, 1000)).save(buffer, format="PNG")
+        url = asyncio.run(upload.upload_image(db, make_file(buffer.getvalue(), content_type="image/png")))
+
+        thumb = open_upload(upload_dir, variant_url(url, "thumb"))
+        medium = open_upload(upload_dir, variant_url(url, "medium"))
+        assert (thumb.format, thumb.size) == ("WEBP", (480, 240))
+        assert (medium.format, medium.size) == ("WEBP", (1280, 640))
+
+        upload.delete_image(url)
+        assert stored_files(upload_dir) == []
+
+    def test_undecodable_file_rejected(self, upload_dir, db):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(upload.upload_image(db, make_file(b"\xff\xd8 not really a jpeg")))
+        assert exc.value.status_code == 400
+        assert stored_files(upload_dir) == []
+
+    def test_listing_response_carries_variant_urls(self, client, create_test_listing, test_user, db):
+        test_listing = create_test_listing(test_user)
+        test_listing.image_url_2 = "/uploads/listings/abc.jpg"
+        db.commit()
+        data = client.get(f"/api/listings/{test_listing.id}").json()
+
+        # Remote images have no local copies
+        assert data["thumbnail_url"] is None
+        assert data["image_variants"] == [
+            None,
+            {"thumb": "/uploads/listings/abc.thumb.webp", "medium": "/uploads/listings/abc.medium.webp"},
+            None,
+        ]
+
+
+class TestContentAddressedStorage:
+    """Uploads named by their SHA-256 and shared through image_refs"""
+
+    LISTING = TestParallelUploads.LISTING
+
+    def create(self, client, headers, content):
+        return client.post(
+            "/api/listings", headers=headers, data=self.LISTING,
+            files={"image1": ("a.jpg", content, "image/jpeg")},
+        ).json()
+
+    def test_identical_uploads_share_one_blob(self, upload_dir, db):
+        content = image_bytes()
+        first = asyncio.run(upload.upload_image(db, make_file(content)))
+        second = asyncio.run(upload.upload_image(db, make_file(content)))
+
+        assert first == second
+        assert upload.CONTENT_NAME.fullmatch(first.rsplit("/", 1)[1])
+        assert len(stored_files(upload_dir / "listings")) == 3  # original, thumb, medium
+
+    def test_concurrent_identical_uploads_do_not_block(self, upload_dir, db, monkeypatch):
+        # Each upload waits in _hold_images until the other one gets there
+        # too, which only works if neither holds the event loop meanwhile
+        arrived = threading.Barrier(2, timeout=5)
+        one_at_a_time = threading.Lock()  # the test engine shares one connection
+        hold_images = upload._hold_images
+
+        def hold_together(*args, **kwargs):
+            arrived.wait()
+            with one_at_a_time:
+                hold_images(*args, **kwargs)
+
+        monkeypatch.setattr(upload, "_hold_images", hold_together)
+        content = image_bytes()
+
+        async def upload_twice():
+            return await asyncio.gather(
+                upload.upload_image(db, make_file(content)),
+                upload.upload_image(db, make_file(content)),
+            )
+
+        first, second = asyncio.run(upload_twice())
+        assert first and first == second
+        db.expire_all()
+        assert db.get(ImageRef, first).ref_count == 2
+        assert len(stored_files(upload_dir / "listings")) == 3
+
+    def test_uploaded_blob_survives_deleting_its_last_user(self, upload_dir, client, test_user_headers, db):
+        content = image_bytes()
+        created = self.create(client, test_user_headers, content)
+        # A second listing's upload finds the blob before it is committed...
+        url = asyncio.run(upload.upload_image(db, make_file(content)))
+        assert url == created["image_url"]
+
+        # ...and the listing holding the last committed reference goes away
+        client.delete(f"/api/listings/{created['id']}", headers=test_user_headers)
+        assert open_upload(upload_dir, url)
+        db.expire_all()
+        assert db.get(ImageRef, url).ref_count == 1
+
+        # Released unused, the blob goes
+        upload.delete_images(db, [url], uploaded=True)
+        db.expire_all()
+        assert db.get(ImageRef, url).ref_count == 0
+        assert stored_files(upload_dir) == []
+
+    def test_blob_deleted_with_last_reference(self, upload_dir, client, test_user_headers, db):
+        content = image_bytes()
+        first = self.create(client, test_user_headers, content)
+        second = self.create(client, test_user_headers, content)
+        url = first["image_url"]
+        assert second["image_url"] == url
+        assert db.get(ImageRef, url).ref_count == 2
+
+        client.delete(f"/api/listings/{first['id']}", headers=test_user_headers)
+        assert open_upload(upload_dir, url)
+
+        client.delete(f"/api/listings/{second['id']}", headers=test_user_headers)
+        db.expire_all()
+        assert db.get(ImageRef, url).ref_count == 0
+        assert stored_files(upload_dir) == []
+
+    def test_unchanged_image_survives_update(self, upload_dir, client, test_user_headers):
+        content = image_bytes()
+        created = self.create(client, test_user_headers, content)
+        updated = client.put(
+            f"/api/listings/{created['id']}", headers=test_user_headers,
+            files={"image1": ("a.jpg", content, "image/jpeg")},
+        ).json()
+
+        assert updated["image_url"] == created["image_url"]
+        assert open_upload(upload_dir, updated["image_url"])
+
+    def test_admin_user_delete_releases_images(
+        self, upload_dir, client, test_user, test_user_headers, admin_user, get_auth_headers, db
+    ):
+        url = self.create(client, test_user_headers, image_bytes())["image_url"]
+        admin_user.role = RoleEnum.super_admin
+        db.commit()
+        response = client.delete(f"/api/admin/users/{test_user.id}", headers=get_auth_headers(admin_user))
+        assert response.status_code == 200
+
+        assert db.get(ImageRef, url).ref_count == 0
+        assert stored_files(upload_dir) == []
+
+
+class TestUploadServing:
+    """Caching and range headers on /uploads (UploadFiles)"""
+
+    NAME = "ab" * 32 + ".jpg"
+
+    @pytest.fixture()
+    def served(self, tmp_path):
+        (tmp_path / "listings").mkdir()
+        (tmp_path / "listings" / self.NAME).write_bytes(bytes(range(256)) * 4)
+        (tmp_path / "listings" / "legacy.jpg").write_bytes(b"old")
+        (tmp_path / upload.INCOMING_FOLDER).mkdir()
+        (tmp_path / upload.INCOMING_FOLDER / "x.part").write_bytes(b"partial")
+        app.router.routes.insert(0, Mount("/test-uploads", upload.UploadFiles(directory=tmp_path)))
+        yield "/test-uploads/listings"
+        del app.router.routes[0]
+
+    def test_content_named_files_are_immutable(self, client, served):
+        response = client.get(f"{served}/{self.NAME}")
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["etag"] == f'"{self.NAME}"'
+
+        repeat = client.get(f"{served}/{self.NAME}", headers={"If-None-Match": response.headers["etag"]})
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+
+    def test_other_files_revalidate(self, client, served):
+        response = client.get(f"{served}/legacy.jpg")
+        assert response.content == b"old"
+        assert "immutable" not in response.headers["cache-control"]
+
+    def test_byte_ranges(self, client, served):
+        url = f"{served}/{self.NAME}"
+        partial = client.get(url, headers={"Range": "bytes=10-19"})
+        assert partial.status_code == 206
+        assert partial.headers["content-range"] == "bytes 10-19/1024"
+        assert partial.content == bytes(range(10, 20))
+
+        assert client.get(url, headers={"Range": "bytes=-4"}).content == bytes(range(252, 256))
+        assert client.get(url, headers={"Range": "bytes=2000-"}).status_code == 416
+        # A stale If-Range gets the whole file
+        assert client.get(url, headers={"Range": "bytes=0-1", "If-Range": '"other"'}).status_code == 200
+
+    def test_incoming_files_not_served(self, client, served):
+        assert client.get(f"/test-uploads/{upload.INCOMING_FOLDER}/x.part").status_code == 404
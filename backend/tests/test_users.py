@@ -3,6 +3,10 @@ Tests for user profile endpoints: /api/users/*
 """
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.models import Review, User
+from app.services.user_counters import check_user_counters, reconcile_user_counters
 
 
 class TestGetMyProfile:
@@ -141,3 +145,64 @@ class TestGetUserReviews:
         data = response.json()
         assert len(data) >= 1
         assert data[0]["rating"] == 5
+
+
+class TestProfileCounters:
+    """Listing and rating counters kept on users for the profile pages"""
+
+    def test_write_paths_keep_counters_exact(
+        self, client: TestClient, create_test_user, create_test_listing, get_auth_headers, admin_headers, db
+    ):
+        seller = create_test_user(email="seller@apsit.edu.in")
+        buyer = create_test_user(email="buyer@apsit.edu.in")
+        listings = [create_test_listing(seller=seller, title=f"Item {i}") for i in range(3)]
+        client.put(f"/api/listings/{listings[0].id}", headers=get_auth_headers(seller), data={"status": "sold"})
+        for rating, listing in zip((5, 4), listings):
+            client.post("/api/reviews", headers=get_auth_headers(buyer), json={
+                "rating": rating, "reviewed_user_id": seller.id, "listing_id": listing.id
+            })
+
+        profile = client.get(f"/api/users/{seller.id}").json()
+        assert (profile["listing_count"], profile["sold_count"]) == (2, 1)
+        assert (profile["review_count"], profile["avg_rating"]) == (2, 4.5)
+        assert client.get("/api/users/me", headers=get_auth_headers(seller)).json()["listing_count"] == 3
+
+        review = db.query(Review).filter(Review.rating == 4).first()
+        client.delete(f"/api/reviews/{review.id}", headers=get_auth_headers(buyer))
+        client.delete(f"/api/listings/{listings[2].id}", headers=get_auth_headers(seller))
+        client.put(f"/api/admin/users/{seller.id}/ban", headers=admin_headers, json={
+            "reason": "spam", "delete_listings": True
+        })
+        db.expire_all()
+        assert check_user_counters(db) == []
+
+        detail = client.get(f"/api/admin/users/{seller.id}", headers=admin_headers).json()
+        assert (detail["total_listings"], detail["active_listings"], detail["sold_listings"]) == (2, 0, 0)
+        assert (detail["reviews_received"], detail["avg_rating"]) == (1, 5.0)
+
+    def test_profile_is_one_row_read(self, client: TestClient, create_test_user, create_test_listing, count_queries):
+        seller = create_test_user(email="seller@apsit.edu.in")
+        for i in range(5):
+            create_test_listing(seller=seller, title=f"Item {i}")
+
+        url = f"/api/users/{seller.id}"
+
+        with count_queries() as queries:
+            response = client.get(url)
+        assert response.json()["listing_count"] == 5
+        assert len(queries) == 1
+
+    def test_reconcile_repairs_drift(self, client: TestClient, create_test_user, create_test_listing, db):
+        seller = create_test_user(email="seller@apsit.edu.in")
+        create_test_listing(seller=seller)
+        # Written around the ORM, so the hooks never see it
+        db.execute(update(User).where(User.id == seller.id).values(sold_count=3, rating_sum=9))
+        db.commit()
+
+        drift = {m["counter"]: (m["stored"], m["live"]) for m in check_user_counters(db)}
+        assert drift == {"sold_count": (3, 0), "rating_sum": (9, 0)}
+
+        assert reconcile_user_counters(db)
+        db.commit()
+        assert check_user_counters(db) == []
+        assert client.get(f"/api/users/{seller.id}").json()["sold_count"] == 0
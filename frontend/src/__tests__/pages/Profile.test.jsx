@@ -1,5 +1,5 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest';
-import { render, screen, waitFor } from '@testing-library/react';
+import { render, screen, waitFor, fireEvent } from '@testing-library/react';
 import { MemoryRouter, Route, Routes } from 'react-router-dom';
 
 // Mock services
@@ -114,4 +114,18 @@ describe('Profile page', () => {
       expect(getUserReviews).toHaveBeenCalledWith('5');
     });
   });
+
+  it('loads the next page of listings on "Load more"', async () => {
+    getUserListings
+      .mockResolvedValueOnce({ data: [{ id: 1, title: 'First page' }], nextCursor: 'abc' })
+      .mockResolvedValueOnce({ data: [{ id: 2, title: 'Second page' }], nextCursor: null });
+    renderProfile();
+    fireEvent.click(await screen.findByText('Load more'));
+    await waitFor(() => {
+      expect(screen.getByText('Second page')).toBeInTheDocument();
+    });
+    expect(getUserListings).toHaveBeenLastCalledWith('5', 'abc');
+    expect(screen.getByText('First page')).toBeInTheDocument();
+    expect(screen.queryByText('Load more')).not.toBeInTheDocument();
+  });
 });
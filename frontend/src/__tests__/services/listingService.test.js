@@ -55,7 +55,7 @@ describe('listingService', () => {
   it('getUserListings calls /users/:id/listings', async () => {
     mockGet.mockResolvedValue({ data: [] });
     await getUserListings(7);
-    expect(mockGet).toHaveBeenCalledWith('/users/7/listings');
+    expect(mockGet).toHaveBeenCalledWith('/users/7/listings', { params: {} });
   });
 
   it('deleteListing calls DELETE /listings/:id', async () => {
@@ -88,12 +88,27 @@ describe('listingService', () => {
   it('getMyFavorites calls GET /listings/favorites/me', async () => {
     mockGet.mockResolvedValue({ data: [] });
     await getMyFavorites();
-    expect(mockGet).toHaveBeenCalledWith('/listings/favorites/me');
+    expect(mockGet).toHaveBeenCalledWith('/listings/favorites/me', { params: {} });
   });
 
   it('getMyListings calls GET /listings/user/me', async () => {
     mockGet.mockResolvedValue({ data: [] });
     await getMyListings();
-    expect(mockGet).toHaveBeenCalledWith('/listings/user/me');
+    expect(mockGet).toHaveBeenCalledWith('/listings/user/me', { params: {} });
+  });
+
+  it('getMyListings returns the next page cursor from X-Next-Cursor', async () => {
+    mockGet.mockResolvedValue({ data: [{ id: 3 }, { id: 2 }], headers: { 'x-next-cursor': 'abc' } });
+    const { data, nextCursor } = await getMyListings();
+    expect(mockGet).toHaveBeenCalledTimes(1);
+    expect(data.map((l) => l.id)).toEqual([3, 2]);
+    expect(nextCursor).toBe('abc');
+  });
+
+  it('getMyListings passes the cursor for the page after', async () => {
+    mockGet.mockResolvedValue({ data: [{ id: 1 }], headers: {} });
+    const { nextCursor } = await getMyListings('abc');
+    expect(mockGet).toHaveBeenCalledWith('/listings/user/me', { params: { cursor: 'abc' } });
+    expect(nextCursor).toBeNull();
   });
 });
@@ -17,6 +17,7 @@ import {
   getConversationMessages,
   getUnreadCount,
   markAsRead,
+  markConversationRead,
 } from '../../services/messageService';
 
 describe('messageService', () => {
@@ -43,6 +44,12 @@ describe('messageService', () => {
     expect(mockGet).toHaveBeenCalledWith('/messages/conversation/3/7');
   });
 
+  it('getConversationMessages passes before for older pages', async () => {
+    mockGet.mockResolvedValue({ data: [] });
+    await getConversationMessages(3, 7, 120);
+    expect(mockGet).toHaveBeenCalledWith('/messages/conversation/3/7', { params: { before: 120 } });
+  });
+
   it('getUnreadCount calls GET /messages/unread/count', async () => {
     mockGet.mockResolvedValue({ data: { count: 5 } });
     await getUnreadCount();
@@ -54,4 +61,10 @@ describe('messageService', () => {
     await markAsRead(99);
     expect(mockPut).toHaveBeenCalledWith('/messages/99/read');
   });
+
+  it('markConversationRead posts up_to for the conversation', async () => {
+    mockPost.mockResolvedValue({ data: { marked_read: 2 } });
+    await markConversationRead(3, 7, 120);
+    expect(mockPost).toHaveBeenCalledWith('/messages/conversation/3/7/read', null, { params: { up_to: 120 } });
+  });
 });
@@ -10,8 +10,13 @@ const getImageSrc = (url) => {
   return `${BACKEND_URL}${url}`;
 };
 
+// Older uploads may have no resized copies yet: show the original instead
+const fallBackTo = (url) => (e) => {
+  if (url && e.currentTarget.src !== url) e.currentTarget.src = url;
+};
+
 const ListingCard = ({ listing, onFavoriteToggle, isFavorited }) => {
-  const imageUrl = getImageSrc(listing.image_url) || 'https://via.placeholder.com/300x200?text=No+Image';
+  const imageUrl = getImageSrc(listing.thumbnail_url || listing.image_url) || 'https://via.placeholder.com/300x200?text=No+Image';
 
   const getConditionColor = (condition) => {
     const colors = {
@@ -35,6 +40,7 @@ const ListingCard = ({ listing, onFavoriteToggle, isFavorited }) => {
           <img
             src={imageUrl}
             alt={listing.title}
+            onError={fallBackTo(getImageSrc(listing.image_url))}
             className="w-full h-48 object-cover group-hover:scale-105 transition-transform duration-200"
           />
           <span className={`absolute top-2 right-2 px-2 py-1 text-xs font-semibold rounded ${getConditionColor(listing.condition)}`}>
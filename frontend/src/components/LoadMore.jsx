@@ -0,0 +1,17 @@
+import React from 'react';
+
+const LoadMore = ({ onClick, loading }) => {
+  return (
+    <div className="flex justify-center mt-8">
+      <button
+        onClick={onClick}
+        disabled={loading}
+        className="px-6 py-2.5 bg-white border border-gray-300 rounded-md text-sm font-medium text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+      >
+        {loading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMore;
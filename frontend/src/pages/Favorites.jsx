@@ -4,6 +4,7 @@ import { getMyFavorites, removeFavorite } from '../services/listingService';
 import { useAuth } from '../context/AuthContext';
 import ListingCard from '../components/ListingCard';
 import Loading from '../components/Loading';
+import LoadMore from '../components/LoadMore';
 import { toast } from 'react-toastify';
 import { FaHeart } from 'react-icons/fa';
 
@@ -11,7 +12,9 @@ const Favorites = () => {
   const navigate = useNavigate();
   const { isAuthenticated } = useAuth();
   const [favorites, setFavorites] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (!isAuthenticated) {
@@ -23,8 +26,9 @@ const Favorites = () => {
 
   const fetchFavorites = async () => {
     try {
-      const { data } = await getMyFavorites();
+      const { data, nextCursor } = await getMyFavorites();
       setFavorites(data);
+      setNextCursor(nextCursor);
     } catch (error) {
       toast.error('Failed to load favorites');
     } finally {
@@ -32,6 +36,19 @@ const Favorites = () => {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const { data, nextCursor: cursor } = await getMyFavorites(nextCursor);
+      setFavorites((loaded) => [...loaded, ...data]);
+      setNextCursor(cursor);
+    } catch (error) {
+      toast.error('Failed to load favorites');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleRemoveFavorite = async (listingId) => {
     try {
       await removeFavorite(listingId);
@@ -52,16 +69,19 @@ const Favorites = () => {
       </div>
 
       {favorites.length > 0 ? (
-        <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-6">
-          {favorites.map(listing => (
-            <ListingCard
-              key={listing.id}
-              listing={listing}
-              onFavoriteToggle={handleRemoveFavorite}
-              isFavorited={true}
-            />
-          ))}
-        </div>
+        <>
+          <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-6">
+            {favorites.map(listing => (
+              <ListingCard
+                key={listing.id}
+                listing={listing}
+                onFavoriteToggle={handleRemoveFavorite}
+                isFavorited={true}
+              />
+            ))}
+          </div>
+          {nextCursor && <LoadMore onClick={loadMore} loading={loadingMore} />}
+        </>
       ) : (
         <div className="text-center py-12">
           <FaHeart className="mx-auto text-gray-300 text-6xl mb-4" />
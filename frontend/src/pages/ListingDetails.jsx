@@ -16,6 +16,11 @@ const getImageSrc = (url) => {
   return `${BACKEND_URL}${url}`;
 };
 
+// Older uploads may have no resized copies yet: show the original instead
+const fallBackTo = (url) => (e) => {
+  if (url && e.currentTarget.src !== url) e.currentTarget.src = url;
+};
+
 const REPORT_REASONS = [
   { value: 'spam', label: 'Spam or misleading' },
   { value: 'fake', label: 'Fake or counterfeit item' },
@@ -40,7 +45,15 @@ const ListingDetails = () => {
   const [reportDescription, setReportDescription] = useState('');
   const [submittingReport, setSubmittingReport] = useState(false);
 
-  const images = listing ? [listing.image_url, listing.image_url_2, listing.image_url_3].filter(Boolean).map(getImageSrc) : [];
+  const images = listing
+    ? [listing.image_url, listing.image_url_2, listing.image_url_3]
+        .map((url, i) => url && (listing.image_variants?.[i]?.medium || url))
+        .filter(Boolean)
+        .map(getImageSrc)
+    : [];
+  const originals = listing
+    ? [listing.image_url, listing.image_url_2, listing.image_url_3].filter(Boolean).map(getImageSrc)
+    : [];
 
   useEffect(() => {
     fetchListing();
@@ -162,6 +175,7 @@ const ListingDetails = () => {
               <img
                 src={images[selectedImage] || 'https://via.placeholder.com/600x600?text=No+Image'}
                 alt={listing.title}
+                onError={fallBackTo(originals[selectedImage])}
                 className="w-full h-full object-contain"
               />
             </div>
@@ -180,7 +194,7 @@ const ListingDetails = () => {
                       : 'border-gray-200 hover:border-gray-300'
                   }`}
                 >
-                  <img src={img} alt={`View ${index + 1}`} className="w-full h-full object-cover" />
+                  <img src={img} alt={`View ${index + 1}`} onError={fallBackTo(originals[index])} className="w-full h-full object-cover" />
                 </button>
               ))}
             </div>
@@ -1,11 +1,16 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { useParams, useSearchParams, Link } from 'react-router-dom';
-import { getConversations, getConversationMessages, sendMessage } from '../services/messageService';
+import {
+  getConversations, getConversationMessages, markConversationRead, sendMessage, subscribeToMessages
+} from '../services/messageService';
 import { useAuth } from '../context/AuthContext';
 import Loading from '../components/Loading';
 import { FaUserCircle, FaPaperPlane, FaArrowLeft } from 'react-icons/fa';
 import { format, isToday, isYesterday } from 'date-fns';
 
+// Messages per page of a conversation (the API's default limit)
+const MESSAGE_PAGE_SIZE = 50;
+
 const Messages = () => {
   const { userId } = useParams();
   const [searchParams] = useSearchParams();
@@ -14,41 +19,52 @@ const Messages = () => {
   
   const [conversations, setConversations] = useState([]);
   const [messages, setMessages] = useState([]);
+  const [hasOlder, setHasOlder] = useState(false);
   const [loading, setLoading] = useState(true);
   const [messageText, setMessageText] = useState('');
   const [sending, setSending] = useState(false);
   const [selectedConversation, setSelectedConversation] = useState(null);
   
   const messagesEndRef = useRef(null);
-  const pollIntervalRef = useRef(null);
 
   useEffect(() => {
     fetchConversations();
-    return () => {
-      if (pollIntervalRef.current) {
-        clearInterval(pollIntervalRef.current);
-      }
-    };
   }, []);
 
   useEffect(() => {
+    setMessages([]);
+    setHasOlder(false);
     if (userId && listingId) {
       fetchMessages(userId);
-      // Poll for new messages every 3 seconds
-      pollIntervalRef.current = setInterval(() => {
-        fetchMessages(userId, true);
-      }, 3000);
     }
-    return () => {
-      if (pollIntervalRef.current) {
-        clearInterval(pollIntervalRef.current);
+    // New messages and read receipts are pushed by the server
+    return subscribeToMessages((event) => {
+      fetchConversations();
+      const msg = event.message;
+      const otherId = parseInt(userId);
+      const inOpenConversation = msg
+        ? msg.listing_id === parseInt(listingId) &&
+          (msg.sender_id === otherId || msg.receiver_id === otherId)
+        : event.listing_id === parseInt(listingId);
+      if (!userId || !listingId || !inOpenConversation) return;
+      if (msg) {
+        // The pushed message is the whole row: show it and mark it read
+        // in place rather than refetching the latest page
+        setMessages((prev) => (prev.some((m) => m.id === msg.id) ? prev : [...prev, msg]));
+        if (msg.receiver_id === user?.id) {
+          markConversationRead(userId, listingId, msg.id).catch(() => {});
+        }
+      } else {
+        fetchMessages(userId, true);
       }
-    };
-  }, [userId, listingId]);
+    });
+  }, [userId, listingId, user?.id]);
 
+  // Only new messages at the bottom scroll, not older pages loaded above
+  const lastMessageId = messages[messages.length - 1]?.id;
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [lastMessageId]);
 
   const fetchConversations = async () => {
     try {
@@ -68,7 +84,10 @@ const Messages = () => {
         return;
       }
       const { data } = await getConversationMessages(recipientId, listingId);
-      setMessages(data || []);
+      const latest = data || [];
+      // Keep any older pages already loaded above the latest one
+      setMessages((prev) => [...prev.filter((m) => latest.length && m.id < latest[0].id), ...latest]);
+      setHasOlder((prev) => prev || latest.length === MESSAGE_PAGE_SIZE);
 
       // Find the conversation to get user details
       const conv = conversations.find(c => c.other_user_id === parseInt(recipientId));
@@ -84,6 +103,17 @@ const Messages = () => {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!messages.length) return;
+    try {
+      const { data } = await getConversationMessages(userId, listingId, messages[0].id);
+      setMessages((prev) => [...data, ...prev]);
+      setHasOlder(data.length === MESSAGE_PAGE_SIZE);
+    } catch (error) {
+      console.error('Failed to load earlier messages:', error);
+    }
+  };
+
   const handleSendMessage = async (e) => {
     e.preventDefault();
     if (!messageText.trim() || !userId || !listingId) return;
@@ -215,6 +245,17 @@ const Messages = () => {
 
                 {/* Messages */}
                 <div className="flex-1 overflow-y-auto p-4 space-y-4">
+                  {hasOlder && (
+                    <div className="text-center">
+                      <button
+                        type="button"
+                        onClick={loadOlderMessages}
+                        className="text-sm text-primary hover:underline"
+                      >
+                        Load earlier messages
+                      </button>
+                    </div>
+                  )}
                   {messages.map((msg, index) => {
                     const isOwn = user && msg.sender_id === user.id;
                     return (
@@ -3,6 +3,7 @@ import { Link } from 'react-router-dom';
 import { getMyListings, deleteListing, markAsSold } from '../services/listingService';
 import { useAuth } from '../context/AuthContext';
 import Loading from '../components/Loading';
+import LoadMore from '../components/LoadMore';
 import { toast } from 'react-toastify';
 import { FaEdit, FaTrash, FaCheckCircle, FaEye, FaPlus, FaClock, FaTag, FaBoxOpen } from 'react-icons/fa';
 import { format } from 'date-fns';
@@ -15,10 +16,17 @@ const getImageSrc = (url) => {
   return `${BACKEND_URL}${url}`;
 };
 
+// Older uploads may have no resized copies yet: show the original instead
+const fallBackTo = (url) => (e) => {
+  if (url && e.currentTarget.src !== url) e.currentTarget.src = url;
+};
+
 const MyListings = () => {
   const { user } = useAuth();
   const [listings, setListings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState('all');
 
   useEffect(() => {
@@ -29,8 +37,9 @@ const MyListings = () => {
 
   const fetchListings = async () => {
     try {
-      const { data } = await getMyListings();
+      const { data, nextCursor } = await getMyListings();
       setListings(data);
+      setNextCursor(nextCursor);
     } catch (error) {
       toast.error('Failed to fetch listings');
     } finally {
@@ -38,6 +47,19 @@ const MyListings = () => {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const { data, nextCursor: cursor } = await getMyListings(nextCursor);
+      setListings((loaded) => [...loaded, ...data]);
+      setNextCursor(cursor);
+    } catch (error) {
+      toast.error('Failed to fetch listings');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id) => {
     if (window.confirm('Are you sure you want to delete this listing?')) {
       try {
@@ -198,8 +220,9 @@ const MyListings = () => {
               <div className="relative aspect-[4/3] overflow-hidden">
                 <Link to={`/listings/${listing.id}`}>
                   <img
-                    src={getImageSrc(listing.image_url) || 'https://via.placeholder.com/400x300?text=No+Image'}
+                    src={getImageSrc(listing.thumbnail_url || listing.image_url) || 'https://via.placeholder.com/400x300?text=No+Image'}
                     alt={listing.title}
+                    onError={fallBackTo(getImageSrc(listing.image_url))}
                     className="w-full h-full object-cover hover:scale-105 transition-transform duration-300"
                   />
                 </Link>
@@ -311,6 +334,8 @@ const MyListings = () => {
           </Link>
         </div>
       )}
+
+      {nextCursor && <LoadMore onClick={loadMore} loading={loadingMore} />}
     </div>
   );
 };
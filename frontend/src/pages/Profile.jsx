@@ -6,6 +6,7 @@ import { getUserReviews } from '../services/reviewService';
 import { useAuth } from '../context/AuthContext';
 import ListingCard from '../components/ListingCard';
 import Loading from '../components/Loading';
+import LoadMore from '../components/LoadMore';
 import { FaUserCircle, FaStar, FaMapMarkerAlt, FaCalendar, FaEdit } from 'react-icons/fa';
 import { format } from 'date-fns';
 import { toast } from 'react-toastify';
@@ -17,7 +18,10 @@ const Profile = () => {
   const [profile, setProfile] = useState(null);
   const [listings, setListings] = useState([]);
   const [reviews, setReviews] = useState([]);
+  const [listingsCursor, setListingsCursor] = useState(null);
+  const [reviewsCursor, setReviewsCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [activeTab, setActiveTab] = useState('listings');
 
   const isOwnProfile = currentUser && currentUser.id === parseInt(id);
@@ -37,6 +41,8 @@ const Profile = () => {
       setProfile(profileRes.data);
       setListings(listingsRes.data);
       setReviews(reviewsRes.data);
+      setListingsCursor(listingsRes.nextCursor);
+      setReviewsCursor(reviewsRes.nextCursor);
     } catch (error) {
       toast.error('Failed to load profile data.');
     } finally {
@@ -44,6 +50,36 @@ const Profile = () => {
     }
   };
 
+  const loadMoreListings = async () => {
+    setLoadingMore(true);
+    try {
+      const { data, nextCursor } = await getUserListings(id, listingsCursor);
+      setListings((loaded) => [...loaded, ...data]);
+      setListingsCursor(nextCursor);
+    } catch (error) {
+      toast.error('Failed to load profile data.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMoreReviews = async () => {
+    setLoadingMore(true);
+    try {
+      const { data, nextCursor } = await getUserReviews(id, reviewsCursor);
+      setReviews((loaded) => [...loaded, ...data]);
+      setReviewsCursor(nextCursor);
+    } catch (error) {
+      toast.error('Failed to load profile data.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Totals come from the profile counters: only the first page is loaded
+  const listingCount = profile?.listing_count ?? listings.length;
+  const reviewCount = profile?.review_count ?? reviews.length;
+
   if (loading) return <Loading />;
   if (!profile) return <div className="text-center py-12">User not found</div>;
 
@@ -98,7 +134,7 @@ const Profile = () => {
         {/* Stats */}
         <div className="mt-6 grid grid-cols-2 md:grid-cols-4 gap-4">
           <div className="bg-gray-50 rounded-lg p-4 text-center">
-            <p className="text-2xl font-bold text-primary">{listings.length}</p>
+            <p className="text-2xl font-bold text-primary">{listingCount}</p>
             <p className="text-sm text-gray-500">Active Listings</p>
           </div>
           <div className="bg-gray-50 rounded-lg p-4 text-center">
@@ -113,7 +149,7 @@ const Profile = () => {
             <p className="text-sm text-gray-500">Average Rating</p>
           </div>
           <div className="bg-gray-50 rounded-lg p-4 text-center">
-            <p className="text-2xl font-bold text-primary">{reviews.length}</p>
+            <p className="text-2xl font-bold text-primary">{reviewCount}</p>
             <p className="text-sm text-gray-500">Reviews</p>
           </div>
         </div>
@@ -130,7 +166,7 @@ const Profile = () => {
                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
             }`}
           >
-            Listings ({listings.length})
+            Listings ({listingCount})
           </button>
           <button
             onClick={() => setActiveTab('reviews')}
@@ -140,7 +176,7 @@ const Profile = () => {
                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
             }`}
           >
-            Reviews ({reviews.length})
+            Reviews ({reviewCount})
           </button>
         </nav>
       </div>
@@ -159,6 +195,7 @@ const Profile = () => {
               No listings yet
             </div>
           )}
+          {listingsCursor && <LoadMore onClick={loadMoreListings} loading={loadingMore} />}
         </div>
       )}
 
@@ -202,6 +239,7 @@ const Profile = () => {
               No reviews yet
             </div>
           )}
+          {reviewsCursor && <LoadMore onClick={loadMoreReviews} loading={loadingMore} />}
         </div>
       )}
     </div>
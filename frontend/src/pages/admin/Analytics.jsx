@@ -1,22 +1,26 @@
 import { useState, useEffect } from 'react';
 import { getUserAnalytics, getListingAnalytics } from '../../services/adminService';
 
+// Time-series windows the analytics API accepts
+const WINDOWS = [7, 30, 90, 365];
+
 const Analytics = () => {
   const [userAnalytics, setUserAnalytics] = useState(null);
   const [listingAnalytics, setListingAnalytics] = useState(null);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('overview');
+  const [days, setDays] = useState(30);
 
   useEffect(() => {
     loadAnalytics();
-  }, []);
+  }, [days]);
 
   const loadAnalytics = async () => {
     try {
       setLoading(true);
       const [users, listings] = await Promise.all([
-        getUserAnalytics(),
-        getListingAnalytics()
+        getUserAnalytics(days),
+        getListingAnalytics(days)
       ]);
       setUserAnalytics(users);
       setListingAnalytics(listings);
@@ -46,12 +50,23 @@ const Analytics = () => {
       {/* Header */}
       <div className="flex items-center justify-between">
         <h2 className="text-2xl font-bold text-gray-900">Analytics Dashboard</h2>
-        <button
-          onClick={loadAnalytics}
-          className="px-4 py-2 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700 transition-colors"
-        >
-          🔄 Refresh
-        </button>
+        <div className="flex items-center space-x-3">
+          <select
+            value={days}
+            onChange={(e) => setDays(Number(e.target.value))}
+            className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500"
+          >
+            {WINDOWS.map((window) => (
+              <option key={window} value={window}>Last {window} days</option>
+            ))}
+          </select>
+          <button
+            onClick={loadAnalytics}
+            className="px-4 py-2 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700 transition-colors"
+          >
+            🔄 Refresh
+          </button>
+        </div>
       </div>
 
       {/* Tabs */}
@@ -178,9 +193,9 @@ const UsersTab = ({ analytics }) => {
 
       {/* User Growth Chart */}
       <div className="bg-gray-50 rounded-xl p-6">
-        <h3 className="font-semibold text-gray-900 mb-4">📈 User Registrations (Last 30 Days)</h3>
-        <div className="h-64 flex items-end space-x-1">
-          {analytics?.users_by_day?.slice(-30).map((day, index) => {
+        <h3 className="font-semibold text-gray-900 mb-4">📈 User Registrations (Last {analytics?.users_by_day?.length || 30} Days)</h3>
+        <div className={`h-64 flex items-end ${analytics?.users_by_day?.length > 90 ? '' : 'space-x-1'}`}>
+          {analytics?.users_by_day?.map((day, index) => {
             const maxCount = Math.max(...(analytics.users_by_day?.map(d => d.count) || [1]));
             const height = maxCount > 0 ? (day.count / maxCount) * 100 : 0;
             return (
@@ -198,7 +213,7 @@ const UsersTab = ({ analytics }) => {
           })}
         </div>
         <div className="flex justify-between mt-2 text-xs text-gray-500">
-          <span>30 days ago</span>
+          <span>{analytics?.users_by_day?.length || 30} days ago</span>
           <span>Today</span>
         </div>
       </div>
@@ -219,9 +234,9 @@ const ListingsTab = ({ analytics }) => {
 
       {/* Listing Growth Chart */}
       <div className="bg-gray-50 rounded-xl p-6">
-        <h3 className="font-semibold text-gray-900 mb-4">📦 New Listings (Last 30 Days)</h3>
-        <div className="h-64 flex items-end space-x-1">
-          {analytics?.listings_by_day?.slice(-30).map((day, index) => {
+        <h3 className="font-semibold text-gray-900 mb-4">📦 New Listings (Last {analytics?.listings_by_day?.length || 30} Days)</h3>
+        <div className={`h-64 flex items-end ${analytics?.listings_by_day?.length > 90 ? '' : 'space-x-1'}`}>
+          {analytics?.listings_by_day?.map((day, index) => {
             const maxCount = Math.max(...(analytics.listings_by_day?.map(d => d.count) || [1]));
             const height = maxCount > 0 ? (day.count / maxCount) * 100 : 0;
             return (
@@ -239,7 +254,7 @@ const ListingsTab = ({ analytics }) => {
           })}
         </div>
         <div className="flex justify-between mt-2 text-xs text-gray-500">
-          <span>30 days ago</span>
+          <span>{analytics?.listings_by_day?.length || 30} days ago</span>
           <span>Today</span>
         </div>
       </div>
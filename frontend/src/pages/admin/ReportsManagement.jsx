@@ -5,7 +5,7 @@ const ReportsManagement = () => {
   const [reports, setReports] = useState([]);
   const [loading, setLoading] = useState(true);
   const [pagination, setPagination] = useState({ page: 1, pages: 1, total: 0 });
-  const [filters, setFilters] = useState({ status: '', report_type: '', sort_by: 'newest' });
+  const [filters, setFilters] = useState({ status: '', report_type: '', reason: '', date_from: '', date_to: '', sort_by: 'newest' });
   const [selectedReport, setSelectedReport] = useState(null);
   const [showReviewModal, setShowReviewModal] = useState(false);
   const [reviewData, setReviewData] = useState({ status: 'resolved', admin_notes: '', action_taken: '' });
@@ -95,7 +95,7 @@ const ReportsManagement = () => {
 
       {/* Filters */}
       <div className="bg-white rounded-xl shadow-sm p-4">
-        <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+        <div className="grid grid-cols-1 md:grid-cols-3 lg:grid-cols-6 gap-4">
           <select
             value={filters.status}
             onChange={(e) => setFilters({ ...filters, status: e.target.value })}
@@ -117,6 +117,33 @@ const ReportsManagement = () => {
             <option value="listing">Listing Reports</option>
             <option value="message">Message Reports</option>
           </select>
+          <select
+            value={filters.reason}
+            onChange={(e) => setFilters({ ...filters, reason: e.target.value })}
+            className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-gray-900"
+          >
+            <option value="">All Reasons</option>
+            <option value="spam">Spam</option>
+            <option value="fake">Fake</option>
+            <option value="inappropriate">Inappropriate</option>
+            <option value="scam">Scam</option>
+            <option value="harassment">Harassment</option>
+            <option value="other">Other</option>
+          </select>
+          <input
+            type="date"
+            value={filters.date_from}
+            onChange={(e) => setFilters({ ...filters, date_from: e.target.value })}
+            className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-gray-900"
+            aria-label="Reported from"
+          />
+          <input
+            type="date"
+            value={filters.date_to}
+            onChange={(e) => setFilters({ ...filters, date_to: e.target.value })}
+            className="px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-gray-900"
+            aria-label="Reported until"
+          />
           <select
             value={filters.sort_by}
             onChange={(e) => setFilters({ ...filters, sort_by: e.target.value })}
@@ -162,6 +162,7 @@ const UsersManagement = () => {
             <option value="newest">Newest First</option>
             <option value="oldest">Oldest First</option>
             <option value="name">Name A-Z</option>
+            <option value="trades">Most Trades</option>
           </select>
         </div>
       </div>
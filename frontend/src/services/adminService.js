@@ -136,6 +136,9 @@ export const getReports = async (params = {}) => {
   const queryParams = new URLSearchParams();
   if (params.status) queryParams.append('status', params.status);
   if (params.report_type) queryParams.append('report_type', params.report_type);
+  if (params.reason) queryParams.append('reason', params.reason);
+  if (params.date_from) queryParams.append('date_from', params.date_from);
+  if (params.date_to) queryParams.append('date_to', params.date_to);
   if (params.sort_by) queryParams.append('sort_by', params.sort_by);
   if (params.page) queryParams.append('page', params.page);
   if (params.limit) queryParams.append('limit', params.limit);
@@ -153,12 +156,12 @@ export const reviewReport = async (reportId, data) => {
 };
 
 // ============ ANALYTICS ============
-export const getUserAnalytics = async () => {
-  return adminApi.get('/analytics/users');
+export const getUserAnalytics = async (days = 30) => {
+  return adminApi.get(`/analytics/users?days=${days}`);
 };
 
-export const getListingAnalytics = async () => {
-  return adminApi.get('/analytics/listings');
+export const getListingAnalytics = async (days = 30) => {
+  return adminApi.get(`/analytics/listings?days=${days}`);
 };
 
 // ============ CATEGORIES ============
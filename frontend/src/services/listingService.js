@@ -1,4 +1,5 @@
 import api from './api';
+import { getPage } from './pagination';
 
 // Need multipart/form-data for images
 export const createListing = (listingData) => {
@@ -9,7 +10,7 @@ export const createListing = (listingData) => {
 
 export const getListings = (params) => api.get('/listings', { params });
 export const getListingById = (id) => api.get(`/listings/${id}`);
-export const getUserListings = (userId) => api.get(`/users/${userId}/listings`);
+export const getUserListings = (userId, cursor) => getPage(`/users/${userId}/listings`, cursor);
 export const deleteListing = (id) => api.delete(`/listings/${id}`);
 export const updateListing = (id, data) => {
   return api.put(`/listings/${id}`, data, {
@@ -25,5 +26,5 @@ export const markAsSold = (id) => {
 };
 export const addFavorite = (listingId) => api.post(`/listings/${listingId}/favorite`);
 export const removeFavorite = (listingId) => api.delete(`/listings/${listingId}/favorite`);
-export const getMyFavorites = () => api.get('/listings/favorites/me');
-export const getMyListings = () => api.get('/listings/user/me');
+export const getMyFavorites = (cursor) => getPage('/listings/favorites/me', cursor);
+export const getMyListings = (cursor) => getPage('/listings/user/me', cursor);
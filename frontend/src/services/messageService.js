@@ -2,7 +2,49 @@ import api from './api';
 
 export const sendMessage = (data) => api.post('/messages', data);
 export const getConversations = () => api.get('/messages/conversations');
-export const getConversationMessages = (otherUserId, listingId) =>
-  api.get(`/messages/conversation/${otherUserId}/${listingId}`);
+// Latest page of a conversation, or the page before message id `before`
+export const getConversationMessages = (otherUserId, listingId, before) =>
+  before
+    ? api.get(`/messages/conversation/${otherUserId}/${listingId}`, { params: { before } })
+    : api.get(`/messages/conversation/${otherUserId}/${listingId}`);
 export const getUnreadCount = () => api.get('/messages/unread/count');
 export const markAsRead = (messageId) => api.put(`/messages/${messageId}/read`);
+export const markConversationRead = (otherUserId, listingId, upTo) =>
+  api.post(`/messages/conversation/${otherUserId}/${listingId}/read`, null, { params: { up_to: upTo } });
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
+
+// Open the real-time channel: WebSocket first, Server-Sent Events as fallback.
+// Calls onEvent with each pushed event and returns an unsubscribe function.
+export const subscribeToMessages = (onEvent) => {
+  const token = localStorage.getItem('token');
+  if (!token) return () => {};
+
+  const query = `token=${encodeURIComponent(token)}`;
+  let closed = false;
+  let socket = null;
+  let source = null;
+
+  const openEventSource = () => {
+    if (closed || source || typeof EventSource === 'undefined') return;
+    source = new EventSource(`${API_URL}/messages/stream?${query}`);
+    ['message.created', 'message.read'].forEach((type) => {
+      source.addEventListener(type, (e) => onEvent(JSON.parse(e.data)));
+    });
+  };
+
+  if (typeof WebSocket !== 'undefined') {
+    socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/messages/ws?${query}`);
+    socket.onmessage = (e) => onEvent(JSON.parse(e.data));
+    // EventSource reconnects on its own, so it takes over if the socket drops
+    socket.onclose = openEventSource;
+  } else {
+    openEventSource();
+  }
+
+  return () => {
+    closed = true;
+    socket?.close();
+    source?.close();
+  };
+};
@@ -0,0 +1,9 @@
+import api from './api';
+
+// List endpoints return one page per request and send the next page's
+// cursor in the X-Next-Cursor header (none after the last page). Pass
+// nextCursor back as `cursor` to fetch the page after.
+export const getPage = async (url, cursor) => {
+  const response = await api.get(url, { params: cursor ? { cursor } : {} });
+  return { ...response, nextCursor: response.headers?.['x-next-cursor'] || null };
+};
@@ -1,8 +1,9 @@
 import api from './api';
+import { getPage } from './pagination';
 
 export const submitReview = (data) => api.post('/reviews', data);
-export const getListingReviews = (listingId) => api.get(`/reviews/listing/${listingId}`);
-export const getUserReviews = (userId) => api.get(`/users/${userId}/reviews`);
-export const getMyReviews = () => api.get('/reviews/my-reviews');
-export const getGivenReviews = () => api.get('/reviews/given');
+export const getListingReviews = (listingId, cursor) => getPage(`/reviews/listing/${listingId}`, cursor);
+export const getUserReviews = (userId, cursor) => getPage(`/users/${userId}/reviews`, cursor);
+export const getMyReviews = (cursor) => getPage('/reviews/my-reviews', cursor);
+export const getGivenReviews = (cursor) => getPage('/reviews/given', cursor);
 export const deleteReview = (reviewId) => api.delete(`/reviews/${reviewId}`);
@@ -1,4 +1,5 @@
 import api from './api';
+import { getPage } from './pagination';
 
 export const getMyProfile = () => api.get('/users/me');
 export const getUserProfile = (id) => api.get(`/users/${id}`);
@@ -7,5 +8,5 @@ export const updateProfile = (data) => {
     headers: { 'Content-Type': 'multipart/form-data' },
   });
 };
-export const getUserListings = (userId) => api.get(`/users/${userId}/listings`);
-export const getUserReviews = (userId) => api.get(`/users/${userId}/reviews`);
+export const getUserListings = (userId, cursor) => getPage(`/users/${userId}/listings`, cursor);
+export const getUserReviews = (userId, cursor) => getPage(`/users/${userId}/reviews`, cursor);